@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from ..database.database import get_db
 from ..services.auth_service import AuthService
 from ..models.user_schemas import (
@@ -10,7 +11,7 @@ from ..models.user_schemas import (
     NotificationPreferences, PrivacySettings, UserRatingCreate, UserRatingResponse,
     UserFavoriteCreate, UserFavoriteResponse, UserNotificationResponse, SavedSearchCreate, SavedSearchResponse
 )
-from ..utils.auth_utils import get_user_from_token
+from ..utils.auth_utils import get_user_from_token, verify_token, get_public_jwks
 from ..config.config import settings
 from ..models.user_models import User, UserRating, UserFavorite, UserNotification, SavedSearch
 
@@ -21,6 +22,7 @@ router = APIRouter(prefix="/api/v1/auth", tags=["authentication"])
 user_router = APIRouter(prefix="/api/v1", tags=["users"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_PREFIX}/auth/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_PREFIX}/auth/token", auto_error=False)
 
 auth_service = AuthService()
 
@@ -65,14 +67,23 @@ def refresh_token(token_data: RefreshTokenRequest, db: Session = Depends(get_db)
     )
 
 @router.post("/logout")
-def logout(token_data: RefreshTokenRequest, db: Session = Depends(get_db)):
-    """Logout (revoke refresh token)."""
+def logout(
+    token_data: RefreshTokenRequest,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """Logout (revoke refresh token, and the current access token when one is sent)."""
     success = auth_service.revoke_refresh_token(db, token_data.refresh_token)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid refresh token"
         )
+    if token:
+        try:
+            auth_service.revoke_access_token(db, verify_token(token))
+        except HTTPException:
+            pass  # An already invalid access token needs no revocation
     return {"message": "Successfully logged out"}
 
 @router.get("/me", response_model=UserResponse)
@@ -109,11 +120,35 @@ def change_password(
 
 # Token validation endpoint for other services
 @router.post("/validate", response_model=TokenValidationResponse)
-def validate_token(token: str = Depends(oauth2_scheme)):
+def validate_token(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Validate token and return user information. Used by other microservices."""
     user_data = get_user_from_token(token)
+    if auth_service.is_access_token_revoked(db, verify_token(token)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
     return TokenValidationResponse(**user_data)
 
+# Key distribution for services that verify tokens locally (AUTH_VERIFY_MODE=local)
+@router.get("/jwks")
+def get_jwks():
+    """Public keys for verifying access tokens (empty when tokens use a shared HS secret)."""
+    return get_public_jwks()
+
+@router.get("/revocations")
+def get_revocations(since: Optional[datetime] = None, db: Session = Depends(get_db)):
+    """Revoked, not yet expired access tokens; pass the previous server_time as `since` to poll incrementally."""
+    server_time = datetime.utcnow()
+    revocations = auth_service.user_repo.get_revocations_since(db, since)
+    return {
+        "revocations": [
+            {"jti": revoked.jti, "expires_at": revoked.expires_at.isoformat()}
+            for revoked in revocations
+        ],
+        "server_time": server_time.isoformat()
+    }
+
 # MOVED: User endpoint to separate router with correct prefix
 @user_router.get("/users/{user_id}")
 def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
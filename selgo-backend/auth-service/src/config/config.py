@@ -21,7 +21,10 @@ class Settings(BaseSettings):
     
     # Security settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-super-secret-key-change-this-in-production")
-    ALGORITHM: str = "HS256"
+    ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")  # HS256 (shared key) or RS256 (keys published via JWKS)
+    JWT_PRIVATE_KEY: str = os.getenv("JWT_PRIVATE_KEY", "")  # PEM, used when ALGORITHM is RS*
+    JWT_PRIVATE_KEY_PATH: str = os.getenv("JWT_PRIVATE_KEY_PATH", "")
+    JWT_KEY_ID: str = os.getenv("JWT_KEY_ID", "selgo-auth-1")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
     
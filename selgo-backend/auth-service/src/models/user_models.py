@@ -71,6 +71,16 @@ class RefreshToken(Base):
     created_at = Column(DateTime, default=func.now())
     is_revoked = Column(Boolean, default=False)
 
+class RevokedToken(Base):
+    """Access tokens revoked before their exp (logout); published to services that verify JWTs locally."""
+    __tablename__ = 'revoked_tokens'
+    
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), nullable=False, unique=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=func.now(), index=True)
+
 class UserRating(Base):
     __tablename__ = 'user_ratings'
     
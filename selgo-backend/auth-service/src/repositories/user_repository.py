@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
-from ..models.user_models import User, RefreshToken
+from ..models.user_models import User, RefreshToken, RevokedToken
 
 class UserRepository:
     def create(self, db: Session, user_data: Dict[str, Any]) -> User:
@@ -82,4 +82,27 @@ class UserRepository:
             db_token.is_revoked = True
             db.commit()
             return True
-        return False  
+        return False
+    
+    def revoke_access_token(self, db: Session, jti: str, user_id: int, expires_at: datetime) -> RevokedToken:
+        """Record an access token as revoked until it expires."""
+        db_token = db.query(RevokedToken).filter(RevokedToken.jti == jti).first()
+        if db_token:
+            return db_token
+        # revoked_at in UTC app time, matching the server_time handed to pollers
+        db_token = RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at, revoked_at=datetime.utcnow())
+        db.add(db_token)
+        db.commit()
+        db.refresh(db_token)
+        return db_token
+    
+    def is_token_revoked(self, db: Session, jti: str) -> bool:
+        """Check whether an access token has been revoked."""
+        return db.query(RevokedToken.id).filter(RevokedToken.jti == jti).first() is not None
+    
+    def get_revocations_since(self, db: Session, since: Optional[datetime] = None) -> List[RevokedToken]:
+        """Revocations for tokens that have not expired yet, optionally only those after `since`."""
+        query = db.query(RevokedToken).filter(RevokedToken.expires_at > datetime.utcnow())
+        if since is not None:
+            query = query.filter(RevokedToken.revoked_at >= since)
+        return query.order_by(RevokedToken.revoked_at).all()
@@ -96,6 +96,21 @@ class AuthService:
     def revoke_refresh_token(self, db: Session, refresh_token: str) -> bool:
         """Revoke a refresh token (logout)."""
         return self.user_repo.revoke_refresh_token(db, refresh_token)
+
+    def revoke_access_token(self, db: Session, payload: dict) -> bool:
+        """Revoke an access token (by its jti) so it stops validating before it expires."""
+        jti = payload.get("jti")
+        if not jti or payload.get("exp") is None:
+            return False
+        self.user_repo.revoke_access_token(
+            db, jti, int(payload.get("sub")), datetime.utcfromtimestamp(payload["exp"])
+        )
+        return True
+    
+    def is_access_token_revoked(self, db: Session, payload: dict) -> bool:
+        """Check an access token's jti against the revocation list."""
+        jti = payload.get("jti")
+        return bool(jti) and self.user_repo.is_token_revoked(db, jti)
     
     def change_password(self, db: Session, user_id: int, current_password: str, new_password: str) -> bool:
         """Change user password."""
@@ -1,11 +1,13 @@
 from passlib.context import CryptContext
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
 from ..config.config import settings
 import secrets
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,36 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
     return pwd_context.verify(plain_password, hashed_password)
 
+def _uses_asymmetric_keys() -> bool:
+    return settings.ALGORITHM.startswith(("RS", "ES"))
+
+@lru_cache(maxsize=1)
+def _private_key_pem() -> str:
+    if settings.JWT_PRIVATE_KEY:
+        return settings.JWT_PRIVATE_KEY
+    if settings.JWT_PRIVATE_KEY_PATH:
+        with open(settings.JWT_PRIVATE_KEY_PATH) as key_file:
+            return key_file.read()
+    raise RuntimeError(f"{settings.ALGORITHM} requires JWT_PRIVATE_KEY or JWT_PRIVATE_KEY_PATH")
+
+def _signing_key():
+    return _private_key_pem() if _uses_asymmetric_keys() else settings.SECRET_KEY
+
+@lru_cache(maxsize=1)
+def _public_key():
+    return jwk.construct(_private_key_pem(), settings.ALGORITHM).public_key()
+
+def _verification_key():
+    return _public_key().to_pem().decode() if _uses_asymmetric_keys() else settings.SECRET_KEY
+
+def get_public_jwks() -> Dict[str, Any]:
+    """Public verification keys for downstream services; empty for shared-secret (HS*) signing."""
+    if not _uses_asymmetric_keys():
+        return {"keys": []}
+    key = _public_key().to_dict()
+    key.update({"kid": settings.JWT_KEY_ID, "use": "sig", "alg": settings.ALGORITHM})
+    return {"keys": [key]}
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -28,8 +60,14 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    # jti lets individual tokens be revoked; kid tells verifiers which published key to use
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "type": "access", "jti": uuid.uuid4().hex})
+    encoded_jwt = jwt.encode(
+        to_encode,
+        _signing_key(),
+        algorithm=settings.ALGORITHM,
+        headers={"kid": settings.JWT_KEY_ID}
+    )
     return encoded_jwt
 
 def create_refresh_token() -> str:
@@ -39,7 +77,7 @@ def create_refresh_token() -> str:
 def verify_token(token: str) -> Dict[str, Any]:
     """Verify and decode a JWT token."""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, _verification_key(), algorithms=[settings.ALGORITHM])
         return payload
     except JWTError as e:
         logger.error(f"JWT verification error: {e}")
@@ -45,7 +45,12 @@ app.include_router(boat_router)
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "boat", "version": "0.1.0"}
+    return {
+        "status": "healthy",
+        "service": "boat",
+        "version": "0.1.0",
+        "auth_cache": auth_client.cache_stats(),
+    }
 
 # Root endpoint
 @app.get("/")
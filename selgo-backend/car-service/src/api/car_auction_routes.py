@@ -1,5 +1,6 @@
 # car-service/src/api/car_auction_routes.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
@@ -7,6 +8,7 @@ from decimal import Decimal
 
 from ..database.database import get_db
 from ..services.car_auction_services import CarAuctionService
+from ..services.auction_events import auction_events
 from ..models.car_auction_schemas import (
     CarAuctionCreate, CarAuctionUpdate, CarAuctionResponse,
     CarAuctionBidCreate, CarAuctionBidResponse,
@@ -52,10 +54,11 @@ async def search_auctions(
     no_reserve: Optional[bool] = Query(None, description="No reserve auctions only"),
     featured_only: Optional[bool] = Query(None, description="Featured auctions only"),
     seller_type: Optional[str] = Query(None, description="Seller type filter"),
-    sort_by: Optional[str] = Query("end_time", description="Sort field"),
+    sort_by: Optional[str] = Query("end_time", description="Sort field: end_time, current_bid or created_at"),
     sort_order: Optional[str] = Query("asc", description="Sort order"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     db: Session = Depends(get_db)
 ):
     """Search car auctions with filters."""
@@ -84,7 +87,8 @@ async def search_auctions(
         sort_by=sort_by,
         sort_order=sort_order,
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        cursor=cursor
     )
     
     service = CarAuctionService(db)
@@ -150,6 +154,49 @@ async def get_auction_bids(
     service = CarAuctionService(db)
     return await service.get_auction_bids(auction_id, page, per_page)
 
+# Live Events
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+@router.get("/notifications/stream")
+async def stream_auction_notifications(user_id: str = Depends(get_current_user_id)):
+    """Server-sent notifications for the auctions the current user watches (bids, outbid, extensions, endings)."""
+    subscription = auction_events.subscribe_user(user_id)
+
+    async def frames():
+        try:
+            async for frame in auction_events.stream(subscription, terminal=False):
+                yield frame
+        finally:
+            auction_events.unsubscribe(subscription)
+
+    return StreamingResponse(frames(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.get("/{auction_id}/events")
+async def stream_auction_events(
+    auction_id: str,
+    db: Session = Depends(get_db)
+):
+    """Server-sent bid, extension and closing events of an auction, starting with its current state."""
+    service = CarAuctionService(db)
+    state = await service.get_auction_state(auction_id)
+    # Streams stay open for minutes; don't hold a pooled connection for them
+    db.close()
+    if not state:
+        raise HTTPException(status_code=404, detail="Auction not found")
+
+    subscription = auction_events.subscribe_auction(state["auction_id"])
+
+    async def frames():
+        try:
+            async for frame in auction_events.stream(subscription, initial=state):
+                yield frame
+                if state["status"] not in (AuctionStatus.ACTIVE.value, AuctionStatus.UPCOMING.value):
+                    break
+        finally:
+            auction_events.unsubscribe(subscription, state["auction_id"])
+
+    return StreamingResponse(frames(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 # Watchlist
 @router.post("/watch", response_model=CarAuctionWatcherResponse, status_code=status.HTTP_201_CREATED)
 async def watch_auction(
@@ -9,6 +9,9 @@ from .database.database import engine, Base
 from .api.routes import router as car_router
 from .models.car_models import *
 from .utils.auth_client import auth_client
+from .services.auction_bidding import auction_bid_engine
+from .services.auction_events import auction_events
+from .services.auction_scheduler import auction_scheduler
 
 # Configure logging
 logging.basicConfig(
@@ -45,7 +48,15 @@ app.include_router(car_router)
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "car", "version": "0.1.0"}
+    return {
+        "status": "healthy",
+        "service": "car",
+        "version": "0.1.0",
+        "auth_cache": auth_client.cache_stats(),
+        "auction_bidding": auction_bid_engine.stats(),
+        "auction_events": auction_events.stats(),
+        "auction_scheduler": auction_scheduler.stats(),
+    }
 
 # Root endpoint
 @app.get("/")
@@ -66,10 +77,25 @@ async def startup_event():
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
+    try:
+        await auction_scheduler.start()
+        logger.info("Auction scheduler started")
+    except Exception as e:
+        logger.error(f"Error starting auction scheduler: {e}")
 
 # Add shutdown event to close auth client
 @app.on_event("shutdown")
 async def shutdown_event():
+    try:
+        await auction_scheduler.stop()
+        logger.info("Auction scheduler stopped")
+    except Exception as e:
+        logger.error(f"Error stopping auction scheduler: {e}")
+    try:
+        await auction_bid_engine.stop()
+        logger.info("Committed queued auction bids")
+    except Exception as e:
+        logger.error(f"Error stopping auction bid sequencers: {e}")
     try:
         await auth_client.close()
         logger.info("Auth client closed successfully")
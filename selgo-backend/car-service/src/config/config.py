@@ -41,6 +41,34 @@ class Settings(BaseSettings):
     # Add this line inside your Settings class
     AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL", "http://localhost:8001")
 
+    # Token validation cache
+    AUTH_CACHE_MAX_SIZE: int = int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000"))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+    # Token verification ("remote" calls auth-service per token, "local" verifies JWTs in-process)
+    AUTH_VERIFY_MODE: str = os.getenv("AUTH_VERIFY_MODE", "remote")
+    AUTH_JWT_ALGORITHM: str = os.getenv("AUTH_JWT_ALGORITHM", "HS256")
+    AUTH_JWT_SECRET: str = os.getenv("AUTH_JWT_SECRET", "")  # Shared key for HS256; RS256 keys come from auth-service JWKS
+    AUTH_REVOCATION_POLL_SECONDS: float = float(os.getenv("AUTH_REVOCATION_POLL_SECONDS", "30"))
+    # Local verification falls back to auth-service while revocations are older than this
+    AUTH_REVOCATION_MAX_STALENESS_SECONDS: float = float(os.getenv("AUTH_REVOCATION_MAX_STALENESS_SECONDS", "90"))
+
+    # Auction bidding: bids committed per transaction, and idle seconds before an auction's sequencer is retired
+    AUCTION_BID_BATCH_SIZE: int = int(os.getenv("AUCTION_BID_BATCH_SIZE", "200"))
+    AUCTION_SEQUENCER_IDLE_SECONDS: float = float(os.getenv("AUCTION_SEQUENCER_IDLE_SECONDS", "60"))
+
+    # Auction event streams: frames per second per client (events in between are merged) and keep-alive interval
+    AUCTION_STREAM_MAX_FPS: float = float(os.getenv("AUCTION_STREAM_MAX_FPS", "4"))
+    AUCTION_STREAM_HEARTBEAT_SECONDS: float = float(os.getenv("AUCTION_STREAM_HEARTBEAT_SECONDS", "15"))
+
+    # Auction lifecycle scheduler: timer resolution, and delay before a failed start/close is retried
+    AUCTION_SCHEDULER_TICK_SECONDS: float = float(os.getenv("AUCTION_SCHEDULER_TICK_SECONDS", "1"))
+    AUCTION_SCHEDULER_RETRY_SECONDS: float = float(os.getenv("AUCTION_SCHEDULER_RETRY_SECONDS", "30"))
+
+    # Marketplace auction stats: seconds they are cached for, and makes listed as popular
+    AUCTION_STATS_TTL_SECONDS: float = float(os.getenv("AUCTION_STATS_TTL_SECONDS", "60"))
+    AUCTION_POPULAR_MAKES: int = int(os.getenv("AUCTION_POPULAR_MAKES", "10"))
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
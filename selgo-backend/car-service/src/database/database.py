@@ -1,6 +1,6 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from ..config.config import settings
 import logging
 
@@ -28,4 +28,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def uses_postgres(db: Session) -> bool:
+    """True when the session is bound to PostgreSQL (indexes and operators SQLite lacks)."""
+    return db.get_bind().dialect.name == "postgresql"
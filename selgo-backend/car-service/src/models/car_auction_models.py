@@ -1,8 +1,8 @@
 # car-service/src/models/car_auction_models.py
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, Text, DECIMAL
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, Text, DECIMAL, Index, Computed
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.sql import func
 import enum
 import uuid
@@ -31,12 +31,29 @@ class PaymentStatus(enum.Enum):
     FAILED = "failed"
     REFUNDED = "refunded"
 
+# 'simple' keeps auction search language-agnostic
+AUCTION_SEARCH_TEXT_CONFIG = "simple"
+
+# Weighted search document: title (A) > description (B)
+AUCTION_SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{AUCTION_SEARCH_TEXT_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{AUCTION_SEARCH_TEXT_CONFIG}', coalesce(description, '')), 'B')"
+)
+
 class CarAuction(Base):
     __tablename__ = 'car_auctions'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('idx_car_auctions_seller_created', 'seller_id', 'created_at'),
+        # Keyset pagination for the search sorts, within a status
+        Index('idx_car_auctions_status_end_time', 'status', 'end_time', 'id'),
+        Index('idx_car_auctions_status_current_bid', 'status', 'current_bid', 'id'),
+        Index('idx_car_auctions_status_created', 'status', 'created_at', 'id'),
+        Index('idx_car_auctions_search_vector', 'search_vector', postgresql_using='gin'),
+        {'extend_existing': True}
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    car_id = Column(Integer, ForeignKey('cars.id', ondelete='CASCADE'), nullable=False)
+    car_id = Column(UUID(as_uuid=True), ForeignKey('cars.id', ondelete='CASCADE'), nullable=False)
     seller_id = Column(UUID(as_uuid=True), nullable=False)  # User ID from auth service
     
     # Auction Details
@@ -59,6 +76,7 @@ class CarAuction(Base):
     status = Column(Enum(AuctionStatus), default=AuctionStatus.UPCOMING)
     is_featured = Column(Boolean, default=False)
     is_reserve_met = Column(Boolean, default=False)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped by every committed bid and update
     
     # Statistics
     total_bids = Column(Integer, default=0)
@@ -91,14 +109,26 @@ class CarAuction(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Full-text document over title and description, generated by Postgres
+    search_vector = deferred(Column(TSVECTOR, Computed(AUCTION_SEARCH_VECTOR_SQL, persisted=True)))
+    
     # Relationships
     car = relationship("Car", backref="auctions")
     bids = relationship("CarAuctionBid", back_populates="auction", cascade="all, delete-orphan")
     watchers = relationship("CarAuctionWatcher", back_populates="auction", cascade="all, delete-orphan")
 
+# Ending-soon lists (the homepage) read active auctions in end_time order straight off this index
+Index(
+    'idx_car_auctions_ending_soon', CarAuction.end_time, CarAuction.id,
+    postgresql_where=CarAuction.status == AuctionStatus.ACTIVE
+)
+
 class CarAuctionBid(Base):
     __tablename__ = 'car_auction_bids'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('idx_car_auction_bids_auction_sequence', 'auction_id', 'sequence'),
+        {'extend_existing': True}
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     auction_id = Column(UUID(as_uuid=True), ForeignKey('car_auctions.id', ondelete='CASCADE'), nullable=False)
@@ -113,6 +143,7 @@ class CarAuctionBid(Base):
     # Status
     status = Column(Enum(BidStatus), default=BidStatus.ACTIVE)
     is_winning = Column(Boolean, default=False)
+    sequence = Column(Integer, nullable=True)  # Auction version this bid was applied at; orders bids
     
     # Bidder Information
     bidder_name = Column(String(255), nullable=True)
@@ -255,4 +286,18 @@ class CarAuctionTransaction(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    auction = relationship("CarAuction", backref="transaction")
\ No newline at end of file
+    auction = relationship("CarAuction", backref="transaction")
+
+class CarAuctionSellerSummary(Base):
+    """Per-seller auction counters, kept up to date on auction state transitions."""
+    __tablename__ = 'car_auction_seller_summaries'
+    __table_args__ = {'extend_existing': True}
+
+    seller_id = Column(UUID(as_uuid=True), primary_key=True)  # User ID from auth service
+    active_auctions = Column(Integer, nullable=False, default=0)  # Upcoming or active
+    completed_auctions = Column(Integer, nullable=False, default=0)  # Ended or sold
+    sold_auctions = Column(Integer, nullable=False, default=0)
+    total_sales = Column(DECIMAL(14, 2), nullable=False, default=0)
+    pending_payments = Column(Integer, nullable=False, default=0)  # Transactions awaiting payment
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
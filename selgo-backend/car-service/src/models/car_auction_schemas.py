@@ -66,7 +66,7 @@ class CarAuctionBase(BaseModel):
         return v
 
 class CarAuctionCreate(CarAuctionBase):
-    car_id: int
+    car_id: UUID
 
 class CarAuctionUpdate(BaseModel):
     title: Optional[str] = None
@@ -86,7 +86,7 @@ class CarAuctionUpdate(BaseModel):
 
 class CarAuctionResponse(CarAuctionBase):
     id: UUID
-    car_id: int
+    car_id: UUID
     seller_id: UUID
     current_bid: Decimal
     status: AuctionStatus
@@ -108,10 +108,11 @@ class CarAuctionResponse(CarAuctionBase):
 
 class CarAuctionListResponse(BaseModel):
     auctions: List[CarAuctionResponse]
-    total: int
+    total: Optional[int] = None  # Only counted for page-numbered requests; None on cursor pages
     page: int
     per_page: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Continues after the last auction; send back as cursor
 
 # Bid Schemas
 class CarAuctionBidBase(BaseModel):
@@ -292,10 +293,11 @@ class CarAuctionSearchFilters(BaseModel):
 class CarAuctionSearchRequest(BaseModel):
     query: Optional[str] = None
     filters: Optional[CarAuctionSearchFilters] = None
-    sort_by: Optional[str] = "end_time"
+    sort_by: Optional[str] = "end_time"  # end_time, current_bid or created_at
     sort_order: Optional[str] = "asc"
     page: int = 1
     per_page: int = 20
+    cursor: Optional[str] = None  # next_cursor of the previous page; takes precedence over page
 
 # Statistics Schemas
 class CarAuctionStats(BaseModel):
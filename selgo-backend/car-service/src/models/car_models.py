@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, Table, Text, Index, DECIMAL, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, Table, Text, Index, DECIMAL, JSON, DDL, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
@@ -203,6 +203,15 @@ class Car(Base):
     financing_options = relationship("CarFinancing", back_populates="car", cascade="all, delete-orphan")
     inquiries = relationship("CarInquiry", back_populates="car", cascade="all, delete-orphan")
 
+    # Trigram indexes serve the substring make/model filters and auction text search
+    __table_args__ = tuple(
+        Index(f'idx_car_{column}_trgm', column, postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+        for column in ('make', 'model')
+    )
+
+# Trigram operator classes for the make/model indexes
+event.listen(Car.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
 class CarImage(Base):
     __tablename__ = 'car_images'
 
@@ -0,0 +1,396 @@
+# car-service/src/services/auction_bidding.py
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, update, desc
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from fastapi import HTTPException
+from datetime import datetime, timedelta
+from decimal import Decimal
+import asyncio
+import logging
+import uuid
+
+from ..config.config import settings
+from ..database.database import SessionLocal
+from ..models.car_auction_models import CarAuction, CarAuctionBid, AuctionStatus, BidStatus
+from .auction_events import auction_event, auction_events
+from .auction_stats import adjust_seller_summary
+
+logger = logging.getLogger(__name__)
+
+# Batches re-applied after a version conflict before the bids are rejected
+MAX_CONFLICT_RETRIES = 3
+
+
+class VersionConflict(Exception):
+    """The auction row changed since its book was loaded."""
+
+
+class AuctionBook:
+    """
+    In-memory state of one auction, owned by its sequencer.
+
+    Bids are applied here in arrival order; the resulting bid rows and
+    auction changes are kept pending until flush() writes them in one
+    transaction, guarded by the auction's version.
+    """
+
+    def __init__(self, auction: CarAuction, bidders: Set[str], leader: Optional[CarAuctionBid]):
+        self.auction_id = auction.id
+        self.seller_id = str(auction.seller_id)
+        self.status = self.persisted_status = auction.status
+        self.current_bid = Decimal(auction.current_bid or 0)
+        self.bid_increment = Decimal(auction.bid_increment or 0)
+        self.reserve_price = auction.reserve_price
+        self.buy_now_price = auction.buy_now_price
+        self.end_time = auction.end_time
+        self.auto_extend_minutes = auction.auto_extend_minutes or 0
+        self.is_reserve_met = bool(auction.is_reserve_met)
+        self.total_bids = auction.total_bids or 0
+        self.unique_bidders = auction.unique_bidders or 0
+        self.winning_bid = auction.winning_bid
+        self.winning_bidder_id = str(auction.winning_bidder_id) if auction.winning_bidder_id else None
+        self.sold_at = auction.sold_at
+        self.version = self.persisted_version = auction.version or 0
+        self.bidders = bidders
+
+        # Current high bidder and the most their proxy bid will go to
+        self.leader_id = str(leader.bidder_id) if leader else None
+        self.leader_max = max(leader.max_bid or leader.bid_amount, leader.bid_amount) if leader else None
+        self.leader_bid_id = leader.id if leader else None
+
+        self.new_rows: Dict[uuid.UUID, Dict[str, Any]] = {}
+        self.superseded: Set[uuid.UUID] = set()
+        self.events: List[Dict[str, Any]] = []
+
+    @classmethod
+    def load(cls, db: Session, auction_id) -> Optional["AuctionBook"]:
+        auction = db.query(CarAuction).filter(CarAuction.id == auction_id).first()
+        if not auction:
+            return None
+        bidders = {
+            str(bidder_id) for (bidder_id,) in
+            db.query(CarAuctionBid.bidder_id).filter(CarAuctionBid.auction_id == auction_id).distinct()
+        }
+        leader = db.query(CarAuctionBid).filter(
+            CarAuctionBid.auction_id == auction_id,
+            CarAuctionBid.is_winning == True
+        ).order_by(desc(CarAuctionBid.sequence), desc(CarAuctionBid.created_at)).first()
+        return cls(auction, bidders, leader)
+
+    def apply(self, bidder_id: str, bid_amount: Decimal, max_bid: Optional[Decimal], now: datetime) -> Dict[str, Any]:
+        """Apply one bid; returns the bidder's bid row as of this point."""
+        if self.status != AuctionStatus.ACTIVE:
+            raise HTTPException(status_code=400, detail="Auction is not active")
+        if str(bidder_id) == self.seller_id:
+            raise HTTPException(status_code=400, detail="Cannot bid on your own auction")
+        if now > self.end_time:
+            raise HTTPException(status_code=400, detail="Auction has ended")
+
+        min_bid = self.current_bid + self.bid_increment
+        if bid_amount < min_bid:
+            raise HTTPException(status_code=400, detail=f"Bid must be at least {min_bid}")
+
+        bidder_id = str(bidder_id)
+        if bidder_id not in self.bidders:
+            self.bidders.add(bidder_id)
+            self.unique_bidders += 1
+        ceiling = max(max_bid or bid_amount, bid_amount)
+        is_proxy = max_bid is not None and max_bid > bid_amount
+
+        if self.buy_now_price and bid_amount >= self.buy_now_price:
+            self._outbid(bidder_id)
+            self._supersede_leader()
+            row = self._add_row(bidder_id, self.buy_now_price, max_bid, is_proxy, False, BidStatus.WON, now)
+            self._lead(bidder_id, self.buy_now_price, ceiling, row)
+            self.status = AuctionStatus.SOLD
+            self.winning_bid = self.buy_now_price
+            self.sold_at = now
+            self.events.append(auction_event(
+                "sold", self.auction_id, winning_bid=self.winning_bid,
+                winning_bidder_id=bidder_id, sequence=self.version
+            ))
+            return dict(row)
+
+        if self.leader_id is None or self.leader_id == bidder_id:
+            # Opening bid, or the high bidder raising their own bid
+            if self.leader_id == bidder_id:
+                ceiling = max(ceiling, self.leader_max)
+            self._supersede_leader()
+            row = self._add_row(bidder_id, bid_amount, max_bid, is_proxy, False, BidStatus.WINNING, now)
+            self._lead(bidder_id, bid_amount, ceiling, row)
+            response = dict(row)
+        elif ceiling > self.leader_max:
+            # Challenger beats the leader's proxy; the leader's proxy is recorded at its limit
+            if self.leader_max > self.current_bid:
+                self._add_row(self.leader_id, self.leader_max, self.leader_max, True, True, BidStatus.OUTBID, now, winning=False)
+            self._outbid(bidder_id)
+            self._supersede_leader()
+            price = min(ceiling, max(bid_amount, self.leader_max + self.bid_increment))
+            row = self._add_row(bidder_id, price, max_bid, is_proxy, False, BidStatus.WINNING, now)
+            self._lead(bidder_id, price, ceiling, row)
+            response = dict(row)
+        else:
+            # The leader's proxy outbids the challenger straight away; ties go to the earlier bid
+            response = dict(self._add_row(bidder_id, bid_amount, max_bid, is_proxy, False, BidStatus.OUTBID, now, winning=False))
+            price = min(self.leader_max, ceiling + self.bid_increment)
+            leader_id, leader_max = self.leader_id, self.leader_max
+            self._supersede_leader()
+            row = self._add_row(leader_id, price, leader_max, True, True, BidStatus.WINNING, now)
+            self._lead(leader_id, price, leader_max, row)
+            self.events.append(auction_event("outbid", self.auction_id, user_id=bidder_id, current_bid=price, sequence=self.version))
+
+        if self.reserve_price and self.current_bid >= self.reserve_price:
+            self.is_reserve_met = True
+
+        self.events.append(auction_event(
+            "bid", self.auction_id, current_bid=self.current_bid, winning_bidder_id=self.leader_id,
+            total_bids=self.total_bids, unique_bidders=self.unique_bidders,
+            is_reserve_met=self.is_reserve_met, end_time=self.end_time, sequence=self.version
+        ))
+
+        # Anti-sniping: a bid in the final minutes pushes the end back
+        extend = timedelta(minutes=self.auto_extend_minutes)
+        if extend and self.end_time - now < extend:
+            self.end_time = now + extend
+            self.events.append(auction_event("extended", self.auction_id, end_time=self.end_time, sequence=self.version))
+        return response
+
+    def _add_row(self, bidder_id: str, amount: Decimal, max_bid: Optional[Decimal], is_proxy: bool,
+                 is_auto: bool, bid_status: BidStatus, now: datetime, winning: bool = True) -> Dict[str, Any]:
+        self.version += 1
+        self.total_bids += 1
+        row = {
+            "id": uuid.uuid4(),
+            "auction_id": self.auction_id,
+            "bidder_id": uuid.UUID(bidder_id),
+            "bid_amount": amount,
+            "max_bid": max_bid,
+            "is_proxy_bid": is_proxy,
+            "is_auto_bid": is_auto,
+            "status": bid_status,
+            "is_winning": winning,
+            "sequence": self.version,
+            "bidder_name": None,
+            "bidder_location": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        self.new_rows[row["id"]] = row
+        return row
+
+    def _lead(self, bidder_id: str, price: Decimal, ceiling: Decimal, row: Dict[str, Any]) -> None:
+        self.leader_id = self.winning_bidder_id = bidder_id
+        self.leader_max = ceiling
+        self.leader_bid_id = row["id"]
+        self.current_bid = price
+
+    def _outbid(self, bidder_id: str) -> None:
+        """Record that the current leader lost the lead to bidder_id."""
+        if self.leader_id is not None and self.leader_id != bidder_id:
+            self.events.append(auction_event(
+                "outbid", self.auction_id, user_id=self.leader_id, sequence=self.version
+            ))
+
+    def _supersede_leader(self) -> None:
+        bid_id = self.leader_bid_id
+        if bid_id is None:
+            return
+        row = self.new_rows.get(bid_id)
+        if row is not None:
+            row["is_winning"] = False
+            row["status"] = BidStatus.OUTBID
+        else:
+            self.superseded.add(bid_id)
+        self.leader_bid_id = None
+
+    def flush(self, db: Session) -> None:
+        """Write pending bids and auction state in one transaction."""
+        if self.version == self.persisted_version:
+            return
+        now = datetime.utcnow()
+        if self.new_rows:
+            db.execute(insert(CarAuctionBid), list(self.new_rows.values()))
+        if self.superseded:
+            db.execute(
+                update(CarAuctionBid)
+                .where(CarAuctionBid.id.in_(self.superseded))
+                .values(is_winning=False, status=BidStatus.OUTBID, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        result = db.execute(
+            update(CarAuction)
+            .where(CarAuction.id == self.auction_id, CarAuction.version == self.persisted_version)
+            .values(
+                current_bid=self.current_bid,
+                winning_bidder_id=uuid.UUID(self.winning_bidder_id) if self.winning_bidder_id else None,
+                winning_bid=self.winning_bid,
+                sold_at=self.sold_at,
+                status=self.status,
+                end_time=self.end_time,
+                is_reserve_met=self.is_reserve_met,
+                total_bids=self.total_bids,
+                unique_bidders=self.unique_bidders,
+                version=self.version,
+                updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            raise VersionConflict()
+        if self.status == AuctionStatus.SOLD and self.persisted_status != AuctionStatus.SOLD:
+            adjust_seller_summary(
+                db, uuid.UUID(self.seller_id), active_auctions=-1, completed_auctions=1,
+                sold_auctions=1, total_sales=self.winning_bid
+            )
+        db.commit()
+        self.persisted_version = self.version
+        self.persisted_status = self.status
+        self.new_rows = {}
+        self.superseded = set()
+
+
+class AuctionSequencer:
+    """Single writer for one auction: takes queued bids in order and commits them in batches."""
+
+    def __init__(self, engine: "AuctionBidEngine", auction_id: uuid.UUID):
+        self.engine = engine
+        self.auction_id = auction_id
+        self.key = str(auction_id)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.book: Optional[AuctionBook] = None
+        self.reload = False
+        self.closed = False
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                first = await asyncio.wait_for(self.queue.get(), timeout=self.engine.idle_seconds)
+            except asyncio.TimeoutError:
+                if self.queue.empty():
+                    break
+                continue
+            if first is None:
+                break
+            batch = [first]
+            while len(batch) < self.engine.batch_size and not self.queue.empty():
+                request = self.queue.get_nowait()
+                if request is None:
+                    self.queue.put_nowait(None)
+                    break
+                batch.append(request)
+
+            try:
+                outcomes, events = await loop.run_in_executor(None, self._commit, batch)
+            except Exception as e:
+                logger.error(f"Failed to commit {len(batch)} bids on auction {self.auction_id}: {e}")
+                failure = e if isinstance(e, HTTPException) else HTTPException(status_code=500, detail="Failed to place bid")
+                outcomes, events = [failure] * len(batch), []
+            for (_, _, _, future), outcome in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+            auction_events.publish(self.auction_id, events)
+
+        self.closed = True
+        self.engine._retire(self)
+
+    def _commit(self, batch: List[Tuple]) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """Apply a batch to the book and persist it; returns per-bid outcomes and the committed events."""
+        db = self.engine._session_factory()
+        try:
+            for _ in range(MAX_CONFLICT_RETRIES):
+                if self.book is None or self.reload:
+                    self.reload = False
+                    self.book = AuctionBook.load(db, self.auction_id)
+                if self.book is None:
+                    return [HTTPException(status_code=404, detail="Auction not found")] * len(batch), []
+
+                outcomes = []
+                now = datetime.utcnow()
+                for bidder_id, bid_amount, max_bid, _ in batch:
+                    try:
+                        outcomes.append(self.book.apply(bidder_id, bid_amount, max_bid, now))
+                    except HTTPException as e:
+                        outcomes.append(e)
+                try:
+                    self.book.flush(db)
+                    self.engine.committed += sum(not isinstance(outcome, Exception) for outcome in outcomes)
+                    events, self.book.events = self.book.events, []
+                    return outcomes, events
+                except VersionConflict:
+                    # Changed by another worker or an auction update; replay the batch on fresh state
+                    db.rollback()
+                    self.book = None
+                    self.engine.conflicts += 1
+            return [HTTPException(status_code=409, detail="Auction is busy, please retry")] * len(batch), []
+        except Exception:
+            db.rollback()
+            self.book = None
+            raise
+        finally:
+            db.close()
+
+
+class AuctionBidEngine:
+    """
+    Per-auction bid sequencers, created on the first bid and retired when idle.
+
+    All bids on an auction go through its sequencer, so they are validated
+    and applied one after another without row locks; the bids that queue up
+    while a batch is being committed form the next batch. The version check
+    on car_auctions catches writes from other processes or auction updates,
+    in which case the batch is replayed on freshly loaded state.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 batch_size: Optional[int] = None, idle_seconds: Optional[float] = None):
+        self._session_factory = session_factory
+        self.batch_size = batch_size or settings.AUCTION_BID_BATCH_SIZE
+        self.idle_seconds = idle_seconds or settings.AUCTION_SEQUENCER_IDLE_SECONDS
+        self._sequencers: Dict[str, AuctionSequencer] = {}
+        self.committed = 0
+        self.conflicts = 0
+
+    async def submit(self, auction_id, bidder_id: str, bid_amount: Decimal, max_bid: Optional[Decimal] = None) -> Dict[str, Any]:
+        """Queue a bid on the auction's sequencer and wait until it is committed or rejected."""
+        auction_id = auction_id if isinstance(auction_id, uuid.UUID) else uuid.UUID(str(auction_id))
+        sequencer = self._sequencers.get(str(auction_id))
+        if sequencer is None or sequencer.closed:
+            sequencer = self._sequencers[str(auction_id)] = AuctionSequencer(self, auction_id)
+        future = asyncio.get_running_loop().create_future()
+        sequencer.queue.put_nowait((bidder_id, bid_amount, max_bid, future))
+        return await future
+
+    def invalidate(self, auction_id) -> None:
+        """Reload the auction before its next batch, after it was changed outside the sequencer."""
+        sequencer = self._sequencers.get(str(auction_id))
+        if sequencer is not None:
+            sequencer.reload = True
+
+    def _retire(self, sequencer: AuctionSequencer) -> None:
+        if self._sequencers.get(sequencer.key) is sequencer:
+            del self._sequencers[sequencer.key]
+
+    async def stop(self) -> None:
+        """Commit the bids still queued and stop every sequencer."""
+        sequencers = list(self._sequencers.values())
+        for sequencer in sequencers:
+            sequencer.queue.put_nowait(None)
+        await asyncio.gather(*(sequencer.task for sequencer in sequencers), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active_auctions": len(self._sequencers),
+            "queued_bids": sum(sequencer.queue.qsize() for sequencer in self._sequencers.values()),
+            "committed_bids": self.committed,
+            "version_conflicts": self.conflicts
+        }
+
+
+# Process-wide sequencers; one writer per auction in this process
+auction_bid_engine = AuctionBidEngine()
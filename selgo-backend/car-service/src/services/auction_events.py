@@ -0,0 +1,212 @@
+# car-service/src/services/auction_events.py
+from sqlalchemy.orm import Session
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Set
+from collections import OrderedDict
+from datetime import datetime
+import asyncio
+import json
+import logging
+
+from ..config.config import settings
+from ..database.database import SessionLocal
+from ..models.car_auction_models import CarAuctionWatcher
+
+logger = logging.getLogger(__name__)
+
+# Auction event type -> AuctionNotification type and message for watchers
+NOTIFICATION_TYPES = {
+    "started": ("auction_started", "An auction you are watching has started"),
+    "bid": ("bid_placed", "A new bid was placed on an auction you are watching"),
+    "outbid": ("outbid", "You have been outbid"),
+    "extended": ("auction_extended", "The auction was extended after a late bid"),
+    "closed": ("auction_ended", "An auction you are watching has ended"),
+    "sold": ("auction_won", "An auction you are watching has been sold")
+}
+
+# Events after which an auction stream has nothing more to send
+TERMINAL_EVENTS = {"closed", "sold"}
+
+
+def auction_event(event_type: str, auction_id, **data) -> Dict[str, Any]:
+    return {"type": event_type, "auction_id": str(auction_id), "at": datetime.utcnow(), **data}
+
+
+class Subscription:
+    """
+    One connected client. Events are merged by key until the client's next
+    frame, so a burst of bids is sent as the latest state at most max_fps
+    times per second instead of once per bid.
+    """
+
+    def __init__(self, user_id: Any = None, max_fps: float = 4):
+        self.user_id = user_id
+        self.interval = 1 / max_fps
+        self._pending: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self.coalesced = 0
+
+    def push(self, key: Hashable, event: Dict[str, Any]) -> None:
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = event
+        self._ready.set()
+
+    async def frames(self, heartbeat: float) -> AsyncIterator[Optional[List[Dict[str, Any]]]]:
+        """Batches of pending events; None when idle for heartbeat seconds."""
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            self._ready.clear()
+            events, self._pending = list(self._pending.values()), OrderedDict()
+            yield events
+            await asyncio.sleep(self.interval)
+
+
+class AuctionEventHub:
+    """
+    Fans committed auction events out to connected clients.
+
+    Auction streams get the public events (bid, extended, closing) of one
+    auction. Notification streams belong to a user and get the events of
+    auctions they watch, filtered by the watcher's notify_on_bid /
+    notify_on_outbid flags; those flags are read for all connected users
+    with one query per published batch.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 max_fps: Optional[float] = None, heartbeat: Optional[float] = None):
+        self._session_factory = session_factory
+        self.max_fps = max_fps or settings.AUCTION_STREAM_MAX_FPS
+        self.heartbeat = heartbeat or settings.AUCTION_STREAM_HEARTBEAT_SECONDS
+        self._auction_subscriptions: Dict[str, Set[Subscription]] = {}
+        self._user_subscriptions: Dict[str, Set[Subscription]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._listeners: List[Callable[[Any, List[Dict[str, Any]]], None]] = []
+        self.published = 0
+
+    def subscribe_auction(self, auction_id) -> Subscription:
+        subscription = Subscription(max_fps=self.max_fps)
+        self._auction_subscriptions.setdefault(str(auction_id), set()).add(subscription)
+        return subscription
+
+    def subscribe_user(self, user_id) -> Subscription:
+        subscription = Subscription(user_id, max_fps=self.max_fps)
+        self._user_subscriptions.setdefault(str(user_id), set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription, auction_id=None) -> None:
+        registry, key = (
+            (self._auction_subscriptions, str(auction_id)) if auction_id is not None
+            else (self._user_subscriptions, str(subscription.user_id))
+        )
+        subscriptions = registry.get(key)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del registry[key]
+
+    def add_listener(self, listener: Callable[[Any, List[Dict[str, Any]]], None]) -> None:
+        """Call listener(auction_id, events) with every published batch, before clients get it."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Any, List[Dict[str, Any]]], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def publish(self, auction_id, events: List[Dict[str, Any]]) -> None:
+        """Deliver the events of one committed batch; called from the event loop."""
+        if not events:
+            return
+        self.published += len(events)
+        for listener in self._listeners:
+            try:
+                listener(auction_id, events)
+            except Exception as e:
+                logger.error(f"Auction event listener failed on auction {auction_id}: {e}")
+        subscriptions = self._auction_subscriptions.get(str(auction_id))
+        if subscriptions:
+            public = [event for event in events if event["type"] != "outbid"]
+            for subscription in subscriptions:
+                for event in public:
+                    subscription.push(event["type"], event)
+
+        if self._user_subscriptions:
+            task = asyncio.create_task(self._notify_watchers(auction_id, events))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _notify_watchers(self, auction_id, events: List[Dict[str, Any]]) -> None:
+        user_ids = [next(iter(subscriptions)).user_id for subscriptions in self._user_subscriptions.values()]
+        try:
+            watchers = await asyncio.get_running_loop().run_in_executor(
+                None, self._watcher_preferences, auction_id, user_ids
+            )
+        except Exception as e:
+            logger.error(f"Failed to load watchers of auction {auction_id}: {e}")
+            return
+
+        for user_id, (notify_on_bid, notify_on_outbid) in watchers.items():
+            subscriptions = self._user_subscriptions.get(user_id)
+            if not subscriptions:
+                continue
+            for event in events:
+                if event["type"] == "outbid" and not (notify_on_outbid and event["user_id"] == user_id):
+                    continue
+                if event["type"] == "bid" and not notify_on_bid:
+                    continue
+                notification_type, message = NOTIFICATION_TYPES.get(event["type"], (event["type"], event["type"]))
+                notification = {
+                    "type": notification_type,
+                    "auction_id": event["auction_id"],
+                    "message": message,
+                    "data": event,
+                    "created_at": event["at"]
+                }
+                for subscription in subscriptions:
+                    subscription.push((event["auction_id"], event["type"]), notification)
+
+    def _watcher_preferences(self, auction_id, user_ids: List[Any]) -> Dict[str, tuple]:
+        db = self._session_factory()
+        try:
+            rows = db.query(
+                CarAuctionWatcher.user_id, CarAuctionWatcher.notify_on_bid, CarAuctionWatcher.notify_on_outbid
+            ).filter(
+                CarAuctionWatcher.auction_id == auction_id,
+                CarAuctionWatcher.user_id.in_(user_ids)
+            ).all()
+            return {str(user_id): (notify_on_bid, notify_on_outbid) for user_id, notify_on_bid, notify_on_outbid in rows}
+        finally:
+            db.close()
+
+    async def stream(self, subscription: Subscription, initial: Optional[Dict[str, Any]] = None,
+                     terminal: bool = True) -> AsyncIterator[str]:
+        """Server-sent events for a subscription; ends after a closing event when terminal."""
+        if initial is not None:
+            yield self._frame([initial])
+        async for events in subscription.frames(self.heartbeat):
+            if events is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield self._frame(events)
+            if terminal and any(event["type"] in TERMINAL_EVENTS for event in events):
+                return
+
+    @staticmethod
+    def _frame(events: List[Dict[str, Any]]) -> str:
+        return f"event: auction\ndata: {json.dumps(events, default=str)}\n\n"
+
+    def stats(self) -> Dict[str, Any]:
+        auction_clients = sum(len(subscriptions) for subscriptions in self._auction_subscriptions.values())
+        return {
+            "auctions_streamed": len(self._auction_subscriptions),
+            "auction_clients": auction_clients,
+            "notification_clients": sum(len(subscriptions) for subscriptions in self._user_subscriptions.values()),
+            "published_events": self.published
+        }
+
+
+# Process-wide hub; it sees the events committed by this process's auction sequencers
+auction_events = AuctionEventHub()
@@ -0,0 +1,349 @@
+# car-service/src/services/auction_scheduler.py
+from sqlalchemy.orm import Session
+from sqlalchemy import update, desc
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+import asyncio
+import logging
+import math
+import uuid
+
+from ..config.config import settings
+from ..database.database import SessionLocal
+from ..models.car_auction_models import (
+    CarAuction, CarAuctionBid, CarAuctionTransaction, AuctionStatus, BidStatus
+)
+from .auction_bidding import auction_bid_engine
+from .auction_events import auction_event, auction_events
+from .auction_stats import adjust_seller_summary
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel keyed by hashable timer ids.
+
+    Level 0 has one slot per tick; each coarser level has slots spanning a
+    whole turn of the level below and is cascaded down when that level
+    wraps. Scheduling, rescheduling and cancelling are O(1), and a timer is
+    moved at most once per level before it fires.
+    """
+
+    LEVEL_BITS = (8, 6, 6, 6)
+
+    def __init__(self, tick: int):
+        self.tick = tick
+        self._shifts = [sum(self.LEVEL_BITS[:level]) for level in range(len(self.LEVEL_BITS))]
+        self._levels: List[List[Dict[Hashable, int]]] = [[{} for _ in range(1 << bits)] for bits in self.LEVEL_BITS]
+        self._where: Dict[Hashable, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def schedule(self, key: Hashable, deadline: int) -> None:
+        """Expire key at tick deadline, or on the next tick if that has passed; replaces its earlier timer."""
+        self.cancel(key)
+        self._place(key, max(deadline, self.tick + 1))
+
+    def cancel(self, key: Hashable) -> bool:
+        where = self._where.pop(key, None)
+        if where is None:
+            return False
+        level, slot = where
+        del self._levels[level][slot][key]
+        return True
+
+    def _place(self, key: Hashable, deadline: int) -> None:
+        delta = deadline - self.tick
+        level = 0
+        while level < len(self.LEVEL_BITS) - 1 and delta >= 1 << (self._shifts[level] + self.LEVEL_BITS[level]):
+            level += 1
+        slot = (deadline >> self._shifts[level]) & ((1 << self.LEVEL_BITS[level]) - 1)
+        self._levels[level][slot][key] = deadline
+        self._where[key] = (level, slot)
+
+    def advance(self, to_tick: int) -> List[Hashable]:
+        """Move the wheel to to_tick; returns the keys that expired on the way, in order."""
+        expired = []
+        while self.tick < to_tick:
+            self.tick += 1
+            # Coarse slots starting at this tick move down before level 0 expires
+            for level in range(len(self.LEVEL_BITS) - 1, 0, -1):
+                if self.tick & ((1 << self._shifts[level]) - 1) == 0:
+                    slot = (self.tick >> self._shifts[level]) & ((1 << self.LEVEL_BITS[level]) - 1)
+                    timers, self._levels[level][slot] = self._levels[level][slot], {}
+                    for key, deadline in timers.items():
+                        self._place(key, deadline)
+            slot = self._levels[0][self.tick & ((1 << self.LEVEL_BITS[0]) - 1)]
+            for key in [key for key, deadline in slot.items() if deadline <= self.tick]:
+                del slot[key]
+                del self._where[key]
+                expired.append(key)
+        return expired
+
+
+class AuctionScheduler:
+    """
+    Starts and closes auctions at their start_time and end_time.
+
+    Every UPCOMING and ACTIVE auction has one timer in a TimerWheel. Timers
+    are loaded from car_auctions on startup, and auction writes and
+    anti-sniping extensions keep them current. Each transition is an UPDATE
+    guarded by the auction's status and version, so it happens once even
+    when several workers run a scheduler. Closing settles the winner against
+    the reserve and creates the CarAuctionTransaction in the same commit.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 tick_seconds: Optional[float] = None, retry_seconds: Optional[float] = None):
+        self._session_factory = session_factory
+        self.tick_seconds = tick_seconds or settings.AUCTION_SCHEDULER_TICK_SECONDS
+        self.retry_seconds = retry_seconds or settings.AUCTION_SCHEDULER_RETRY_SECONDS
+        self._wheel = TimerWheel(self._tick(datetime.utcnow(), math.floor))
+        self._kinds: Dict[str, str] = {}  # auction id -> "start" or "close"
+        self._task: Optional[asyncio.Task] = None
+        self.started = 0
+        self.closed = 0
+
+    def _tick(self, when: datetime, rounding: Callable[[float], float] = math.ceil) -> int:
+        return int(rounding((when - EPOCH).total_seconds() / self.tick_seconds))
+
+    def schedule(self, kind: str, auction_id, when: datetime) -> None:
+        """Start or close the auction at when; replaces its pending timer."""
+        key = str(auction_id)
+        self._kinds[key] = kind
+        self._wheel.schedule(key, self._tick(when))
+
+    def schedule_auction(self, auction: CarAuction) -> None:
+        """(Re)schedule an auction after it was created or updated."""
+        if auction.status == AuctionStatus.UPCOMING:
+            self.schedule("start", auction.id, auction.start_time)
+        elif auction.status == AuctionStatus.ACTIVE:
+            self.schedule("close", auction.id, auction.end_time)
+        else:
+            self.unschedule(auction.id)
+
+    def unschedule(self, auction_id) -> None:
+        key = str(auction_id)
+        self._kinds.pop(key, None)
+        self._wheel.cancel(key)
+
+    def _on_events(self, auction_id, events: List[Dict[str, Any]]) -> None:
+        """Follow the auction's end through committed bids."""
+        key = str(auction_id)
+        for event in events:
+            if event["type"] == "extended":
+                self.schedule("close", key, event["end_time"])
+            elif event["type"] == "sold" and self._kinds.get(key) == "close":
+                # Bought outright: settle now instead of at the end time
+                self.schedule("close", key, datetime.utcnow())
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            auction_events.add_listener(self._on_events)
+            await self._recover()
+            self._task = asyncio.create_task(self._run())
+
+    async def _recover(self) -> None:
+        """Schedule every auction still to start or close; overdue ones fire on the first tick."""
+        auctions = await asyncio.get_running_loop().run_in_executor(None, self._load_pending)
+        for auction_id, auction_status, start_time, end_time in auctions:
+            if auction_status == AuctionStatus.UPCOMING:
+                self.schedule("start", auction_id, start_time)
+            else:
+                self.schedule("close", auction_id, end_time)
+        logger.info(f"Scheduled {len(auctions)} pending auctions")
+
+    def _load_pending(self) -> List[Tuple]:
+        db = self._session_factory()
+        try:
+            return db.query(
+                CarAuction.id, CarAuction.status, CarAuction.start_time, CarAuction.end_time
+            ).filter(
+                CarAuction.status.in_([AuctionStatus.UPCOMING, AuctionStatus.ACTIVE])
+            ).all()
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            due = [
+                (self._kinds.pop(key), key)
+                for key in self._wheel.advance(self._tick(datetime.utcnow(), math.floor))
+            ]
+            if not due:
+                continue
+            actions = await loop.run_in_executor(None, self._fire, due)
+            for action in actions:
+                if action[0] == "schedule":
+                    self.schedule(*action[1:])
+                else:
+                    _, auction_id, events = action
+                    auction_bid_engine.invalidate(auction_id)
+                    auction_events.publish(auction_id, events)
+
+    def _fire(self, due: List[Tuple[str, str]]) -> List[Tuple]:
+        """Apply due transitions, each in its own transaction; returns the timers and events that follow."""
+        actions = []
+        for kind, key in due:
+            db = self._session_factory()
+            try:
+                auction_id = uuid.UUID(key)
+                actions.extend(self._start(db, auction_id) if kind == "start" else self._close(db, auction_id))
+            except Exception as e:
+                logger.error(f"Failed to {kind} auction {key}: {e}")
+                db.rollback()
+                actions.append(("schedule", kind, key, datetime.utcnow() + timedelta(seconds=self.retry_seconds)))
+            finally:
+                db.close()
+        return actions
+
+    def _start(self, db: Session, auction_id: uuid.UUID) -> List[Tuple]:
+        now = datetime.utcnow()
+        started = db.execute(
+            update(CarAuction)
+            .where(
+                CarAuction.id == auction_id,
+                CarAuction.status == AuctionStatus.UPCOMING,
+                CarAuction.start_time <= now
+            )
+            .values(status=AuctionStatus.ACTIVE, version=CarAuction.version + 1, updated_at=now)
+            .returning(CarAuction.end_time)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if started is None:
+            # Moved to a later start, cancelled, or started by another worker
+            db.rollback()
+            auction = db.query(CarAuction).filter(CarAuction.id == auction_id).first()
+            if auction is None:
+                return []
+            if auction.status == AuctionStatus.UPCOMING:
+                return [("schedule", "start", auction_id, auction.start_time)]
+            if auction.status == AuctionStatus.ACTIVE:
+                return [("schedule", "close", auction_id, auction.end_time)]
+            return []
+        db.commit()
+        self.started += 1
+        return [
+            ("schedule", "close", auction_id, started.end_time),
+            ("publish", auction_id, [auction_event("started", auction_id, end_time=started.end_time)])
+        ]
+
+    def _close(self, db: Session, auction_id: uuid.UUID) -> List[Tuple]:
+        now = datetime.utcnow()
+        auction = db.query(CarAuction).filter(CarAuction.id == auction_id).first()
+        if auction is None or auction.status not in (AuctionStatus.ACTIVE, AuctionStatus.SOLD):
+            return []
+        if auction.status == AuctionStatus.ACTIVE and auction.end_time > now:
+            # Extended by a late bid committed by another worker
+            return [("schedule", "close", auction_id, auction.end_time)]
+        if auction.status == AuctionStatus.SOLD and db.query(CarAuctionTransaction.id).filter(
+            CarAuctionTransaction.auction_id == auction_id
+        ).first():
+            return []
+
+        winner = db.query(CarAuctionBid).filter(
+            CarAuctionBid.auction_id == auction_id,
+            CarAuctionBid.is_winning == True
+        ).order_by(desc(CarAuctionBid.sequence), desc(CarAuctionBid.created_at)).first()
+        was_active = auction.status == AuctionStatus.ACTIVE
+        sold = not was_active or (
+            winner is not None and (auction.reserve_price is None or winner.bid_amount >= auction.reserve_price)
+        )
+
+        values = {"version": CarAuction.version + 1, "updated_at": now}
+        if was_active:
+            values["status"] = AuctionStatus.SOLD if sold else AuctionStatus.ENDED
+            if sold:
+                values.update(winning_bidder_id=winner.bidder_id, winning_bid=winner.bid_amount, sold_at=now)
+        settled = db.execute(
+            update(CarAuction)
+            .where(
+                CarAuction.id == auction_id,
+                CarAuction.status == auction.status,
+                CarAuction.version == auction.version
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if settled.rowcount != 1:
+            # A bid or another worker got in first; look again on the next tick
+            db.rollback()
+            return [("schedule", "close", auction_id, now)]
+
+        if sold and winner is not None:
+            db.execute(
+                update(CarAuctionBid)
+                .where(CarAuctionBid.id == winner.id)
+                .values(status=BidStatus.WON, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        lost = update(CarAuctionBid).where(
+            CarAuctionBid.auction_id == auction_id,
+            CarAuctionBid.status.in_([BidStatus.ACTIVE, BidStatus.WINNING, BidStatus.OUTBID])
+        )
+        if sold and winner is not None:
+            lost = lost.where(CarAuctionBid.id != winner.id)
+        db.execute(lost.values(status=BidStatus.LOST, updated_at=now).execution_options(synchronize_session=False))
+
+        events = []
+        if was_active:
+            adjust_seller_summary(
+                db, auction.seller_id, active_auctions=-1, completed_auctions=1,
+                **({"sold_auctions": 1, "total_sales": winner.bid_amount} if sold else {})
+            )
+        if sold:
+            final_bid = Decimal(winner.bid_amount if was_active else auction.winning_bid)
+            buyers_premium = (final_bid * Decimal(auction.buyers_premium_percent or 0) / 100).quantize(Decimal("0.01"))
+            documentation_fee = Decimal(auction.documentation_fee or 0)
+            db.add(CarAuctionTransaction(
+                auction_id=auction_id,
+                buyer_id=winner.bidder_id if winner is not None else auction.winning_bidder_id,
+                seller_id=auction.seller_id,
+                final_bid=final_bid,
+                buyers_premium=buyers_premium,
+                documentation_fee=documentation_fee,
+                shipping_cost=0,
+                total_amount=final_bid + buyers_premium + documentation_fee,
+                pickup_location=auction.pickup_location
+            ))
+            adjust_seller_summary(db, auction.seller_id, pending_payments=1)
+            if was_active:
+                events.append(auction_event(
+                    "sold", auction_id, winning_bid=final_bid,
+                    winning_bidder_id=str(winner.bidder_id), sequence=auction.version + 1
+                ))
+        else:
+            events.append(auction_event(
+                "closed", auction_id, current_bid=auction.current_bid,
+                is_reserve_met=False, sequence=auction.version + 1
+            ))
+        db.commit()
+        self.closed += 1
+        return [("publish", auction_id, events)] if events else []
+
+    async def stop(self) -> None:
+        auction_events.remove_listener(self._on_events)
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"scheduled": len(self._wheel), "started": self.started, "closed": self.closed}
+
+
+# Process-wide scheduler; every worker runs one and the guarded updates pick a single winner
+auction_scheduler = AuctionScheduler()
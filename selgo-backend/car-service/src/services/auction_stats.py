@@ -0,0 +1,151 @@
+# car-service/src/services/auction_stats.py
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, update, func, desc
+from typing import Any, Dict, Optional
+from decimal import Decimal
+import logging
+import threading
+import time
+
+from ..config.config import settings
+from ..models.car_models import Car
+from ..models.car_auction_models import (
+    CarAuction, CarAuctionTransaction, CarAuctionSellerSummary, AuctionStatus, PaymentStatus
+)
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = [AuctionStatus.UPCOMING, AuctionStatus.ACTIVE]
+COMPLETED_STATUSES = [AuctionStatus.ENDED, AuctionStatus.SOLD]
+
+
+def seller_summary_query(seller_id):
+    """A seller's summary counters computed from car_auctions in one pass."""
+    sold = CarAuction.status == AuctionStatus.SOLD
+    pending_payments = select(func.count()).where(
+        CarAuctionTransaction.seller_id == seller_id,
+        CarAuctionTransaction.payment_status == PaymentStatus.PENDING
+    ).scalar_subquery()
+    return select(
+        func.count().filter(CarAuction.status.in_(OPEN_STATUSES)).label("active_auctions"),
+        func.count().filter(CarAuction.status.in_(COMPLETED_STATUSES)).label("completed_auctions"),
+        func.count().filter(sold).label("sold_auctions"),
+        func.coalesce(func.sum(CarAuction.winning_bid).filter(sold), 0).label("total_sales"),
+        pending_payments.label("pending_payments")
+    ).select_from(CarAuction).where(CarAuction.seller_id == seller_id)
+
+
+def build_seller_summary(db: Session, seller_id) -> bool:
+    """Insert a seller's summary row computed from their auctions; False if one already exists."""
+    counts = db.execute(seller_summary_query(seller_id)).one()
+    try:
+        with db.begin_nested():
+            db.add(CarAuctionSellerSummary(seller_id=seller_id, **counts._asdict()))
+        return True
+    except IntegrityError:
+        return False
+
+
+def adjust_seller_summary(db: Session, seller_id, **deltas) -> None:
+    """
+    Apply counter deltas for a seller's auction transition, in the caller's
+    transaction and after the transition itself was written.
+    """
+    statement = (
+        update(CarAuctionSellerSummary)
+        .where(CarAuctionSellerSummary.seller_id == seller_id)
+        .values({getattr(CarAuctionSellerSummary, name): getattr(CarAuctionSellerSummary, name) + delta
+                 for name, delta in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(statement).rowcount:
+        return
+    # A row built here already counts this transition; one built concurrently
+    # could not see it, so the deltas still apply to that one
+    if not build_seller_summary(db, seller_id):
+        db.execute(statement)
+
+
+class MarketplaceStats:
+    """
+    Marketplace-wide auction statistics, computed with one aggregate query
+    over car_auctions plus one for the most auctioned makes, and cached for
+    AUCTION_STATS_TTL_SECONDS.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, popular_makes: Optional[int] = None):
+        self.ttl = ttl or settings.AUCTION_STATS_TTL_SECONDS
+        self.popular_makes = popular_makes or settings.AUCTION_POPULAR_MAKES
+        self._stats: Optional[Dict[str, Any]] = None
+        self._computed_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> Dict[str, Any]:
+        if self._stats is not None and time.monotonic() - self._computed_at < self.ttl:
+            return self._stats
+        with self._lock:
+            if self._stats is None or time.monotonic() - self._computed_at >= self.ttl:
+                self._stats = self._compute(db)
+                self._computed_at = time.monotonic()
+        return self._stats
+
+    def _compute(self, db: Session) -> Dict[str, Any]:
+        sold = CarAuction.status == AuctionStatus.SOLD
+        totals = db.execute(select(
+            func.count().label("total_auctions"),
+            func.count().filter(CarAuction.status == AuctionStatus.ACTIVE).label("active_auctions"),
+            func.count().filter(CarAuction.status.in_(COMPLETED_STATUSES)).label("completed_auctions"),
+            func.count().filter(sold).label("sold_auctions"),
+            func.coalesce(func.sum(CarAuction.total_bids), 0).label("total_bids"),
+            func.avg(CarAuction.winning_bid).filter(sold).label("average_final_price"),
+            func.max(CarAuction.winning_bid).filter(sold).label("highest_sale"),
+            func.sum(CarAuction.winning_bid).filter(sold).label("total_sales_volume"),
+            func.avg(CarAuction.unique_bidders).label("average_bidders_per_auction")
+        ).select_from(CarAuction)).one()
+
+        auctions = func.count().label("auctions")
+        makes = db.execute(
+            select(
+                Car.make,
+                auctions,
+                func.count().filter(sold).label("sold"),
+                func.avg(CarAuction.winning_bid).filter(sold).label("average_final_price")
+            )
+            .select_from(CarAuction)
+            .join(Car, Car.id == CarAuction.car_id)
+            .group_by(Car.make)
+            .order_by(desc(auctions), Car.make)
+            .limit(self.popular_makes)
+        ).all()
+
+        return {
+            "total_auctions": totals.total_auctions,
+            "active_auctions": totals.active_auctions,
+            "completed_auctions": totals.completed_auctions,
+            "total_bids": int(totals.total_bids),
+            "average_final_price": _decimal(totals.average_final_price),
+            "highest_sale": _decimal(totals.highest_sale),
+            "total_sales_volume": _decimal(totals.total_sales_volume),
+            "popular_makes": [
+                {
+                    "make": make.make,
+                    "auctions": make.auctions,
+                    "sold": make.sold,
+                    "average_final_price": _decimal(make.average_final_price)
+                }
+                for make in makes
+            ],
+            "auction_success_rate": (
+                Decimal(totals.sold_auctions / totals.completed_auctions * 100) if totals.completed_auctions else Decimal(0)
+            ),
+            "average_bidders_per_auction": _decimal(totals.average_bidders_per_auction)
+        }
+
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(value)) if value else Decimal(0)
+
+
+# Process-wide marketplace stats cache
+marketplace_stats = MarketplaceStats()
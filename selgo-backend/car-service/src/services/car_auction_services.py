@@ -1,6 +1,6 @@
 # car-service/src/services/car_auction_services.py
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc, asc
+from sqlalchemy import and_, or_, func, desc, asc, select, tuple_, union, update
 from typing import List, Optional, Dict, Any, Tuple
 from fastapi import HTTPException, status
 from datetime import datetime, timedelta
@@ -8,9 +8,11 @@ from decimal import Decimal
 import uuid
 import logging
 
+from ..database.database import uses_postgres
 from ..models.car_auction_models import (
-    CarAuction, CarAuctionBid, CarAuctionWatcher, CarAuctionImage,
-    CarAuctionReport, CarAuctionTransaction, AuctionStatus, BidStatus, PaymentStatus
+    CarAuction, CarAuctionBid, CarAuctionWatcher, CarAuctionImage, CarAuctionReport,
+    CarAuctionTransaction, CarAuctionSellerSummary, AuctionStatus, BidStatus, PaymentStatus,
+    AUCTION_SEARCH_TEXT_CONFIG
 )
 from ..models.car_auction_schemas import (
     CarAuctionCreate, CarAuctionUpdate, CarAuctionResponse,
@@ -19,9 +21,21 @@ from ..models.car_auction_schemas import (
     CarAuctionSearchRequest, CarAuctionListResponse,
     CarAuctionStats, SellerDashboard, BidderDashboard
 )
+from ..utils.pagination import decode_cursor, encode_cursor
+from .auction_bidding import auction_bid_engine
+from .auction_events import auction_event
+from .auction_scheduler import auction_scheduler
+from .auction_stats import adjust_seller_summary, build_seller_summary, marketplace_stats
 
 logger = logging.getLogger(__name__)
 
+# Search sorts; each is backed by a (status, field, id) index for keyset paging
+AUCTION_SORT_FIELDS = {
+    "end_time": CarAuction.end_time,
+    "current_bid": CarAuction.current_bid,
+    "created_at": CarAuction.created_at
+}
+
 class CarAuctionService:
     def __init__(self, db: Session):
         self.db = db
@@ -63,8 +77,11 @@ class CarAuctionService:
             
             auction = CarAuction(**auction_dict)
             self.db.add(auction)
+            self.db.flush()
+            adjust_seller_summary(self.db, auction.seller_id, active_auctions=1)
             self.db.commit()
             self.db.refresh(auction)
+            auction_scheduler.schedule_auction(auction)
             
             return CarAuctionResponse.from_orm(auction)
         except HTTPException:
@@ -84,6 +101,18 @@ class CarAuctionService:
             return CarAuctionResponse.from_orm(auction)
         return None
 
+    async def get_auction_state(self, auction_id: str) -> Optional[Dict[str, Any]]:
+        """Current bidding state of an auction, sent as the first event of its stream."""
+        auction = self.db.query(CarAuction).filter(CarAuction.id == auction_id).first()
+        if not auction:
+            return None
+        return auction_event(
+            "state", auction.id, status=auction.status.value, current_bid=auction.current_bid,
+            winning_bidder_id=auction.winning_bidder_id, total_bids=auction.total_bids,
+            unique_bidders=auction.unique_bidders, is_reserve_met=auction.is_reserve_met,
+            end_time=auction.end_time, sequence=auction.version
+        )
+
     async def update_auction(self, auction_id: str, auction_data: CarAuctionUpdate, seller_id: str) -> Optional[CarAuctionResponse]:
         """Update an auction."""
         auction = self.db.query(CarAuction).filter(
@@ -109,12 +138,11 @@ class CarAuctionService:
                     )
         
         update_dict = auction_data.dict(exclude_unset=True)
-        for key, value in update_dict.items():
-            setattr(auction, key, value)
-        
-        auction.updated_at = datetime.utcnow()
+        self._write_versioned(auction, **update_dict, updated_at=datetime.utcnow())
         self.db.commit()
         self.db.refresh(auction)
+        auction_bid_engine.invalidate(auction_id)
+        auction_scheduler.schedule_auction(auction)
         
         return CarAuctionResponse.from_orm(auction)
 
@@ -138,254 +166,212 @@ class CarAuctionService:
                 detail="Cannot cancel auction with active bids above starting price"
             )
         
-        auction.status = AuctionStatus.CANCELLED
-        auction.updated_at = datetime.utcnow()
+        self._write_versioned(auction, status=AuctionStatus.CANCELLED, updated_at=datetime.utcnow())
+        adjust_seller_summary(self.db, auction.seller_id, active_auctions=-1)
         self.db.commit()
+        auction_bid_engine.invalidate(auction_id)
+        auction_scheduler.unschedule(auction_id)
         
         return True
 
+    def _write_versioned(self, auction: CarAuction, **values: Any) -> None:
+        """
+        Write values to the auction only if it is still at the version it was read at.
+        
+        Bids and other updates commit in between; the checks made against the
+        loaded auction no longer hold then, so the caller gets a 409 to retry.
+        """
+        result = self.db.execute(
+            update(CarAuction)
+            .where(CarAuction.id == auction.id, CarAuction.version == auction.version)
+            .values(**values, version=auction.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            self.db.rollback()
+            raise HTTPException(status_code=409, detail="Auction was modified, please retry")
+        self.db.expire(auction)
+
     async def search_auctions(self, search_request: CarAuctionSearchRequest) -> CarAuctionListResponse:
-        """Search auctions with filters."""
+        """
+        Search auctions with filters.
+        
+        Results are ordered by the sort field and then id, so next_cursor
+        continues straight after the last auction of a page without OFFSET.
+        Only page-numbered requests are counted; cursor pages return no total.
+        """
+        sort_by = search_request.sort_by or "end_time"
+        sort_column = AUCTION_SORT_FIELDS.get(sort_by)
+        if sort_column is None:
+            raise HTTPException(
+                status_code=400, detail=f"sort_by must be one of: {', '.join(AUCTION_SORT_FIELDS)}"
+            )
+        order = desc if search_request.sort_order == "desc" else asc
+        
         try:
-            query = self.db.query(CarAuction)
+            query = self._apply_search_filters(self.db.query(CarAuction), search_request)
             
-            # Apply filters
-            if search_request.filters:
-                filters = search_request.filters
-                
-                if filters.status:
-                    query = query.filter(CarAuction.status.in_(filters.status))
-                
-                if filters.price_from:
-                    query = query.filter(CarAuction.current_bid >= filters.price_from)
-                
-                if filters.price_to:
-                    query = query.filter(CarAuction.current_bid <= filters.price_to)
-                
-                if filters.has_reserve is not None:
-                    if filters.has_reserve:
-                        query = query.filter(CarAuction.reserve_price.isnot(None))
-                    else:
-                        query = query.filter(CarAuction.reserve_price.is_(None))
-                
-                if filters.has_buy_now is not None:
-                    if filters.has_buy_now:
-                        query = query.filter(CarAuction.buy_now_price.isnot(None))
-                    else:
-                        query = query.filter(CarAuction.buy_now_price.is_(None))
-                
-                if filters.ending_soon:
-                    # Auctions ending within 24 hours
-                    end_time_limit = datetime.utcnow() + timedelta(hours=24)
-                    query = query.filter(
-                        and_(
-                            CarAuction.status == AuctionStatus.ACTIVE,
-                            CarAuction.end_time <= end_time_limit
-                        )
-                    )
-                
-                if filters.no_reserve:
-                    query = query.filter(CarAuction.reserve_price.is_(None))
-                
-                if filters.featured_only:
-                    query = query.filter(CarAuction.is_featured == True)
-                
-                # Car-specific filters (join with Car table)
-                if any([filters.make, filters.model, filters.year_from, filters.year_to, 
-                       filters.mileage_from, filters.mileage_to]):
-                    from ..models.car_models import Car
-                    query = query.join(Car, CarAuction.car_id == Car.id)
-                    
-                    if filters.make:
-                        query = query.filter(Car.make.ilike(f"%{filters.make}%"))
-                    
-                    if filters.model:
-                        query = query.filter(Car.model.ilike(f"%{filters.model}%"))
-                    
-                    if filters.year_from:
-                        query = query.filter(Car.year >= filters.year_from)
-                    
-                    if filters.year_to:
-                        query = query.filter(Car.year <= filters.year_to)
-                    
-                    if filters.mileage_from:
-                        query = query.filter(Car.mileage >= filters.mileage_from)
-                    
-                    if filters.mileage_to:
-                        query = query.filter(Car.mileage <= filters.mileage_to)
-            
-            # Apply text search
-            if search_request.query:
-                from ..models.car_models import Car
-                if not query.join(Car, CarAuction.car_id == Car.id, isouter=True):
-                    query = query.join(Car, CarAuction.car_id == Car.id)
-                
-                search_term = f"%{search_request.query}%"
-                query = query.filter(
-                    or_(
-                        CarAuction.title.ilike(search_term),
-                        CarAuction.description.ilike(search_term),
-                        Car.make.ilike(search_term),
-                        Car.model.ilike(search_term)
-                    )
-                )
-            
-            # Get total count
-            total = query.count()
-            
-            # Apply sorting
-            if search_request.sort_by:
-                sort_column = getattr(CarAuction, search_request.sort_by, None)
-                if sort_column:
-                    if search_request.sort_order == "desc":
-                        query = query.order_by(desc(sort_column))
-                    else:
-                        query = query.order_by(asc(sort_column))
-            
-            # Apply pagination
+            page_query = query
             offset = (search_request.page - 1) * search_request.per_page
-            auctions = query.offset(offset).limit(search_request.per_page).all()
-            
-            total_pages = (total + search_request.per_page - 1) // search_request.per_page
+            if search_request.cursor:
+                value, auction_id = self._decode_search_cursor(search_request.cursor, sort_by)
+                keyset = tuple_(sort_column, CarAuction.id)
+                after = keyset < tuple_(value, auction_id) if order is desc else keyset > tuple_(value, auction_id)
+                page_query = page_query.filter(after)
+                offset = 0
+            
+            # One extra row tells whether there is a next page
+            auctions = page_query.order_by(order(sort_column), order(CarAuction.id)).offset(offset).limit(
+                search_request.per_page + 1
+            ).all()
+            has_more = len(auctions) > search_request.per_page
+            auctions = auctions[:search_request.per_page]
+            
+            # Cursor pages skip the count, the client has it from the first page;
+            # a last page reached by page number already tells the total
+            total = total_pages = None
+            if not search_request.cursor:
+                if not has_more and (auctions or offset == 0):
+                    total = offset + len(auctions)
+                else:
+                    total = query.with_entities(func.count(CarAuction.id)).order_by(None).scalar()
+                total_pages = (total + search_request.per_page - 1) // search_request.per_page
+            next_cursor = None
+            if has_more:
+                last = auctions[-1]
+                next_cursor = encode_cursor(sort_by, getattr(last, sort_by), last.id)
             
             return CarAuctionListResponse(
                 auctions=[CarAuctionResponse.from_orm(auction) for auction in auctions],
                 total=total,
                 page=search_request.page,
                 per_page=search_request.per_page,
-                total_pages=total_pages
+                total_pages=total_pages,
+                next_cursor=next_cursor
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error searching auctions: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to search auctions")
 
-    async def place_bid(self, bid_data: CarAuctionBidCreate, bidder_id: str) -> CarAuctionBidResponse:
-        """Place a bid on an auction."""
-        try:
-            # Get the auction
-            auction = self.db.query(CarAuction).filter(
-                CarAuction.id == bid_data.auction_id
-            ).first()
-            
-            if not auction:
-                raise HTTPException(status_code=404, detail="Auction not found")
+    def _apply_search_filters(self, query, search_request: CarAuctionSearchRequest):
+        """Apply search filters and text search to an auction query."""
+        if search_request.filters:
+            filters = search_request.filters
+            
+            if filters.status:
+                # The schema's AuctionStatus is a separate enum; match on values
+                statuses = [AuctionStatus(getattr(value, "value", value)) for value in filters.status]
+                query = query.filter(CarAuction.status.in_(statuses))
+            
+            if filters.price_from:
+                query = query.filter(CarAuction.current_bid >= filters.price_from)
+            
+            if filters.price_to:
+                query = query.filter(CarAuction.current_bid <= filters.price_to)
+            
+            if filters.has_reserve is not None:
+                if filters.has_reserve:
+                    query = query.filter(CarAuction.reserve_price.isnot(None))
+                else:
+                    query = query.filter(CarAuction.reserve_price.is_(None))
             
-            if auction.status != AuctionStatus.ACTIVE:
-                raise HTTPException(status_code=400, detail="Auction is not active")
+            if filters.has_buy_now is not None:
+                if filters.has_buy_now:
+                    query = query.filter(CarAuction.buy_now_price.isnot(None))
+                else:
+                    query = query.filter(CarAuction.buy_now_price.is_(None))
             
-            if auction.seller_id == bidder_id:
-                raise HTTPException(status_code=400, detail="Cannot bid on your own auction")
+            if filters.ending_soon:
+                # Active auctions ending within 24 hours; a range scan of the ending-soon index
+                now = datetime.utcnow()
+                query = query.filter(
+                    and_(
+                        CarAuction.status == AuctionStatus.ACTIVE,
+                        CarAuction.end_time > now,
+                        CarAuction.end_time <= now + timedelta(hours=24)
+                    )
+                )
             
-            # Check if auction has ended
-            if datetime.utcnow() > auction.end_time:
-                raise HTTPException(status_code=400, detail="Auction has ended")
+            if filters.no_reserve:
+                query = query.filter(CarAuction.reserve_price.is_(None))
             
-            # Validate bid amount
-            min_bid = auction.current_bid + auction.bid_increment
-            if bid_data.bid_amount < min_bid:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Bid must be at least {min_bid}"
-                )
+            if filters.featured_only:
+                query = query.filter(CarAuction.is_featured == True)
             
-            # Check buy-now price
-            if auction.buy_now_price and bid_data.bid_amount >= auction.buy_now_price:
-                # This is a buy-now purchase
-                bid_data.bid_amount = auction.buy_now_price
-                
-                # Create the winning bid
-                bid_dict = bid_data.dict()
-                bid_dict['bidder_id'] = bidder_id
-                bid_dict['status'] = BidStatus.WON
-                bid_dict['is_winning'] = True
+            # Car-specific filters (join with Car table); make/model use the trigram indexes
+            if any([filters.make, filters.model, filters.year_from, filters.year_to, 
+                   filters.mileage_from, filters.mileage_to]):
+                from ..models.car_models import Car
+                query = query.join(Car, CarAuction.car_id == Car.id)
                 
-                bid = CarAuctionBid(**bid_dict)
-                self.db.add(bid)
+                if filters.make:
+                    query = query.filter(Car.make.ilike(f"%{filters.make}%"))
                 
-                # Update auction
-                auction.current_bid = bid_data.bid_amount
-                auction.winning_bidder_id = bidder_id
-                auction.winning_bid = bid_data.bid_amount
-                auction.status = AuctionStatus.SOLD
-                auction.sold_at = datetime.utcnow()
-                auction.total_bids += 1
+                if filters.model:
+                    query = query.filter(Car.model.ilike(f"%{filters.model}%"))
                 
-                # Check if this is a new bidder
-                existing_bidder = self.db.query(CarAuctionBid).filter(
-                    and_(
-                        CarAuctionBid.auction_id == bid_data.auction_id,
-                        CarAuctionBid.bidder_id == bidder_id
-                    )
-                ).first()
+                if filters.year_from:
+                    query = query.filter(Car.year >= filters.year_from)
                 
-                if not existing_bidder:
-                    auction.unique_bidders += 1
+                if filters.year_to:
+                    query = query.filter(Car.year <= filters.year_to)
                 
-                self.db.commit()
-                self.db.refresh(bid)
+                if filters.mileage_from:
+                    query = query.filter(Car.mileage >= filters.mileage_from)
                 
-                return CarAuctionBidResponse.from_orm(bid)
-            
-            # Regular bid processing
-            # Mark previous winning bid as outbid
-            previous_winning_bid = self.db.query(CarAuctionBid).filter(
-                and_(
-                    CarAuctionBid.auction_id == bid_data.auction_id,
-                    CarAuctionBid.is_winning == True
-                )
-            ).first()
-            
-            if previous_winning_bid:
-                previous_winning_bid.is_winning = False
-                previous_winning_bid.status = BidStatus.OUTBID
-            
-            # Create new bid
-            bid_dict = bid_data.dict()
-            bid_dict['bidder_id'] = bidder_id
-            bid_dict['status'] = BidStatus.WINNING
-            bid_dict['is_winning'] = True
-            
-            # Handle proxy bidding
-            if bid_data.max_bid and bid_data.max_bid > bid_data.bid_amount:
-                bid_dict['is_proxy_bid'] = True
-            
-            bid = CarAuctionBid(**bid_dict)
-            self.db.add(bid)
-            
-            # Update auction
-            auction.current_bid = bid_data.bid_amount
-            auction.winning_bidder_id = bidder_id
-            auction.total_bids += 1
-            
-            # Check if reserve is met
-            if auction.reserve_price and bid_data.bid_amount >= auction.reserve_price:
-                auction.is_reserve_met = True
-            
-            # Check if this is a new bidder
-            existing_bidder = self.db.query(CarAuctionBid).filter(
-                and_(
-                    CarAuctionBid.auction_id == bid_data.auction_id,
-                    CarAuctionBid.bidder_id == bidder_id
-                )
-            ).first()
-            
-            if not existing_bidder:
-                auction.unique_bidders += 1
-            
-            # Auto-extend auction if bid placed in final minutes
-            time_remaining = auction.end_time - datetime.utcnow()
-            if time_remaining.total_seconds() < (auction.auto_extend_minutes * 60):
-                auction.end_time = datetime.utcnow() + timedelta(minutes=auction.auto_extend_minutes)
-            
-            self.db.commit()
-            self.db.refresh(bid)
-            
-            return CarAuctionBidResponse.from_orm(bid)
+                if filters.mileage_to:
+                    query = query.filter(Car.mileage <= filters.mileage_to)
+        
+        if search_request.query:
+            query = query.filter(CarAuction.id.in_(self._text_search_ids(search_request.query)))
+        
+        return query
+
+    def _text_search_ids(self, text: str):
+        """
+        Ids of auctions matching the text in their title/description or their
+        car's make/model. Each branch is answered from its own index (the
+        search vector on Postgres, trigrams on cars) and the two are unioned.
+        """
+        from ..models.car_models import Car
+        term = f"%{text}%"
+        if uses_postgres(self.db):
+            own = select(CarAuction.id).where(
+                CarAuction.search_vector.op("@@")(func.websearch_to_tsquery(AUCTION_SEARCH_TEXT_CONFIG, text))
+            )
+        else:
+            own = select(CarAuction.id).where(
+                or_(CarAuction.title.ilike(term), CarAuction.description.ilike(term))
+            )
+        by_car = select(CarAuction.id).join(Car, CarAuction.car_id == Car.id).where(
+            or_(Car.make.ilike(term), Car.model.ilike(term))
+        )
+        return union(own, by_car)
+
+    @staticmethod
+    def _decode_search_cursor(cursor: str, sort_by: str) -> Tuple[Any, uuid.UUID]:
+        try:
+            cursor_sort, value, auction_id = decode_cursor(cursor, 3)
+            if cursor_sort != sort_by:
+                raise ValueError("Cursor belongs to another sort")
+            value = Decimal(value) if sort_by == "current_bid" else datetime.fromisoformat(value)
+            return value, uuid.UUID(auction_id)
+        except (ValueError, TypeError, ArithmeticError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def place_bid(self, bid_data: CarAuctionBidCreate, bidder_id: str) -> CarAuctionBidResponse:
+        """Place a bid on an auction; bids on one auction are applied in order by its sequencer."""
+        try:
+            bid = await auction_bid_engine.submit(
+                bid_data.auction_id, bidder_id, bid_data.bid_amount, bid_data.max_bid
+            )
+            return CarAuctionBidResponse(**bid)
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Error placing bid: {str(e)}")
-            self.db.rollback()
             raise HTTPException(status_code=500, detail="Failed to place bid")
 
     async def get_auction_bids(self, auction_id: str, page: int = 1, per_page: int = 20) -> List[CarAuctionBidResponse]:
@@ -395,7 +381,9 @@ class CarAuctionService:
         )
         
         offset = (page - 1) * per_page
-        bids = query.order_by(desc(CarAuctionBid.created_at)).offset(offset).limit(per_page).all()
+        bids = query.order_by(
+            desc(CarAuctionBid.sequence).nulls_last(), desc(CarAuctionBid.created_at)
+        ).offset(offset).limit(per_page).all()
         
         return [CarAuctionBidResponse.from_orm(bid) for bid in bids]
 
@@ -477,64 +465,19 @@ class CarAuctionService:
     async def get_seller_dashboard(self, seller_id: str) -> SellerDashboard:
         """Get seller dashboard data."""
         try:
-            active_auctions = self.db.query(CarAuction).filter(
-                and_(
-                    CarAuction.seller_id == seller_id,
-                    CarAuction.status.in_([AuctionStatus.UPCOMING, AuctionStatus.ACTIVE])
-                )
-            ).count()
-            
-            completed_auctions = self.db.query(CarAuction).filter(
-                and_(
-                    CarAuction.seller_id == seller_id,
-                    CarAuction.status.in_([AuctionStatus.ENDED, AuctionStatus.SOLD])
-                )
-            ).count()
-            
-            # Calculate total sales
-            total_sales_result = self.db.query(func.sum(CarAuction.winning_bid)).filter(
-                and_(
-                    CarAuction.seller_id == seller_id,
-                    CarAuction.status == AuctionStatus.SOLD
-                )
-            ).scalar()
-            total_sales = Decimal(str(total_sales_result)) if total_sales_result else Decimal(0)
-            
-            # Pending payments (sold but not paid)
-            pending_payments = self.db.query(CarAuctionTransaction).join(
-                CarAuction, CarAuctionTransaction.auction_id == CarAuction.id
-            ).filter(
-                and_(
-                    CarAuction.seller_id == seller_id,
-                    CarAuctionTransaction.payment_status == PaymentStatus.PENDING
-                )
-            ).count()
-            
-            # Average sale price
-            avg_price_result = self.db.query(func.avg(CarAuction.winning_bid)).filter(
-                and_(
-                    CarAuction.seller_id == seller_id,
-                    CarAuction.status == AuctionStatus.SOLD
-                )
-            ).scalar()
-            average_sale_price = Decimal(str(avg_price_result)) if avg_price_result else Decimal(0)
-            
-            # Success rate (sold / total ended)
-            total_ended = self.db.query(CarAuction).filter(
-                and_(
-                    CarAuction.seller_id == seller_id,
-                    CarAuction.status.in_([AuctionStatus.ENDED, AuctionStatus.SOLD])
-                )
-            ).count()
-            
-            sold_count = self.db.query(CarAuction).filter(
-                and_(
-                    CarAuction.seller_id == seller_id,
-                    CarAuction.status == AuctionStatus.SOLD
-                )
-            ).count()
+            summary = self.db.get(CarAuctionSellerSummary, seller_id)
+            if summary is None:
+                # First visit since summaries were introduced
+                build_seller_summary(self.db, seller_id)
+                self.db.commit()
+                summary = self.db.get(CarAuctionSellerSummary, seller_id)
             
-            success_rate = Decimal(sold_count / total_ended * 100) if total_ended > 0 else Decimal(0)
+            total_sales = Decimal(summary.total_sales or 0)
+            average_sale_price = total_sales / summary.sold_auctions if summary.sold_auctions else Decimal(0)
+            success_rate = (
+                Decimal(summary.sold_auctions / summary.completed_auctions * 100)
+                if summary.completed_auctions else Decimal(0)
+            )
             
             # Recent auctions
             recent_auctions_query = self.db.query(CarAuction).filter(
@@ -544,10 +487,10 @@ class CarAuctionService:
             recent_auctions = [CarAuctionResponse.from_orm(auction) for auction in recent_auctions_query]
             
             return SellerDashboard(
-                active_auctions=active_auctions,
-                completed_auctions=completed_auctions,
+                active_auctions=summary.active_auctions,
+                completed_auctions=summary.completed_auctions,
                 total_sales=total_sales,
-                pending_payments=pending_payments,
+                pending_payments=summary.pending_payments,
                 average_sale_price=average_sale_price,
                 success_rate=success_rate,
                 recent_auctions=recent_auctions
@@ -559,56 +502,7 @@ class CarAuctionService:
     async def get_stats(self) -> CarAuctionStats:
         """Get auction marketplace statistics."""
         try:
-            total_auctions = self.db.query(CarAuction).count()
-            active_auctions = self.db.query(CarAuction).filter(
-                CarAuction.status == AuctionStatus.ACTIVE
-            ).count()
-            completed_auctions = self.db.query(CarAuction).filter(
-                CarAuction.status.in_([AuctionStatus.ENDED, AuctionStatus.SOLD])
-            ).count()
-            
-            total_bids = self.db.query(func.sum(CarAuction.total_bids)).scalar() or 0
-            
-            # Average final price
-            avg_final_price_result = self.db.query(func.avg(CarAuction.winning_bid)).filter(
-                CarAuction.status == AuctionStatus.SOLD
-            ).scalar()
-            average_final_price = Decimal(str(avg_final_price_result)) if avg_final_price_result else Decimal(0)
-            
-            # Highest sale
-            highest_sale_result = self.db.query(func.max(CarAuction.winning_bid)).filter(
-                CarAuction.status == AuctionStatus.SOLD
-            ).scalar()
-            highest_sale = Decimal(str(highest_sale_result)) if highest_sale_result else Decimal(0)
-            
-            # Total sales volume
-            total_volume_result = self.db.query(func.sum(CarAuction.winning_bid)).filter(
-                CarAuction.status == AuctionStatus.SOLD
-            ).scalar()
-            total_sales_volume = Decimal(str(total_volume_result)) if total_volume_result else Decimal(0)
-            
-            # Success rate
-            sold_count = self.db.query(CarAuction).filter(
-                CarAuction.status == AuctionStatus.SOLD
-            ).count()
-            auction_success_rate = Decimal(sold_count / completed_auctions * 100) if completed_auctions > 0 else Decimal(0)
-            
-            # Average bidders per auction
-            avg_bidders_result = self.db.query(func.avg(CarAuction.unique_bidders)).scalar()
-            average_bidders_per_auction = Decimal(str(avg_bidders_result)) if avg_bidders_result else Decimal(0)
-            
-            return CarAuctionStats(
-                total_auctions=total_auctions,
-                active_auctions=active_auctions,
-                completed_auctions=completed_auctions,
-                total_bids=total_bids,
-                average_final_price=average_final_price,
-                highest_sale=highest_sale,
-                total_sales_volume=total_sales_volume,
-                popular_makes=[],  # Placeholder
-                auction_success_rate=auction_success_rate,
-                average_bidders_per_auction=average_bidders_per_auction
-            )
+            return CarAuctionStats(**marketplace_stats.get(self.db))
         except Exception as e:
             logger.error(f"Error getting auction stats: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to get auction statistics")
\ No newline at end of file
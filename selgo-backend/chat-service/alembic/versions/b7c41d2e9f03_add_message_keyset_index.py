@@ -0,0 +1,29 @@
+"""Add composite index for message keyset pagination
+
+Revision ID: b7c41d2e9f03
+Revises: a1ad2e86a8fb
+Create Date: 2026-10-17 10:12:04.118273
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c41d2e9f03'
+down_revision = 'a1ad2e86a8fb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_messages_conversation_timestamp_id',
+        'messages',
+        ['conversation_id', 'timestamp', 'id'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_messages_conversation_timestamp_id', table_name='messages')
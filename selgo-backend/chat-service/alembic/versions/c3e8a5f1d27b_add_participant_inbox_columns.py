@@ -0,0 +1,51 @@
+"""Add per-participant inbox columns
+
+Revision ID: c3e8a5f1d27b
+Revises: b7c41d2e9f03
+Create Date: 2026-10-17 13:40:51.502114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8a5f1d27b'
+down_revision = 'b7c41d2e9f03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('participants', sa.Column('unread_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('participants', sa.Column('last_activity_at', sa.DateTime(), nullable=True))
+
+    # Backfill the read model from existing conversations and messages
+    op.execute("""
+        UPDATE participants p
+        SET last_activity_at = COALESCE(c.last_message_at, p.joined_at)
+        FROM conversations c
+        WHERE c.id = p.conversation_id
+    """)
+    op.execute("""
+        UPDATE participants p
+        SET unread_count = (
+            SELECT COUNT(*) FROM messages m
+            WHERE m.conversation_id = p.conversation_id
+              AND m.sender_id <> p.user_id
+              AND (p.last_read_at IS NULL OR m.timestamp > p.last_read_at)
+        )
+    """)
+
+    op.create_index(
+        'ix_participants_user_last_activity',
+        'participants',
+        ['user_id', 'last_activity_at'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_participants_user_last_activity', table_name='participants')
+    op.drop_column('participants', 'last_activity_at')
+    op.drop_column('participants', 'unread_count')
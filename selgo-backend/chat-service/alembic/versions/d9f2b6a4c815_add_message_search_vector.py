@@ -0,0 +1,38 @@
+"""Add full-text search vector to messages
+
+Revision ID: d9f2b6a4c815
+Revises: c3e8a5f1d27b
+Create Date: 2026-10-17 16:05:37.884120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9f2b6a4c815'
+down_revision = 'c3e8a5f1d27b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('messages', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute("""
+        UPDATE messages
+        SET search_vector = to_tsvector('simple', coalesce(content, ''))
+        WHERE is_deleted IS NOT TRUE
+    """)
+    op.create_index(
+        'ix_messages_search_vector',
+        'messages',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_messages_search_vector', table_name='messages')
+    op.drop_column('messages', 'search_vector')
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect, Query, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Set
 from uuid import UUID
+import asyncio
 import json
 from datetime import datetime, timedelta
 
-from ..services.services import ChatService
+from ..services.services import ChatService, typing_store
+from ..services.read_receipts import read_receipt_buffer
+from ..services.participant_index import ParticipantIndex, participant_index
 from ..models.chat_schemas import (
     ConversationCreate, ConversationResponse, ConversationUpdate, ConversationListResponse,
     MessageCreate, MessageResponse, MessageUpdate, MessageAttachmentCreate,
@@ -13,8 +16,10 @@ from ..models.chat_schemas import (
     MessageReportCreate, OfferCreate, ConversationFilter, MessageFilter,
     PaginatedResponse, WebSocketMessage, ReadReceiptUpdate
 )
-from ..database.database import get_db
+from ..database.database import get_db, SessionLocal
+from ..config.config import settings
 from ..utils.auth import get_current_user_id
+from ..utils.pubsub import PubSubBackend, create_pubsub_backend
 
 # Create router
 router = APIRouter(
@@ -25,42 +30,142 @@ router = APIRouter(
 
 # WebSocket connection manager for real-time messaging
 class ConnectionManager:
-    def __init__(self):
+    """Tracks this worker's sockets and relays conversation events through the pub/sub backplane."""
+
+    MEMBERSHIP_CHANNEL = "chat:membership"
+
+    def __init__(self, backend: Optional[PubSubBackend] = None, index: Optional[ParticipantIndex] = None):
+        self.backend = backend or create_pubsub_backend(settings.PUBSUB_BACKEND, settings.REDIS_URL)
+        self.index = index if index is not None else participant_index
+        self.send_timeout = settings.WS_SEND_TIMEOUT_SECONDS
         self.active_connections: Dict[int, WebSocket] = {}
-        self.user_conversations: Dict[int, List[UUID]] = {}
+        # Locally connected participants per conversation; drives channel subscriptions
+        self.local_members: Dict[UUID, Set[int]] = {}
+        self._started = False
+
+    @staticmethod
+    def _conversation_channel(conversation_id: UUID) -> str:
+        return f"chat:conversation:{conversation_id}"
+
+    @staticmethod
+    def _user_channel(user_id: int) -> str:
+        return f"chat:user:{user_id}"
+
+    async def start(self):
+        """Listen for membership changes so the participant index stays current on every worker."""
+        if not self._started:
+            self._started = True
+            await self.backend.subscribe(self.MEMBERSHIP_CHANNEL, self._apply_membership)
 
     async def connect(self, user_id: int, websocket: WebSocket):
+        await self.start()
         await websocket.accept()
         self.active_connections[user_id] = websocket
-
-    def disconnect(self, user_id: int):
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
-        if user_id in self.user_conversations:
-            del self.user_conversations[user_id]
+        await self.backend.subscribe(self._user_channel(user_id), self._deliver_to_user)
+        for conversation_id in self.index.conversations_for(user_id):
+            await self._subscribe_local(user_id, conversation_id)
+
+    async def disconnect(self, user_id: int):
+        if self.active_connections.pop(user_id, None) is None:
+            return
+        await self.backend.unsubscribe(self._user_channel(user_id), self._deliver_to_user)
+        for conversation_id in self.index.conversations_for(user_id):
+            await self._unsubscribe_local(user_id, conversation_id)
+
+    async def _subscribe_local(self, user_id: int, conversation_id: UUID):
+        members = self.local_members.setdefault(conversation_id, set())
+        first = not members
+        members.add(user_id)
+        if first:
+            await self.backend.subscribe(self._conversation_channel(conversation_id), self._deliver_to_conversation)
+
+    async def _unsubscribe_local(self, user_id: int, conversation_id: UUID):
+        members = self.local_members.get(conversation_id)
+        if members is None:
+            return
+        members.discard(user_id)
+        if not members:
+            del self.local_members[conversation_id]
+            await self.backend.unsubscribe(self._conversation_channel(conversation_id), self._deliver_to_conversation)
+
+    async def join_conversation(self, conversation_id: UUID, user_ids: Iterable[int]):
+        """Add participants to the index on every worker."""
+        await self.backend.publish(
+            self.MEMBERSHIP_CHANNEL,
+            json.dumps({"kind": "join", "conversation_id": str(conversation_id), "user_ids": list(user_ids)})
+        )
+
+    async def leave_conversation(self, conversation_id: UUID, user_ids: Iterable[int]):
+        """Remove participants from the index on every worker."""
+        await self.backend.publish(
+            self.MEMBERSHIP_CHANNEL,
+            json.dumps({"kind": "leave", "conversation_id": str(conversation_id), "user_ids": list(user_ids)})
+        )
+
+    async def _apply_membership(self, channel: str, payload: str):
+        envelope = json.loads(payload)
+        conversation_id = UUID(envelope["conversation_id"])
+        user_ids = envelope["user_ids"]
+        if envelope["kind"] == "join":
+            self.index.add(conversation_id, user_ids)
+            for user_id in user_ids:
+                if user_id in self.active_connections:
+                    await self._subscribe_local(user_id, conversation_id)
+        elif envelope["kind"] == "leave":
+            self.index.remove(conversation_id, user_ids)
+            for user_id in user_ids:
+                await self._unsubscribe_local(user_id, conversation_id)
 
     async def send_to_user(self, user_id: int, message: WebSocketMessage):
-        if user_id in self.active_connections:
-            try:
-                await self.active_connections[user_id].send_text(message.model_dump_json())
-            except:
-                self.disconnect(user_id)
+        await self.backend.publish(self._user_channel(user_id), message.model_dump_json())
 
     async def send_to_conversation(self, conversation_id: UUID, message: WebSocketMessage, exclude_user: Optional[int] = None):
-        # In a real implementation, this would query the database for conversation participants
-        # For now, we'll send to all connected users
-        for user_id, websocket in self.active_connections.items():
-            if exclude_user and user_id == exclude_user:
-                continue
-            try:
-                await websocket.send_text(message.model_dump_json())
-            except:
-                self.disconnect(user_id)
+        await self.backend.publish(
+            self._conversation_channel(conversation_id),
+            json.dumps({"exclude_user": exclude_user, "message": message.model_dump(mode="json")})
+        )
+
+    async def _send_local(self, user_id: int, payload: str):
+        websocket = self.active_connections.get(user_id)
+        if websocket is None:
+            return
+        try:
+            await asyncio.wait_for(websocket.send_text(payload), timeout=self.send_timeout)
+        except Exception:
+            # Slow or broken sockets are dropped so they cannot hold up the rest of the fan-out
+            await self.disconnect(user_id)
+
+    async def _deliver_to_user(self, channel: str, payload: str):
+        await self._send_local(int(channel.rsplit(":", 1)[1]), payload)
+
+    async def _deliver_to_conversation(self, channel: str, payload: str):
+        conversation_id = UUID(channel.rsplit(":", 1)[1])
+        envelope = json.loads(payload)
+        exclude_user = envelope.get("exclude_user")
+        text = json.dumps(envelope["message"])
+        recipients = [
+            user_id for user_id in self.index.participants(conversation_id)
+            if user_id != exclude_user and user_id in self.active_connections
+        ]
+        await asyncio.gather(*(self._send_local(user_id, text) for user_id in recipients))
+
+    async def close(self):
+        await self.backend.close()
 
 manager = ConnectionManager()
 
+def _warm_participant_index():
+    db = SessionLocal()
+    try:
+        participant_index.warm(db)
+    finally:
+        db.close()
+
 @router.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: int):
+    # Normally warmed at startup; the scan blocks, so it runs off the event loop
+    if not participant_index.is_warm:
+        await asyncio.get_running_loop().run_in_executor(None, _warm_participant_index)
     await manager.connect(user_id, websocket)
     try:
         while True:
@@ -69,11 +174,19 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int):
                 message_data = json.loads(data)
                 # Handle different WebSocket message types
                 if message_data.get("type") == "typing":
+                    conversation_id = UUID(message_data["conversation_id"])
+                    if user_id not in participant_index.participants(conversation_id):
+                        continue
+                    is_typing = message_data.get("is_typing", True)
+                    if is_typing:
+                        await typing_store.set_typing(conversation_id, user_id, settings.TYPING_INDICATOR_TTL_SECONDS)
+                    else:
+                        await typing_store.clear_typing(conversation_id, user_id)
                     # Broadcast typing indicator
                     typing_message = WebSocketMessage(
                         type="typing",
-                        conversation_id=UUID(message_data["conversation_id"]),
-                        data={"user_id": user_id, "is_typing": message_data.get("is_typing", True)}
+                        conversation_id=conversation_id,
+                        data={"user_id": user_id, "is_typing": is_typing}
                     )
                     await manager.send_to_conversation(
                         UUID(message_data["conversation_id"]), 
@@ -81,7 +194,11 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int):
                         exclude_user=user_id
                     )
                 elif message_data.get("type") == "read_receipt":
-                    # Handle read receipts
+                    conversation_id = UUID(message_data["conversation_id"])
+                    if user_id not in participant_index.participants(conversation_id):
+                        continue
+                    # Persisted by the next bulk flush
+                    read_receipt_buffer.record(conversation_id, user_id, UUID(message_data["message_id"]))
                     read_message = WebSocketMessage(
                         type="read_receipt",
                         conversation_id=UUID(message_data["conversation_id"]),
@@ -92,10 +209,13 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int):
                         read_message, 
                         exclude_user=user_id
                     )
-            except json.JSONDecodeError:
-                pass
+            except (ValueError, KeyError, TypeError, AttributeError):
+                # Malformed JSON, ids or fields only drop that message
+                continue
     except WebSocketDisconnect:
-        manager.disconnect(user_id)
+        pass
+    finally:
+        await manager.disconnect(user_id)
 
 # ==================== Conversation Routes ====================
 
@@ -106,7 +226,12 @@ async def create_conversation(
     current_user_id: int = Depends(get_current_user_id)
 ):
     """Create a new conversation."""
-    return ChatService.create_conversation(db, conversation, current_user_id)
+    new_conversation = ChatService.create_conversation(db, conversation, current_user_id)
+    await manager.join_conversation(
+        new_conversation.id,
+        [participant.user_id for participant in new_conversation.participants]
+    )
+    return new_conversation
 
 @router.get("/conversations", response_model=List[ConversationListResponse])
 async def get_user_conversations(
@@ -154,6 +279,7 @@ async def delete_conversation(
     success = ChatService.delete_conversation(db, conversation_id, current_user_id)
     if not success:
         raise HTTPException(status_code=404, detail="Conversation not found")
+    await manager.leave_conversation(conversation_id, [current_user_id])
 
 # ==================== Message Routes ====================
 
@@ -189,13 +315,17 @@ async def create_message(
 async def get_messages(
     conversation_id: UUID,
     filters: MessageFilter = Depends(),
-    page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
-    """Get messages from a conversation with filtering and pagination."""
-    result = ChatService.get_messages(db, conversation_id, current_user_id, filters, page, limit)
+    """Get messages from a conversation, newest page first, paged with before/after cursors."""
+    if filters.before and filters.after:
+        raise HTTPException(status_code=400, detail="Use either 'before' or 'after', not both")
+    try:
+        result = ChatService.get_messages(db, conversation_id, current_user_id, filters, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
     if result is None:
         raise HTTPException(status_code=404, detail="Conversation not found or user not a participant")
     return result
@@ -329,7 +459,7 @@ async def set_typing_indicator(
     current_user_id: int = Depends(get_current_user_id)
 ):
     """Set typing indicator for a conversation."""
-    success = ChatService.set_typing_indicator(db, conversation_id, current_user_id)
+    success = await ChatService.set_typing_indicator(db, conversation_id, current_user_id)
     if not success:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
@@ -343,6 +473,18 @@ async def set_typing_indicator(
     
     return {"message": "Typing indicator set"}
 
+@router.get("/conversations/{conversation_id}/typing")
+async def get_typing_users(
+    conversation_id: UUID,
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """Get users currently typing in a conversation."""
+    user_ids = await ChatService.get_typing_users(db, conversation_id, current_user_id)
+    if user_ids is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return {"user_ids": [user_id for user_id in user_ids if user_id != current_user_id]}
+
 # ==================== Read Receipts ====================
 
 @router.post("/messages/{message_id}/read")
@@ -386,20 +528,22 @@ async def report_message(
 
 # ==================== Search ====================
 
-@router.get("/search/messages")
+@router.get("/search/messages", response_model=PaginatedResponse)
 async def search_messages(
     query: str = Query(..., min_length=2),
     conversation_id: Optional[UUID] = Query(None),
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
-    """Search messages across conversations."""
-    results = ChatService.search_messages(db, query, current_user_id, conversation_id, page, limit)
-    return results
+    """Search messages across the user's conversations, best matches first."""
+    try:
+        return ChatService.search_messages(db, query, current_user_id, conversation_id, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
 
-@router.get("/search/conversations")
+@router.get("/search/conversations", response_model=List[ConversationListResponse])
 async def search_conversations(
     query: str = Query(..., min_length=2),
     page: int = Query(1, ge=1),
@@ -407,7 +551,7 @@ async def search_conversations(
     db: Session = Depends(get_db),
     current_user_id: int = Depends(get_current_user_id)
 ):
-    """Search conversations by title or participant."""
+    """Search conversations by title, listing title, last message preview or participant user id."""
     results = ChatService.search_conversations(db, query, current_user_id, page, limit)
     return results
 
@@ -3,9 +3,12 @@ from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from .config.config import settings
-from .database.database import engine, Base
-from .api.routes import router as chat_router
+from .database.database import engine, Base, SessionLocal
+from .api.routes import router as chat_router, manager as connection_manager
 from .models.chat_models import *
+from .services.participant_index import participant_index
+from .services.read_receipts import read_receipt_buffer
+from .services.services import typing_store
 from .utils.auth_client import auth_client
 
 # Configure logging
@@ -37,7 +40,12 @@ app.include_router(chat_router)
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "chat", "version": "0.1.0"}
+    return {
+        "status": "healthy",
+        "service": "chat",
+        "version": "0.1.0",
+        "auth_cache": auth_client.cache_stats(),
+    }
 
 # Root endpoint
 @app.get("/")
@@ -58,12 +66,33 @@ async def startup_event():
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
+    try:
+        db = SessionLocal()
+        try:
+            participant_index.warm(db)
+        finally:
+            db.close()
+        await connection_manager.start()
+    except Exception as e:
+        logger.error(f"Error warming participant index: {e}")
+    await read_receipt_buffer.start()
 
 # Add shutdown event to close auth client
 @app.on_event("shutdown")
 async def shutdown_event():
+    try:
+        await read_receipt_buffer.stop()
+        await typing_store.close()
+        logger.info("Flushed pending read receipts")
+    except Exception as e:
+        logger.error(f"Error flushing read receipts: {e}")
     try:
         await auth_client.close()
         logger.info("Auth client closed successfully")
     except Exception as e:
-        logger.error(f"Error closing auth client: {e}")
\ No newline at end of file
+        logger.error(f"Error closing auth client: {e}")
+    try:
+        await connection_manager.close()
+        logger.info("Connection manager closed successfully")
+    except Exception as e:
+        logger.error(f"Error closing connection manager: {e}")
\ No newline at end of file
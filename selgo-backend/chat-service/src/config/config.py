@@ -37,6 +37,28 @@ class Settings(BaseSettings):
     # Add this line inside your Settings class
     AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL", "http://localhost:8001")
 
+    # Token validation cache
+    AUTH_CACHE_MAX_SIZE: int = int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000"))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+    # Token verification ("remote" calls auth-service per token, "local" verifies JWTs in-process)
+    AUTH_VERIFY_MODE: str = os.getenv("AUTH_VERIFY_MODE", "remote")
+    AUTH_JWT_ALGORITHM: str = os.getenv("AUTH_JWT_ALGORITHM", "HS256")
+    AUTH_JWT_SECRET: str = os.getenv("AUTH_JWT_SECRET", "")  # Shared key for HS256; RS256 keys come from auth-service JWKS
+    AUTH_REVOCATION_POLL_SECONDS: float = float(os.getenv("AUTH_REVOCATION_POLL_SECONDS", "30"))
+    # Local verification falls back to auth-service while revocations are older than this
+    AUTH_REVOCATION_MAX_STALENESS_SECONDS: float = float(os.getenv("AUTH_REVOCATION_MAX_STALENESS_SECONDS", "90"))
+
+    # Real-time backplane ("memory" for a single worker, "redis" to fan out across workers)
+    PUBSUB_BACKEND: str = os.getenv("PUBSUB_BACKEND", "memory")
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "2.0"))
+
+    # Ephemeral chat state
+    TYPING_STORE_BACKEND: str = os.getenv("TYPING_STORE_BACKEND", "memory")
+    TYPING_INDICATOR_TTL_SECONDS: float = float(os.getenv("TYPING_INDICATOR_TTL_SECONDS", "30"))
+    READ_RECEIPT_FLUSH_INTERVAL_MS: int = int(os.getenv("READ_RECEIPT_FLUSH_INTERVAL_MS", "250"))
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Enum, JSON, DECIMAL
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Enum, JSON, DECIMAL, Index, DDL, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 import uuid
 import enum
 
@@ -48,7 +48,7 @@ class Conversation(Base):
     # Metadata
     last_message_at = Column(DateTime, nullable=True)
     last_message_preview = Column(String(500), nullable=True)
-    unread_count = Column(Integer, default=0)
+    unread_count = Column(Integer, default=0)  # Deprecated: shared by all participants, see Participant.unread_count
     
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -56,6 +56,20 @@ class Conversation(Base):
     participants = relationship("Participant", back_populates="conversation", cascade="all, delete-orphan")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Trigram indexes serve the conversation search's substring matches
+        *[
+            Index(
+                f'ix_conversations_{column}_trgm', column, postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'}
+            ).ddl_if(dialect='postgresql')
+            for column in ('title', 'related_listing_title', 'last_message_preview')
+        ],
+    )
+
+# Trigram operator classes for the search indexes
+event.listen(Conversation.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
 class Participant(Base):
     __tablename__ = 'participants'
 
@@ -69,11 +83,20 @@ class Participant(Base):
     left_at = Column(DateTime, nullable=True)
     last_read_at = Column(DateTime, nullable=True)
     
+    # Inbox read model, maintained on every new message and read receipt
+    unread_count = Column(Integer, default=0, nullable=False)
+    last_activity_at = Column(DateTime, default=func.now(), server_default=func.now(), nullable=False)  # NOT NULL keeps the inbox index order
+    
     # Notification settings
     notifications_enabled = Column(Boolean, default=True)
     
     conversation = relationship("Conversation", back_populates="participants")
 
+    __table_args__ = (
+        # Inbox listing: one range scan per user ordered by last activity
+        Index('ix_participants_user_last_activity', 'user_id', 'last_activity_at'),
+    )
+
 class Message(Base):
     __tablename__ = 'messages'
 
@@ -103,6 +126,9 @@ class Message(Base):
     # System message data
     system_data = Column(JSON, nullable=True)  # For system messages
     
+    # Full-text search document, maintained on create/edit/delete (see repositories/message_search.py)
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
+    
     timestamp = Column(DateTime, default=func.now())
 
     conversation = relationship("Conversation", back_populates="messages")
@@ -110,6 +136,12 @@ class Message(Base):
     attachments = relationship("MessageAttachment", back_populates="message", cascade="all, delete-orphan")
     reactions = relationship("MessageReaction", back_populates="message", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Serves keyset pagination over (timestamp, id) within a conversation
+        Index('ix_messages_conversation_timestamp_id', 'conversation_id', 'timestamp', 'id'),
+        Index('ix_messages_search_vector', 'search_vector', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
 class MessageAttachment(Base):
     __tablename__ = 'message_attachments'
     
@@ -142,6 +174,7 @@ class MessageReaction(Base):
     
     message = relationship("Message", back_populates="reactions")
 
+# Legacy table: typing state is now kept in the TTL store (utils/typing_store.py)
 class TypingIndicator(Base):
     __tablename__ = 'typing_indicators'
     
@@ -217,15 +217,20 @@ class MessageFilter(BaseModel):
     date_from: Optional[datetime] = None
     date_to: Optional[datetime] = None
     search_query: Optional[str] = None
+    # Keyset cursors: "before" pages towards older messages, "after" towards newer ones
+    before: Optional[str] = None
+    after: Optional[str] = None
 
 # ==================== Pagination Schemas ====================
 class PaginatedResponse(BaseModel):
     items: List[Any]
-    total: int
-    page: int
+    total: Optional[int] = None  # Omitted for cursor pages, where counting would scan the thread
+    page: Optional[int] = None
     limit: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 # ==================== WebSocket Schemas ====================
 class WebSocketMessage(BaseModel):
@@ -0,0 +1,168 @@
+import re
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import REAL, cast, event, func, tuple_
+from sqlalchemy.orm import Session
+
+from ..models.chat_models import Message
+
+logger = logging.getLogger(__name__)
+
+# 'simple' keeps search language-agnostic (Norwegian and English listings share one index)
+SEARCH_TEXT_CONFIG = "simple"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def uses_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+class InMemoryMessageSearchIndex:
+    """
+    Inverted index used when the database has no full-text search (SQLite test runs).
+
+    Built lazily from the messages table on first search and then kept current
+    by the same create/edit/delete hooks that maintain the Postgres column;
+    their changes are applied once the session commits, and dropped on rollback.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[UUID]] = {}
+        self._documents: Dict[UUID, Tuple[UUID, Counter]] = {}
+        self.is_built = False
+
+    def build(self, db: Session) -> None:
+        self._postings.clear()
+        self._documents.clear()
+        rows = db.query(Message.id, Message.conversation_id, Message.content).filter(
+            Message.is_deleted.isnot(True)
+        ).all()
+        for row in rows:
+            self.add(row.id, row.conversation_id, row.content)
+        self.is_built = True
+        logger.info(f"In-memory message search index built with {len(rows)} messages")
+
+    def add(self, message_id: UUID, conversation_id: UUID, content: Optional[str]) -> None:
+        self.remove(message_id)
+        terms = Counter(tokenize(content))
+        if not terms:
+            return
+        self._documents[message_id] = (conversation_id, terms)
+        for term in terms:
+            self._postings.setdefault(term, set()).add(message_id)
+
+    def remove(self, message_id: UUID) -> None:
+        document = self._documents.pop(message_id, None)
+        if document is None:
+            return
+        for term in document[1]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.discard(message_id)
+                if not postings:
+                    del self._postings[term]
+
+    def search(self, query: str, conversation_ids: Set[UUID]) -> List[Tuple[float, UUID]]:
+        """All matches as (rank, message_id), best first; every query term must match."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        postings = sorted((self._postings.get(term, set()) for term in terms), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+        results = []
+        for message_id in candidates:
+            conversation_id, counts = self._documents[message_id]
+            if conversation_id not in conversation_ids:
+                continue
+            rank = sum(counts[term] for term in terms) / sum(counts.values())
+            results.append((rank, message_id))
+        results.sort(key=lambda result: (result[0], str(result[1])), reverse=True)
+        return results
+
+
+# Fallback index for non-Postgres databases
+memory_search_index = InMemoryMessageSearchIndex()
+
+# Session.info key of the memory index changes waiting for the transaction to commit
+_PENDING_INDEX_CHANGES = "pending_search_index_changes"
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_index_changes(session: Session) -> None:
+    for change, args in session.info.pop(_PENDING_INDEX_CHANGES, ()):
+        if memory_search_index.is_built:
+            change(*args)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_index_changes(session: Session) -> None:
+    session.info.pop(_PENDING_INDEX_CHANGES, None)
+
+
+def index_message(db: Session, message: Message) -> None:
+    """Refresh a message's search entry; call after flush, before commit."""
+    if message.is_deleted:
+        unindex_message(db, message)
+    elif uses_postgres(db):
+        message.search_vector = func.to_tsvector(SEARCH_TEXT_CONFIG, func.coalesce(message.content, ""))
+    elif memory_search_index.is_built:
+        db.info.setdefault(_PENDING_INDEX_CHANGES, []).append(
+            (memory_search_index.add, (message.id, message.conversation_id, message.content))
+        )
+
+
+def unindex_message(db: Session, message: Message) -> None:
+    if uses_postgres(db):
+        message.search_vector = None
+    elif memory_search_index.is_built:
+        db.info.setdefault(_PENDING_INDEX_CHANGES, []).append((memory_search_index.remove, (message.id,)))
+
+
+def search_message_ids(
+    db: Session,
+    query: str,
+    conversation_ids: Iterable[UUID],
+    limit: int,
+    after: Optional[Tuple[float, UUID]] = None
+) -> List[Tuple[float, UUID]]:
+    """
+    Ranked page of (rank, message_id) restricted to the given conversations.
+
+    Pages are keyed on (rank, id) so deep pages cost the same as the first one.
+    Fetches limit + 1 rows so callers can tell whether another page exists.
+    """
+    conversation_ids = set(conversation_ids)
+    if not conversation_ids:
+        return []
+
+    if uses_postgres(db):
+        tsquery = func.websearch_to_tsquery(SEARCH_TEXT_CONFIG, query)
+        rank = func.ts_rank_cd(Message.search_vector, tsquery)
+        q = db.query(rank.label("rank"), Message.id).filter(
+            Message.search_vector.op("@@")(tsquery),
+            Message.conversation_id.in_(conversation_ids),
+            Message.is_deleted.isnot(True)
+        )
+        if after:
+            # ts_rank_cd is float4; compare in float4 so the cursor row is not returned again
+            q = q.filter(tuple_(rank, Message.id) < tuple_(cast(after[0], REAL), after[1]))
+        rows = q.order_by(rank.desc(), Message.id.desc()).limit(limit + 1).all()
+        return [(float(row.rank), row.id) for row in rows]
+
+    if not memory_search_index.is_built:
+        memory_search_index.build(db)
+    results = memory_search_index.search(query, conversation_ids)
+    if after:
+        cursor = (after[0], str(after[1]))
+        results = [result for result in results if (result[0], str(result[1])) < cursor]
+    return results[:limit + 1]
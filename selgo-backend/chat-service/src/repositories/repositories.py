@@ -1,8 +1,13 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from sqlalchemy import and_, case, func, or_, select, tuple_
+from sqlalchemy.orm import Session, aliased, joinedload
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime
+from uuid import UUID
 
-from ..models.chat_models import Conversation, Message, Participant
-from ..models.chat_schemas import ConversationCreate, MessageCreate
+from ..models.chat_models import Conversation, Message, Participant, MessageStatus, MessageType
+from ..models.chat_schemas import ConversationCreate, ConversationFilter, MessageCreate, MessageFilter, MessageUpdate
+from ..utils.pagination import decode_cursor
+from .message_search import index_message, unindex_message, search_message_ids
 
 class ChatRepository:
     @staticmethod
@@ -13,17 +18,67 @@ class ChatRepository:
         db.refresh(db_conversation)
 
         # Add participants
-        participant1 = Participant(user_id=user_id, conversation_id=db_conversation.id)
-        participant2 = Participant(user_id=conversation_data.participant_id, conversation_id=db_conversation.id)
-        db.add_all([participant1, participant2])
+        participant_ids = dict.fromkeys([user_id, *conversation_data.participant_ids])
+        db.add_all([
+            Participant(user_id=participant_id, conversation_id=db_conversation.id)
+            for participant_id in participant_ids
+        ])
         db.commit()
         db.refresh(db_conversation)
 
         return db_conversation
 
     @staticmethod
-    def get_user_conversations(db: Session, user_id: int) -> List[Conversation]:
-        return db.query(Conversation).join(Participant).filter(Participant.user_id == user_id).all()
+    def get_user_conversations(
+        db: Session,
+        user_id: int,
+        filters: Optional[ConversationFilter] = None,
+        page: int = 1,
+        limit: int = 20
+    ) -> List[Tuple[Participant, Conversation]]:
+        """Inbox rows for a user, most recent activity first."""
+        query = db.query(Participant, Conversation).join(
+            Conversation, Conversation.id == Participant.conversation_id
+        ).filter(
+            Participant.user_id == user_id,
+            Participant.left_at.is_(None)
+        )
+
+        if filters:
+            if filters.conversation_type:
+                query = query.filter(Conversation.conversation_type == filters.conversation_type)
+            if filters.is_archived is not None:
+                query = query.filter(Conversation.is_archived == filters.is_archived)
+            if filters.related_listing_type:
+                query = query.filter(Conversation.related_listing_type == filters.related_listing_type)
+            if filters.search_query:
+                search = f"%{filters.search_query}%"
+                matches = [
+                    Conversation.title.ilike(search),
+                    Conversation.related_listing_title.ilike(search),
+                    Conversation.last_message_preview.ilike(search)
+                ]
+                if filters.search_query.isdigit():
+                    # Participants are only known here by user id; names live in auth-service
+                    other = aliased(Participant)
+                    matches.append(Conversation.id.in_(
+                        select(other.conversation_id).where(
+                            other.user_id == int(filters.search_query),
+                            other.left_at.is_(None)
+                        )
+                    ))
+                query = query.filter(or_(*matches))
+
+        return query.order_by(
+            Participant.last_activity_at.desc(), Participant.id.desc()
+        ).offset((page - 1) * limit).limit(limit).all()
+
+    @staticmethod
+    def get_active_participants(db: Session) -> List[Tuple[UUID, int]]:
+        rows = db.query(Participant.conversation_id, Participant.user_id).filter(
+            Participant.left_at.is_(None)
+        ).all()
+        return [(row.conversation_id, row.user_id) for row in rows]
 
     @staticmethod
     def get_conversation(db: Session, conversation_id: int, user_id: int) -> Optional[Conversation]:
@@ -44,14 +99,264 @@ class ChatRepository:
             content=message_data.content
         )
         db.add(db_message)
+        db.flush()
+        db.refresh(db_message)
+        ChatRepository._apply_message_to_inbox(db, db_message)
+        index_message(db, db_message)
         db.commit()
         db.refresh(db_message)
         return db_message
 
     @staticmethod
-    def get_messages(db: Session, conversation_id: int, user_id: int) -> Optional[List[Message]]:
+    def update_message(db: Session, message_id: UUID, update_data: MessageUpdate, user_id: int) -> Optional[Message]:
+        message = db.query(Message).filter(
+            Message.id == message_id,
+            Message.sender_id == user_id,
+            Message.is_deleted.isnot(True)
+        ).first()
+        if not message:
+            return None
+
+        if update_data.content is not None:
+            message.content = update_data.content
+            message.is_edited = True
+            message.edited_at = datetime.utcnow()
+            index_message(db, message)
+        db.commit()
+        db.refresh(message)
+        return message
+
+    @staticmethod
+    def delete_message(db: Session, message_id: UUID, user_id: int) -> bool:
+        message = db.query(Message).filter(
+            Message.id == message_id,
+            Message.sender_id == user_id,
+            Message.is_deleted.isnot(True)
+        ).first()
+        if not message:
+            return False
+
+        message.is_deleted = True
+        message.deleted_at = datetime.utcnow()
+        unindex_message(db, message)
+        db.commit()
+        return True
+
+    @staticmethod
+    def search_messages(
+        db: Session,
+        query: str,
+        user_id: int,
+        conversation_id: Optional[UUID] = None,
+        limit: int = 20,
+        after: Optional[Tuple[float, UUID]] = None
+    ) -> Tuple[List[Tuple[float, Message]], bool]:
+        """Ranked search over the caller's conversations; returns ((rank, message) page, has_more)."""
+        conversation_ids = set(
+            row.conversation_id for row in db.query(Participant.conversation_id).filter(
+                Participant.user_id == user_id,
+                Participant.left_at.is_(None)
+            ).all()
+        )
+        if conversation_id is not None:
+            conversation_ids &= {conversation_id}
+
+        hits = search_message_ids(db, query, conversation_ids, limit, after)
+        has_more = len(hits) > limit
+        hits = hits[:limit]
+        if not hits:
+            return [], False
+
+        messages = {
+            message.id: message for message in db.query(Message).filter(
+                Message.id.in_([message_id for _, message_id in hits])
+            ).all()
+        }
+        return [(rank, messages[message_id]) for rank, message_id in hits if message_id in messages], has_more
+
+    @staticmethod
+    def _message_preview(message: Message) -> str:
+        if message.content:
+            return message.content[:500]
+        return f"[{message.message_type.value if message.message_type else MessageType.TEXT.value}]"
+
+    @staticmethod
+    def _apply_message_to_inbox(db: Session, message: Message) -> None:
+        """Update the conversation summary and every participant's inbox row in the message's transaction."""
+        preview = ChatRepository._message_preview(message)
+        db.query(Conversation).filter(Conversation.id == message.conversation_id).update({
+            Conversation.last_message_at: message.timestamp,
+            Conversation.last_message_preview: preview
+        }, synchronize_session=False)
+        db.query(Participant).filter(
+            Participant.conversation_id == message.conversation_id,
+            Participant.left_at.is_(None)
+        ).update({
+            Participant.unread_count: Participant.unread_count + case(
+                (Participant.user_id != message.sender_id, 1), else_=0
+            ),
+            Participant.last_activity_at: message.timestamp
+        }, synchronize_session=False)
+
+    @staticmethod
+    def _get_participant_for_update(db: Session, conversation_id: UUID, user_id: int) -> Optional[Participant]:
+        # Row lock serializes read receipts against concurrent unread increments
+        return db.query(Participant).filter(
+            Participant.conversation_id == conversation_id,
+            Participant.user_id == user_id,
+            Participant.left_at.is_(None)
+        ).with_for_update().first()
+
+    @staticmethod
+    def get_message_conversation_id(db: Session, message_id: UUID) -> Optional[UUID]:
+        row = db.query(Message.conversation_id).filter(Message.id == message_id).first()
+        return row.conversation_id if row else None
+
+    @staticmethod
+    def apply_read_receipts(db: Session, receipts: Dict[Tuple[UUID, int], Set[UUID]]) -> int:
+        """
+        Apply a batch of coalesced read receipts in one transaction.
+
+        receipts maps (conversation_id, user_id) to the message ids read since the
+        last flush; each participant's read marker moves to the newest of them.
+        """
+        message_ids = set().union(*receipts.values()) if receipts else set()
+        if not message_ids:
+            return 0
+        messages = {
+            row.id: row for row in db.query(
+                Message.id, Message.conversation_id, Message.timestamp
+            ).filter(Message.id.in_(message_ids)).all()
+        }
+
+        read_until: Dict[Tuple[UUID, int], datetime] = {}
+        for key, ids in receipts.items():
+            timestamps = [
+                messages[message_id].timestamp for message_id in ids
+                if message_id in messages and messages[message_id].conversation_id == key[0]
+            ]
+            if timestamps:
+                read_until[key] = max(timestamps)
+        if not read_until:
+            return 0
+
+        participants = db.query(Participant).filter(
+            tuple_(Participant.conversation_id, Participant.user_id).in_(list(read_until)),
+            Participant.left_at.is_(None)
+        ).with_for_update().all()
+        if not participants:
+            return 0
+
+        for participant in participants:
+            timestamp = read_until[(participant.conversation_id, participant.user_id)]
+            if participant.last_read_at is None or timestamp > participant.last_read_at:
+                participant.last_read_at = timestamp
+        db.flush()
+
+        # Recount unread for every touched participant in a single statement
+        unread = select(func.count(Message.id)).where(
+            Message.conversation_id == Participant.conversation_id,
+            Message.sender_id != Participant.user_id,
+            Message.timestamp > Participant.last_read_at
+        ).scalar_subquery()
+        db.query(Participant).filter(
+            Participant.id.in_([participant.id for participant in participants])
+        ).update({Participant.unread_count: unread}, synchronize_session=False)
+
+        db.query(Message).filter(
+            Message.status != MessageStatus.READ,
+            or_(*(
+                and_(
+                    Message.conversation_id == participant.conversation_id,
+                    Message.sender_id != participant.user_id,
+                    Message.timestamp <= participant.last_read_at
+                )
+                for participant in participants
+            ))
+        ).update({Message.status: MessageStatus.READ}, synchronize_session=False)
+
+        db.commit()
+        return len(participants)
+
+    @staticmethod
+    def mark_conversation_read(db: Session, conversation_id: UUID, user_id: int) -> bool:
+        participant = ChatRepository._get_participant_for_update(db, conversation_id, user_id)
+        if not participant:
+            return False
+
+        latest = db.query(func.max(Message.timestamp)).filter(
+            Message.conversation_id == conversation_id
+        ).scalar()
+        if latest and (participant.last_read_at is None or latest > participant.last_read_at):
+            participant.last_read_at = latest
+        participant.unread_count = 0
+        db.query(Message).filter(
+            Message.conversation_id == conversation_id,
+            Message.sender_id != user_id,
+            Message.status != MessageStatus.READ
+        ).update({Message.status: MessageStatus.READ}, synchronize_session=False)
+        db.commit()
+        return True
+
+    @staticmethod
+    def get_messages(
+        db: Session,
+        conversation_id: UUID,
+        user_id: int,
+        filters: Optional[MessageFilter] = None,
+        limit: int = 50
+    ) -> Optional[Tuple[List[Message], bool, bool]]:
+        """
+        Keyset page of messages in chronological order.
+
+        Returns (messages, has_older, has_newer). Pages are addressed by the
+        (timestamp, id) of the boundary message, so the query is a range scan on
+        ix_messages_conversation_timestamp_id no matter how long the thread is.
+        """
         conversation = ChatRepository.get_conversation(db, conversation_id, user_id)
         if not conversation:
             return None
 
-        return db.query(Message).filter(Message.conversation_id == conversation_id).order_by(Message.timestamp.asc()).all()
\ No newline at end of file
+        filters = filters or MessageFilter()
+        query = db.query(Message).filter(Message.conversation_id == conversation_id)
+
+        if filters.message_type:
+            query = query.filter(Message.message_type == filters.message_type)
+        if filters.sender_id:
+            query = query.filter(Message.sender_id == filters.sender_id)
+        if filters.date_from:
+            query = query.filter(Message.timestamp >= filters.date_from)
+        if filters.date_to:
+            query = query.filter(Message.timestamp <= filters.date_to)
+        if filters.search_query:
+            query = query.filter(Message.content.ilike(f"%{filters.search_query}%"))
+
+        keyset = tuple_(Message.timestamp, Message.id)
+        if filters.after:
+            timestamp, message_id = ChatRepository._decode_message_cursor(filters.after)
+            rows = query.filter(keyset > tuple_(timestamp, message_id)).order_by(
+                Message.timestamp.asc(), Message.id.asc()
+            ).limit(limit + 1).all()
+            has_newer = len(rows) > limit
+            return rows[:limit], True, has_newer
+
+        if filters.before:
+            timestamp, message_id = ChatRepository._decode_message_cursor(filters.before)
+            query = query.filter(keyset < tuple_(timestamp, message_id))
+
+        rows = query.order_by(
+            Message.timestamp.desc(), Message.id.desc()
+        ).limit(limit + 1).all()
+        has_older = len(rows) > limit
+        rows = rows[:limit]
+        rows.reverse()
+        return rows, has_older, filters.before is not None
+
+    @staticmethod
+    def _decode_message_cursor(cursor: str) -> Tuple[datetime, UUID]:
+        timestamp, message_id = decode_cursor(cursor, 2)
+        try:
+            return datetime.fromisoformat(timestamp), UUID(message_id)
+        except (TypeError, AttributeError) as e:
+            # Well-formed cursor around values that are not strings
+            raise ValueError(f"Invalid cursor: {e}")
@@ -0,0 +1,59 @@
+from sqlalchemy.orm import Session
+from typing import Dict, FrozenSet, Iterable, Set
+from uuid import UUID
+import logging
+
+from ..repositories.repositories import ChatRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ParticipantIndex:
+    """In-memory conversation -> participant map, warmed from the participants table."""
+
+    def __init__(self):
+        self._participants: Dict[UUID, Set[int]] = {}
+        self._conversations: Dict[int, Set[UUID]] = {}
+        self.is_warm = False
+
+    def warm(self, db: Session) -> None:
+        """Load every active participant in a single scan."""
+        self._participants.clear()
+        self._conversations.clear()
+        count = 0
+        for conversation_id, user_id in ChatRepository.get_active_participants(db):
+            self._add(conversation_id, user_id)
+            count += 1
+        self.is_warm = True
+        logger.info(f"Participant index warmed with {count} memberships")
+
+    def _add(self, conversation_id: UUID, user_id: int) -> None:
+        self._participants.setdefault(conversation_id, set()).add(user_id)
+        self._conversations.setdefault(user_id, set()).add(conversation_id)
+
+    def add(self, conversation_id: UUID, user_ids: Iterable[int]) -> None:
+        for user_id in user_ids:
+            self._add(conversation_id, user_id)
+
+    def remove(self, conversation_id: UUID, user_ids: Iterable[int]) -> None:
+        participants = self._participants.get(conversation_id)
+        for user_id in user_ids:
+            if participants is not None:
+                participants.discard(user_id)
+            conversations = self._conversations.get(user_id)
+            if conversations is not None:
+                conversations.discard(conversation_id)
+                if not conversations:
+                    del self._conversations[user_id]
+        if participants is not None and not participants:
+            del self._participants[conversation_id]
+
+    def participants(self, conversation_id: UUID) -> FrozenSet[int]:
+        return frozenset(self._participants.get(conversation_id, ()))
+
+    def conversations_for(self, user_id: int) -> FrozenSet[UUID]:
+        return frozenset(self._conversations.get(user_id, ()))
+
+
+# Process-wide index shared by the connection manager and routes
+participant_index = ParticipantIndex()
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from ..config.config import settings
+from ..database.database import SessionLocal
+from ..repositories.repositories import ChatRepository
+
+logger = logging.getLogger(__name__)
+
+ReceiptKey = Tuple[UUID, int]  # (conversation_id, user_id)
+
+
+class ReadReceiptBuffer:
+    """Coalesces read receipts per (conversation, user) and writes them in periodic bulk flushes."""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, flush_interval: Optional[float] = None):
+        self._session_factory = session_factory
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else settings.READ_RECEIPT_FLUSH_INTERVAL_MS / 1000
+        )
+        self._pending: Dict[ReceiptKey, Set[UUID]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def record(self, conversation_id: UUID, user_id: int, message_id: UUID) -> None:
+        self._pending.setdefault((conversation_id, user_id), set()).add(message_id)
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of participants updated."""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, self._write, batch)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(batch)} read receipts: {e}")
+            # Put the batch back so the next flush retries it
+            for key, message_ids in batch.items():
+                self._pending.setdefault(key, set()).update(message_ids)
+            return 0
+
+    def _write(self, batch: Dict[ReceiptKey, Set[UUID]]) -> int:
+        db = self._session_factory()
+        try:
+            return ChatRepository.apply_read_receipts(db, batch)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+# Process-wide buffer started and drained by the app lifecycle hooks
+read_receipt_buffer = ReadReceiptBuffer()
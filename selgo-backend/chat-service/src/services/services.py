@@ -1,9 +1,21 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from uuid import UUID
 
+from ..config.config import settings
 from ..repositories.repositories import ChatRepository
+from .participant_index import participant_index
+from .read_receipts import read_receipt_buffer
 from ..models.chat_models import Conversation, Message
-from ..models.chat_schemas import ConversationCreate, MessageCreate
+from ..models.chat_schemas import (
+    ConversationCreate, ConversationFilter, ConversationListResponse,
+    MessageCreate, MessageFilter, MessageResponse, MessageUpdate, PaginatedResponse
+)
+from ..utils.pagination import decode_cursor, encode_cursor
+from ..utils.typing_store import create_typing_store
+
+# Typing state lives only in this TTL store, never in the database
+typing_store = create_typing_store(settings.TYPING_STORE_BACKEND, settings.REDIS_URL)
 
 class ChatService:
     @staticmethod
@@ -11,8 +23,28 @@ class ChatService:
         return ChatRepository.create_conversation(db, conversation_data, user_id)
 
     @staticmethod
-    def get_user_conversations(db: Session, user_id: int) -> List[Conversation]:
-        return ChatRepository.get_user_conversations(db, user_id)
+    def get_user_conversations(
+        db: Session,
+        user_id: int,
+        filters: Optional[ConversationFilter] = None,
+        page: int = 1,
+        limit: int = 20
+    ) -> List[ConversationListResponse]:
+        rows = ChatRepository.get_user_conversations(db, user_id, filters, page, limit)
+        return [
+            ConversationListResponse(
+                id=conversation.id,
+                title=conversation.title,
+                conversation_type=conversation.conversation_type,
+                related_listing_title=conversation.related_listing_title,
+                last_message_at=conversation.last_message_at,
+                last_message_preview=conversation.last_message_preview,
+                unread_count=participant.unread_count,
+                is_archived=conversation.is_archived,
+                is_muted=conversation.is_muted
+            )
+            for participant, conversation in rows
+        ]
 
     @staticmethod
     def get_conversation(db: Session, conversation_id: int, user_id: int) -> Optional[Conversation]:
@@ -23,5 +55,96 @@ class ChatService:
         return ChatRepository.create_message(db, conversation_id, message_data, user_id)
 
     @staticmethod
-    def get_messages(db: Session, conversation_id: int, user_id: int) -> Optional[List[Message]]:
-        return ChatRepository.get_messages(db, conversation_id, user_id)
\ No newline at end of file
+    def get_messages(
+        db: Session,
+        conversation_id: UUID,
+        user_id: int,
+        filters: Optional[MessageFilter] = None,
+        limit: int = 50
+    ) -> Optional[PaginatedResponse]:
+        result = ChatRepository.get_messages(db, conversation_id, user_id, filters, limit)
+        if result is None:
+            return None
+
+        messages, has_older, has_newer = result
+        return PaginatedResponse(
+            items=[MessageResponse.model_validate(message) for message in messages],
+            limit=limit,
+            has_next=has_newer,
+            has_prev=has_older,
+            next_cursor=encode_cursor(messages[-1].timestamp, messages[-1].id) if messages and has_newer else None,
+            prev_cursor=encode_cursor(messages[0].timestamp, messages[0].id) if messages and has_older else None
+        )
+
+    @staticmethod
+    def is_participant(db: Session, conversation_id: UUID, user_id: int) -> bool:
+        if participant_index.is_warm:
+            return user_id in participant_index.participants(conversation_id)
+        return ChatRepository.get_conversation(db, conversation_id, user_id) is not None
+
+    @staticmethod
+    def mark_message_read(db: Session, message_id: UUID, user_id: int) -> bool:
+        """Queue a read receipt; it is written in the next bulk flush."""
+        conversation_id = ChatRepository.get_message_conversation_id(db, message_id)
+        if conversation_id is None or not ChatService.is_participant(db, conversation_id, user_id):
+            return False
+        read_receipt_buffer.record(conversation_id, user_id, message_id)
+        return True
+
+    @staticmethod
+    def mark_conversation_read(db: Session, conversation_id: UUID, user_id: int) -> bool:
+        return ChatRepository.mark_conversation_read(db, conversation_id, user_id)
+
+    @staticmethod
+    async def set_typing_indicator(db: Session, conversation_id: UUID, user_id: int, is_typing: bool = True) -> bool:
+        if not ChatService.is_participant(db, conversation_id, user_id):
+            return False
+        if is_typing:
+            await typing_store.set_typing(conversation_id, user_id, settings.TYPING_INDICATOR_TTL_SECONDS)
+        else:
+            await typing_store.clear_typing(conversation_id, user_id)
+        return True
+
+    @staticmethod
+    async def get_typing_users(db: Session, conversation_id: UUID, user_id: int) -> Optional[List[int]]:
+        if not ChatService.is_participant(db, conversation_id, user_id):
+            return None
+        return await typing_store.get_typing(conversation_id)
+
+    @staticmethod
+    def update_message(db: Session, message_id: UUID, update_data: MessageUpdate, user_id: int) -> Optional[Message]:
+        return ChatRepository.update_message(db, message_id, update_data, user_id)
+
+    @staticmethod
+    def delete_message(db: Session, message_id: UUID, user_id: int) -> bool:
+        return ChatRepository.delete_message(db, message_id, user_id)
+
+    @staticmethod
+    def search_messages(
+        db: Session,
+        query: str,
+        user_id: int,
+        conversation_id: Optional[UUID] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> PaginatedResponse:
+        after = None
+        if cursor:
+            rank, message_id = decode_cursor(cursor, 2)
+            try:
+                after = (float(rank), UUID(message_id))
+            except (TypeError, AttributeError) as e:
+                raise ValueError(f"Invalid cursor: {e}")
+
+        hits, has_more = ChatRepository.search_messages(db, query, user_id, conversation_id, limit, after)
+        return PaginatedResponse(
+            items=[MessageResponse.model_validate(message) for _, message in hits],
+            limit=limit,
+            has_next=has_more,
+            has_prev=cursor is not None,
+            next_cursor=encode_cursor(hits[-1][0], hits[-1][1].id) if hits and has_more else None
+        )
+
+    @staticmethod
+    def search_conversations(db: Session, query: str, user_id: int, page: int = 1, limit: int = 20) -> List[ConversationListResponse]:
+        return ChatService.get_user_conversations(db, user_id, ConversationFilter(search_query=query), page, limit)
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is only required for the shared backplane
+    aioredis = None
+
+# Handlers receive (channel, payload) for every message published on a subscribed channel
+MessageHandler = Callable[[str, str], Awaitable[None]]
+
+
+class PubSubBackend(ABC):
+    """Base class for the backplane that fans chat events out across workers."""
+
+    def __init__(self):
+        self._handlers: Dict[str, Set[MessageHandler]] = {}
+
+    @abstractmethod
+    async def publish(self, channel: str, payload: str) -> None:
+        ...
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """Register a handler for a channel."""
+        handlers = self._handlers.setdefault(channel, set())
+        first = not handlers
+        handlers.add(handler)
+        if first:
+            await self._on_first_subscriber(channel)
+
+    async def unsubscribe(self, channel: str, handler: MessageHandler) -> None:
+        """Remove a handler from a channel."""
+        handlers = self._handlers.get(channel)
+        if not handlers:
+            return
+        handlers.discard(handler)
+        if not handlers:
+            del self._handlers[channel]
+            await self._on_last_unsubscriber(channel)
+
+    async def _dispatch(self, channel: str, payload: str) -> None:
+        """Deliver a payload to every local handler of a channel."""
+        handlers = list(self._handlers.get(channel, ()))
+        if not handlers:
+            return
+        results = await asyncio.gather(
+            *(handler(channel, payload) for handler in handlers),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Pub/sub handler failed on channel {channel}: {result}")
+
+    async def _on_first_subscriber(self, channel: str) -> None:
+        pass
+
+    async def _on_last_unsubscriber(self, channel: str) -> None:
+        pass
+
+    async def close(self) -> None:
+        self._handlers.clear()
+
+
+class InMemoryPubSub(PubSubBackend):
+    """Single-process backplane; managers sharing an instance behave like separate workers."""
+
+    async def publish(self, channel: str, payload: str) -> None:
+        await self._dispatch(channel, payload)
+
+
+class RedisPubSub(PubSubBackend):
+    """Redis-compatible backplane shared by every worker and node."""
+
+    def __init__(self, url: str):
+        super().__init__()
+        if aioredis is None:
+            raise RuntimeError("The redis package is required for the redis pub/sub backend")
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._reader: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, payload: str) -> None:
+        await self._redis.publish(channel, payload)
+
+    async def _on_first_subscriber(self, channel: str) -> None:
+        await self._pubsub.subscribe(channel)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def _on_last_unsubscriber(self, channel: str) -> None:
+        await self._pubsub.unsubscribe(channel)
+
+    async def _read_loop(self) -> None:
+        """Pump messages from redis into the local handlers."""
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    await self._dispatch(message["channel"], message["data"])
+                elif not self._pubsub.subscribed:
+                    await asyncio.sleep(0.1)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis pub/sub read failed: {e}")
+                await asyncio.sleep(1.0)
+
+    async def close(self) -> None:
+        if self._reader:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+        await self._pubsub.close()
+        await self._redis.close()
+        await super().close()
+
+
+def create_pubsub_backend(backend: str, redis_url: Optional[str] = None) -> PubSubBackend:
+    """Build the configured pub/sub backend."""
+    if backend == "redis":
+        return RedisPubSub(redis_url)
+    if backend == "memory":
+        return InMemoryPubSub()
+    raise ValueError(f"Unknown pub/sub backend: {backend}")
@@ -0,0 +1,111 @@
+import time
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is only required for the shared store
+    aioredis = None
+
+
+class TypingStore(ABC):
+    """Short-lived typing state; entries expire on their own and never reach the database."""
+
+    @abstractmethod
+    async def set_typing(self, conversation_id: UUID, user_id: int, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def clear_typing(self, conversation_id: UUID, user_id: int) -> None:
+        ...
+
+    @abstractmethod
+    async def get_typing(self, conversation_id: UUID) -> List[int]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryTypingStore(TypingStore):
+    """Per-process TTL store."""
+
+    # Full sweep of abandoned conversations every N writes
+    SWEEP_EVERY = 1000
+
+    def __init__(self):
+        self._entries: Dict[UUID, Dict[int, float]] = {}
+        self._writes = 0
+
+    def _prune(self, conversation_id: UUID, now: float) -> Dict[int, float]:
+        users = self._entries.get(conversation_id)
+        if users is None:
+            return {}
+        for user_id in [u for u, expires_at in users.items() if expires_at <= now]:
+            del users[user_id]
+        if not users:
+            del self._entries[conversation_id]
+        return users
+
+    async def set_typing(self, conversation_id: UUID, user_id: int, ttl: float) -> None:
+        now = time.monotonic()
+        self._entries.setdefault(conversation_id, {})[user_id] = now + ttl
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            for key in list(self._entries):
+                self._prune(key, now)
+
+    async def clear_typing(self, conversation_id: UUID, user_id: int) -> None:
+        users = self._entries.get(conversation_id)
+        if users is not None:
+            users.pop(user_id, None)
+            if not users:
+                del self._entries[conversation_id]
+
+    async def get_typing(self, conversation_id: UUID) -> List[int]:
+        return list(self._prune(conversation_id, time.monotonic()))
+
+
+class RedisTypingStore(TypingStore):
+    """Shared store: one sorted set per conversation scored by expiry time."""
+
+    def __init__(self, url: str):
+        if aioredis is None:
+            raise RuntimeError("The redis package is required for the redis typing store")
+        self._redis = aioredis.from_url(url, decode_responses=True)
+
+    @staticmethod
+    def _key(conversation_id: UUID) -> str:
+        return f"chat:typing:{conversation_id}"
+
+    async def set_typing(self, conversation_id: UUID, user_id: int, ttl: float) -> None:
+        key = self._key(conversation_id)
+        now = time.time()
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(key, {str(user_id): now + ttl})
+            pipe.zremrangebyscore(key, "-inf", now)
+            pipe.expire(key, int(ttl) + 1)
+            await pipe.execute()
+
+    async def clear_typing(self, conversation_id: UUID, user_id: int) -> None:
+        await self._redis.zrem(self._key(conversation_id), str(user_id))
+
+    async def get_typing(self, conversation_id: UUID) -> List[int]:
+        members = await self._redis.zrangebyscore(self._key(conversation_id), time.time(), "+inf")
+        return [int(member) for member in members]
+
+    async def close(self) -> None:
+        await self._redis.close()
+
+
+def create_typing_store(backend: str, redis_url: Optional[str] = None) -> TypingStore:
+    """Build the configured typing store."""
+    if backend == "redis":
+        return RedisTypingStore(redis_url)
+    if backend == "memory":
+        return InMemoryTypingStore()
+    raise ValueError(f"Unknown typing store backend: {backend}")
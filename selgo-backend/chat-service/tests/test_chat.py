@@ -1,13 +1,41 @@
+import asyncio
+import httpx
 import pytest
+import time
+from datetime import datetime, timedelta
+from uuid import UUID as PyUUID, uuid4
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
+from jose import jwt
 from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker
 from ..src.main import app
-from ..src.database.database import Base, get_db
-from ..src.models.chat_models import Conversation, Message, Participant
+from ..src.database.database import get_db
+from ..src.utils.auth import get_current_user_id
+from ..src.utils.auth_client import AuthClient
+from ..src.models.chat_models import Base, Conversation, Message, Participant
+from ..src.models.chat_schemas import WebSocketMessage
+from ..src.api import routes
+from ..src.api.routes import ConnectionManager
+from ..src.repositories.message_search import index_message, memory_search_index
+from ..src.services.participant_index import ParticipantIndex
+from ..src.utils.pagination import encode_cursor
+from ..src.utils.pubsub import InMemoryPubSub
+from ..src.utils.typing_store import InMemoryTypingStore
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
+# The models use Postgres column types; render SQLite equivalents for the test database
+@compiles(UUID, "sqlite")
+def compile_uuid(type_, compiler, **kw):
+    return "CHAR(32)"
+
+@compiles(TSVECTOR, "sqlite")
+def compile_tsvector(type_, compiler, **kw):
+    return "TEXT"
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
@@ -23,6 +51,7 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_current_user_id] = lambda: 1
 
 client = TestClient(app)
 
@@ -33,21 +62,21 @@ def setup_database():
     Base.metadata.drop_all(bind=engine)
 
 def test_create_conversation():
-    response = client.post("/api/v1/chats/conversations", json={"participant_id": 2})
+    response = client.post("/api/v1/chats/conversations", json={"participant_ids": [2]})
     assert response.status_code == 201
     data = response.json()
     assert data["id"] is not None
     assert len(data["participants"]) == 2
 
 def test_get_conversations():
-    client.post("/api/v1/chats/conversations", json={"participant_id": 2})
+    client.post("/api/v1/chats/conversations", json={"participant_ids": [2]})
     response = client.get("/api/v1/chats/conversations")
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 1
 
 def test_get_conversation():
-    conversation_response = client.post("/api/v1/chats/conversations", json={"participant_id": 2})
+    conversation_response = client.post("/api/v1/chats/conversations", json={"participant_ids": [2]})
     conversation_id = conversation_response.json()["id"]
     response = client.get(f"/api/v1/chats/conversations/{conversation_id}")
     assert response.status_code == 200
@@ -55,7 +84,7 @@ def test_get_conversation():
     assert data["id"] == conversation_id
 
 def test_create_message():
-    conversation_response = client.post("/api/v1/chats/conversations", json={"participant_id": 2})
+    conversation_response = client.post("/api/v1/chats/conversations", json={"participant_ids": [2]})
     conversation_id = conversation_response.json()["id"]
     response = client.post(
         f"/api/v1/chats/conversations/{conversation_id}/messages",
@@ -66,7 +95,7 @@ def test_create_message():
     assert data["content"] == "Hello, world!"
 
 def test_get_messages():
-    conversation_response = client.post("/api/v1/chats/conversations", json={"participant_id": 2})
+    conversation_response = client.post("/api/v1/chats/conversations", json={"participant_ids": [2]})
     conversation_id = conversation_response.json()["id"]
     client.post(
         f"/api/v1/chats/conversations/{conversation_id}/messages",
@@ -75,5 +104,334 @@ def test_get_messages():
     response = client.get(f"/api/v1/chats/conversations/{conversation_id}/messages")
     assert response.status_code == 200
     data = response.json()
-    assert len(data) == 1
-    assert data[0]["content"] == "Hello, world!"
+    assert len(data["items"]) == 1
+    assert data["items"][0]["content"] == "Hello, world!"
+    assert data["has_next"] is False and data["has_prev"] is False
+
+def test_get_messages_pages_with_before_and_after_cursors():
+    conversation_response = client.post("/api/v1/chats/conversations", json={"participant_ids": [2]})
+    conversation_id = conversation_response.json()["id"]
+    for i in range(5):
+        message_id = client.post(
+            f"/api/v1/chats/conversations/{conversation_id}/messages",
+            json={"content": f"message {i}"},
+        ).json()["id"]
+        # SQLite timestamps have one-second resolution; space the messages out
+        db = TestingSessionLocal()
+        db.query(Message).filter(Message.id == PyUUID(message_id)).update(
+            {Message.timestamp: datetime(2024, 1, 1) + timedelta(minutes=i)}
+        )
+        db.commit()
+        db.close()
+    url = f"/api/v1/chats/conversations/{conversation_id}/messages"
+
+    newest = client.get(url, params={"limit": 2}).json()
+    assert [m["content"] for m in newest["items"]] == ["message 3", "message 4"]
+    assert newest["has_next"] is False and newest["has_prev"] is True
+
+    older = client.get(url, params={"limit": 2, "before": newest["prev_cursor"]}).json()
+    assert [m["content"] for m in older["items"]] == ["message 1", "message 2"]
+    assert older["has_next"] is True
+
+    oldest = client.get(url, params={"limit": 2, "before": older["prev_cursor"]}).json()
+    assert [m["content"] for m in oldest["items"]] == ["message 0"]
+    assert oldest["has_prev"] is False and oldest["prev_cursor"] is None
+
+    newer = client.get(url, params={"limit": 2, "after": oldest["next_cursor"]}).json()
+    assert [m["content"] for m in newer["items"]] == ["message 1", "message 2"]
+    assert newer["has_next"] is True
+
+def test_get_messages_rejects_malformed_cursors():
+    conversation_response = client.post("/api/v1/chats/conversations", json={"participant_ids": [2]})
+    conversation_id = conversation_response.json()["id"]
+    url = f"/api/v1/chats/conversations/{conversation_id}/messages"
+    for cursor in ["not-a-cursor", encode_cursor(1, 2), encode_cursor([1], {"a": 1})]:
+        response = client.get(url, params={"before": cursor})
+        assert response.status_code == 400
+
+def test_inbox_tracks_unread_counts_per_participant():
+    conversation_response = client.post("/api/v1/chats/conversations", json={"participant_ids": [2]})
+    conversation_id = conversation_response.json()["id"]
+    app.dependency_overrides[get_current_user_id] = lambda: 2
+    try:
+        for content in ["one", "two", "three"]:
+            client.post(f"/api/v1/chats/conversations/{conversation_id}/messages", json={"content": content})
+        sender_inbox = client.get("/api/v1/chats/conversations").json()
+    finally:
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+
+    inbox = client.get("/api/v1/chats/conversations").json()
+    assert inbox[0]["unread_count"] == 3
+    assert inbox[0]["last_message_preview"] == "three"
+    assert sender_inbox[0]["unread_count"] == 0
+
+    client.post(f"/api/v1/chats/conversations/{conversation_id}/read-all")
+    inbox = client.get("/api/v1/chats/conversations").json()
+    assert inbox[0]["unread_count"] == 0
+
+def test_inbox_lists_conversations_by_last_activity():
+    earlier_id = client.post("/api/v1/chats/conversations", json={"participant_ids": [2]}).json()["id"]
+    latest_id = client.post("/api/v1/chats/conversations", json={"participant_ids": [3]}).json()["id"]
+    client.post(f"/api/v1/chats/conversations/{earlier_id}/messages", json={"content": "hello"})
+    # SQLite timestamps have one-second resolution
+    time.sleep(1.1)
+    client.post(f"/api/v1/chats/conversations/{latest_id}/messages", json={"content": "hello"})
+
+    db = TestingSessionLocal()
+    try:
+        assert db.query(Participant).filter(Participant.last_activity_at.is_(None)).count() == 0
+    finally:
+        db.close()
+    assert [conversation["id"] for conversation in client.get("/api/v1/chats/conversations").json()] == [latest_id, earlier_id]
+
+def test_search_messages_pages_ranked_matches():
+    memory_search_index.is_built = False
+    conversation_response = client.post("/api/v1/chats/conversations", json={"participant_ids": [2]})
+    conversation_id = conversation_response.json()["id"]
+    for content in ["red car for sale", "blue car", "red red bike"]:
+        client.post(f"/api/v1/chats/conversations/{conversation_id}/messages", json={"content": content})
+
+    first = client.get("/api/v1/chats/search/messages", params={"query": "red", "limit": 1}).json()
+    assert [m["content"] for m in first["items"]] == ["red red bike"]
+    assert first["has_next"] is True
+    second = client.get(
+        "/api/v1/chats/search/messages", params={"query": "red", "limit": 1, "cursor": first["next_cursor"]}
+    ).json()
+    assert [m["content"] for m in second["items"]] == ["red car for sale"]
+    assert second["next_cursor"] is None
+
+    both = client.get("/api/v1/chats/search/messages", params={"query": "car red"}).json()
+    assert [m["content"] for m in both["items"]] == ["red car for sale"]
+
+    for cursor in ["not-a-cursor", encode_cursor([1], 2), encode_cursor(0.5, 7)]:
+        response = client.get("/api/v1/chats/search/messages", params={"query": "red", "cursor": cursor})
+        assert response.status_code == 400
+
+def test_memory_search_index_only_takes_committed_messages():
+    conversation_id = PyUUID(client.post("/api/v1/chats/conversations", json={"participant_ids": [2]}).json()["id"])
+    db = TestingSessionLocal()
+    try:
+        memory_search_index.build(db)
+        for content in ["rolled back boat", "committed boat"]:
+            message = Message(conversation_id=conversation_id, sender_id=1, content=content)
+            db.add(message)
+            db.flush()
+            index_message(db, message)
+            message_id = message.id
+            assert memory_search_index.search("boat", {conversation_id}) == []
+            if content.startswith("rolled back"):
+                db.rollback()
+            else:
+                db.commit()
+        assert [hit for _, hit in memory_search_index.search("boat", {conversation_id})] == [message_id]
+    finally:
+        db.close()
+        memory_search_index.is_built = False
+
+def test_search_conversations_matches_last_message_and_participant():
+    conversation_response = client.post("/api/v1/chats/conversations", json={"participant_ids": [42]})
+    conversation_id = conversation_response.json()["id"]
+    client.post(f"/api/v1/chats/conversations/{conversation_id}/messages", json={"content": "Is the bike available?"})
+
+    for query in ["bike", "42"]:
+        results = client.get("/api/v1/chats/search/conversations", params={"query": query}).json()
+        assert [result["id"] for result in results] == [conversation_id]
+    assert client.get("/api/v1/chats/search/conversations", params={"query": "boat"}).json() == []
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+def test_send_to_conversation_fans_out_across_workers():
+    async def scenario():
+        backplane = InMemoryPubSub()
+        worker_a = ConnectionManager(backplane, ParticipantIndex())
+        worker_b = ConnectionManager(backplane, ParticipantIndex())
+        conversation_id = uuid4()
+        sender, recipient, bystander = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+
+        await worker_a.connect(1, sender)
+        await worker_b.connect(2, recipient)
+        await worker_b.connect(3, bystander)
+        await worker_a.join_conversation(conversation_id, [1, 2])
+
+        message = WebSocketMessage(type="new_message", conversation_id=conversation_id, data={})
+        await worker_a.send_to_conversation(conversation_id, message, exclude_user=1)
+        return sender.sent, recipient.sent, bystander.sent
+
+    sender_sent, recipient_sent, bystander_sent = asyncio.run(scenario())
+    assert sender_sent == []
+    assert len(recipient_sent) == 1
+    assert bystander_sent == []
+
+def test_slow_socket_does_not_stall_conversation_fan_out():
+    class StalledWebSocket(FakeWebSocket):
+        async def send_text(self, text):
+            await asyncio.sleep(60)
+
+    async def scenario():
+        index = ParticipantIndex()
+        worker = ConnectionManager(InMemoryPubSub(), index)
+        worker.send_timeout = 0.05
+        conversation_id = uuid4()
+        index.add(conversation_id, [1, 2])
+        stalled, healthy = StalledWebSocket(), FakeWebSocket()
+
+        await worker.connect(1, stalled)
+        await worker.connect(2, healthy)
+        message = WebSocketMessage(type="new_message", conversation_id=conversation_id, data={})
+        await worker.send_to_conversation(conversation_id, message)
+        return healthy.sent, worker.active_connections
+
+    healthy_sent, active_connections = asyncio.run(scenario())
+    assert len(healthy_sent) == 1
+    assert 1 not in active_connections
+
+def test_websocket_skips_malformed_messages_and_disconnects_on_errors(monkeypatch):
+    monkeypatch.setattr(routes, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(routes.participant_index, "is_warm", False)
+    conversation_id = client.post("/api/v1/chats/conversations", json={"participant_ids": [2]}).json()["id"]
+
+    with client.websocket_connect("/api/v1/chats/ws/1") as websocket:
+        websocket.send_text("not json")
+        websocket.send_json({"type": "typing", "conversation_id": "not-a-uuid"})
+        websocket.send_json({"type": "read_receipt", "conversation_id": conversation_id})
+        websocket.send_json({"type": "typing", "conversation_id": conversation_id})
+        # The socket is still served after the bad messages
+        for _ in range(100):
+            if asyncio.run(routes.typing_store.get_typing(PyUUID(conversation_id))):
+                break
+            time.sleep(0.01)
+        assert asyncio.run(routes.typing_store.get_typing(PyUUID(conversation_id))) == [1]
+    assert routes.participant_index.is_warm
+    assert 1 not in routes.manager.active_connections
+
+    async def unavailable(*args):
+        raise ConnectionError("typing store unavailable")
+
+    monkeypatch.setattr(routes.typing_store, "set_typing", unavailable)
+    with pytest.raises(ConnectionError):
+        with client.websocket_connect("/api/v1/chats/ws/1") as websocket:
+            websocket.send_json({"type": "typing", "conversation_id": conversation_id})
+            websocket.receive_text()
+    assert 1 not in routes.manager.active_connections
+
+def test_typing_indicators_expire_without_database():
+    async def scenario():
+        store = InMemoryTypingStore()
+        conversation_id = uuid4()
+        await store.set_typing(conversation_id, 1, ttl=0.05)
+        await store.set_typing(conversation_id, 2, ttl=30)
+        before = await store.get_typing(conversation_id)
+        await asyncio.sleep(0.1)
+        after = await store.get_typing(conversation_id)
+        return before, after
+
+    before, after = asyncio.run(scenario())
+    assert sorted(before) == [1, 2]
+    assert after == [2]
+
+
+def fake_auth_service(handler):
+    auth = AuthClient()
+    auth.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return auth
+
+def test_auth_client_caches_and_coalesces_token_validations():
+    calls = []
+
+    async def validate(request):
+        calls.append(request.headers["Authorization"])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"user_id": 7, "username": "seller"})
+
+    async def scenario():
+        auth = fake_auth_service(validate)
+        concurrent = await asyncio.gather(*[auth.validate_token("token-a") for _ in range(5)])
+        cached = await auth.validate_token("token-a")
+        expired = jwt.encode({"sub": "7", "exp": int(time.time()) - 10}, "secret")
+        await auth.validate_token(expired)
+        await auth.validate_token(expired)
+        await auth.close()
+        return concurrent, cached, auth.cache_stats()
+
+    concurrent, cached, stats = asyncio.run(scenario())
+    assert all(user["user_id"] == 7 for user in concurrent) and cached["user_id"] == 7
+    # One round-trip for token-a; a token past its exp is never cached
+    assert len(calls) == 3
+    assert stats["coalesced"] == 4 and stats["hits"] == 1 and stats["size"] == 1
+
+def test_auth_client_local_mode_verifies_and_applies_revocations():
+    def token(jti, **claims):
+        payload = {"sub": "7", "type": "access", "jti": jti, "exp": int(time.time()) + 600}
+        return jwt.encode({**payload, **claims}, "shared-secret", algorithm="HS256")
+
+    async def revocations(request):
+        assert request.url.path == "/api/v1/auth/revocations"
+        return httpx.Response(200, json={
+            "revocations": [{"jti": "revoked", "expires_at": "2999-01-01T00:00:00"}],
+            "server_time": "2024-01-01T00:00:00"
+        })
+
+    async def scenario():
+        auth = fake_auth_service(revocations)
+        auth.verify_mode, auth.jwt_algorithm, auth.jwt_secret = "local", "HS256", "shared-secret"
+        await auth.refresh_revocations()
+        results = [await auth.validate_token(token("valid"))]
+        for bad in [token("revoked"), token("refresh", type="refresh"), jwt.encode({"sub": "7"}, "other-key")]:
+            try:
+                await auth.validate_token(bad)
+                results.append(None)
+            except HTTPException as e:
+                results.append(e.status_code)
+        await auth.close()
+        return results
+
+    valid, *rejected = asyncio.run(scenario())
+    assert valid["user_id"] == 7
+    assert rejected == [401, 401, 401]
+
+def test_auth_client_local_mode_waits_for_revocations_and_falls_back_when_stale():
+    calls = []
+    revoked = jwt.encode({"sub": "7", "type": "access", "jti": "revoked", "exp": int(time.time()) + 600},
+                         "shared-secret", algorithm="HS256")
+
+    async def auth_service(request):
+        calls.append(request.url.path)
+        if request.url.path == "/api/v1/auth/validate":
+            return httpx.Response(401)
+        if len(calls) > 1:
+            return httpx.Response(503)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={
+            "revocations": [{"jti": "revoked", "expires_at": "2999-01-01T00:00:00"}],
+            "server_time": "2024-01-01T00:00:00"
+        })
+
+    async def scenario():
+        auth = fake_auth_service(auth_service)
+        auth.verify_mode, auth.jwt_algorithm, auth.jwt_secret = "local", "HS256", "shared-secret"
+        auth.revocation_poll_interval, auth.revocation_max_staleness = 0.01, 0.05
+        statuses = []
+        for delay in (0, 0.1):
+            await asyncio.sleep(delay)
+            try:
+                await auth.validate_token(revoked)
+            except HTTPException as e:
+                statuses.append((e.status_code, e.detail))
+        await auth.close()
+        return statuses
+
+    first, stale = asyncio.run(scenario())
+    # The first request is checked against the initial poll rather than an empty revocation list
+    assert first == (401, "Token has been revoked")
+    # Once the polls keep failing, auth-service validates the token itself
+    assert stale == (401, "Invalid or expired token")
+    assert calls[0] == "/api/v1/auth/revocations" and calls[-1] == "/api/v1/auth/validate"
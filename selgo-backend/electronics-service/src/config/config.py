@@ -18,6 +18,18 @@ class Settings(BaseSettings):
     
     # Auth service
     AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL", "http://localhost:8001")
+
+    # Token validation cache
+    AUTH_CACHE_MAX_SIZE: int = int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000"))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+    # Token verification ("remote" calls auth-service per token, "local" verifies JWTs in-process)
+    AUTH_VERIFY_MODE: str = os.getenv("AUTH_VERIFY_MODE", "remote")
+    AUTH_JWT_ALGORITHM: str = os.getenv("AUTH_JWT_ALGORITHM", "HS256")
+    AUTH_JWT_SECRET: str = os.getenv("AUTH_JWT_SECRET", "")  # Shared key for HS256; RS256 keys come from auth-service JWKS
+    AUTH_REVOCATION_POLL_SECONDS: float = float(os.getenv("AUTH_REVOCATION_POLL_SECONDS", "30"))
+    # Local verification falls back to auth-service while revocations are older than this
+    AUTH_REVOCATION_MAX_STALENESS_SECONDS: float = float(os.getenv("AUTH_REVOCATION_MAX_STALENESS_SECONDS", "90"))
     
     # Upload settings
     UPLOAD_FOLDER: str = os.getenv("UPLOAD_FOLDER", "uploads")
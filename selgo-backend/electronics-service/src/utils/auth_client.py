@@ -1,16 +1,119 @@
 import httpx
 from fastapi import HTTPException, status
-from typing import Dict, Any, Optional
+from jose import JWTError, jwt
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from ..config.config import settings
 import logging
 import asyncio
+import base64
+import hashlib
+import json
+import time
 
 logger = logging.getLogger(__name__)
 
+class TokenCache:
+    """Bounded LRU cache of validated tokens; entries never outlive the token's own exp."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(token: str) -> str:
+        # Raw tokens are never kept in memory as cache keys
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def token_expiry(token: str) -> Optional[float]:
+        """Read the JWT exp claim without verifying; only used to bound the cache lifetime."""
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+            return float(exp) if exp is not None else None
+        except Exception:
+            return None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user_data = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user_data
+
+    def set(self, key: str, user_data: Dict[str, Any], token_exp: Optional[float] = None):
+        lifetime = self.ttl
+        if token_exp is not None:
+            lifetime = min(lifetime, token_exp - time.time())
+        if lifetime <= 0 or self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + lifetime, user_data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced
+        }
+
 class AuthClient:
+    # Unknown kids trigger a JWKS refetch at most this often
+    JWKS_REFRESH_SECONDS = 30.0
+    # Each revocation poll overlaps the previous one so late commits are not missed
+    REVOCATION_POLL_OVERLAP_SECONDS = 5.0
+
     def __init__(self):
         self.auth_service_url = getattr(settings, 'AUTH_SERVICE_URL', 'http://localhost:8001')
         self.client = None
+        self.cache = TokenCache(
+            max_size=getattr(settings, 'AUTH_CACHE_MAX_SIZE', 10000),
+            ttl=getattr(settings, 'AUTH_CACHE_TTL_SECONDS', 60.0)
+        )
+        # Validations currently in flight, so concurrent requests with one token share a round-trip
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # "local" verifies JWTs in-process and only talks to auth-service for keys and revocations
+        self.verify_mode = getattr(settings, 'AUTH_VERIFY_MODE', 'remote')
+        self.jwt_algorithm = getattr(settings, 'AUTH_JWT_ALGORITHM', 'HS256')
+        self.jwt_secret = getattr(settings, 'AUTH_JWT_SECRET', '')
+        self.revocation_poll_interval = getattr(settings, 'AUTH_REVOCATION_POLL_SECONDS', 30.0)
+        # Older revocation data is not trusted; tokens are validated by auth-service instead
+        self.revocation_max_staleness = getattr(settings, 'AUTH_REVOCATION_MAX_STALENESS_SECONDS', 90.0)
+        self._jwks: Dict[str, Dict[str, Any]] = {}
+        self._jwks_fetched_at = float("-inf")
+        self._revoked: Dict[str, float] = {}  # jti -> token exp (epoch seconds)
+        self._revocations_since: Optional[datetime] = None
+        self._revocations_fetched_at = float("-inf")
+        self._revocation_task: Optional[asyncio.Task] = None
+        self._revocation_refresh: Optional[asyncio.Future] = None
         self._create_client()
 
     def _create_client(self):
@@ -24,10 +127,37 @@ class AuthClient:
             logger.error(f"Failed to create HTTP client: {e}")
 
     async def validate_token(self, token: str) -> Dict[str, Any]:
-        """Validate token with auth service and return user data."""
+        """Validate token, served from the cache when possible, and return user data."""
+        if self.verify_mode == "local":
+            return await self._validate_local(token)
+        return await self._validate_cached(token)
+
+    async def _validate_cached(self, token: str) -> Dict[str, Any]:
+        key = self.cache.key(token)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._validate_and_cache(key, token))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.cache.coalesced += 1
+        return dict(await asyncio.shield(inflight))
+
+    async def _validate_and_cache(self, key: str, token: str) -> Dict[str, Any]:
+        user_data, cacheable = await self._validate_remote(token)
+        if cacheable:
+            self.cache.set(key, user_data, self.cache.token_expiry(token))
+        return user_data
+
+    async def _validate_remote(self, token: str) -> Tuple[Dict[str, Any], bool]:
+        """Round-trip to the auth service; returns (user_data, cacheable)."""
         if not self.client:
             self._create_client()
-            
+
         try:
             logger.info(f"Validating token with auth service at {self.auth_service_url}")
             response = await self.client.post(
@@ -35,13 +165,13 @@ class AuthClient:
                 headers={"Authorization": f"Bearer {token}"},
                 timeout=5.0
             )
-            
+
             logger.info(f"Auth service response status: {response.status_code}")
-            
+
             if response.status_code == 200:
                 user_data = response.json()
                 logger.info(f"Token validation successful for user: {user_data.get('username')}")
-                return user_data
+                return user_data, True
             else:
                 logger.warning(f"Token validation failed with status {response.status_code}: {response.text}")
                 raise HTTPException(
@@ -53,7 +183,7 @@ class AuthClient:
             # Fallback to development mode if auth service is unavailable
             if settings.ENVIRONMENT == "development":
                 logger.info("Falling back to development mode authentication")
-                return self._mock_user_data()
+                return self._mock_user_data(), False
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Authentication service unavailable"
@@ -62,12 +192,127 @@ class AuthClient:
             logger.error(f"Auth service timeout: {e}")
             if settings.ENVIRONMENT == "development":
                 logger.info("Falling back to development mode due to timeout")
-                return self._mock_user_data()
+                return self._mock_user_data(), False
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Authentication service timeout"
             )
 
+    async def _validate_local(self, token: str) -> Dict[str, Any]:
+        """
+        Check signature, exp, token type and revocation without calling auth-service.
+        
+        Until revocations have been polled, and whenever the last successful poll
+        is older than revocation_max_staleness, a revoked token could pass here;
+        such tokens are validated by auth-service instead.
+        """
+        self._ensure_revocation_poller()
+        if self._revocations_stale():
+            # Wait for a poll already under way, such as the first one; failed polls are retried by the poller
+            if not self._revocation_refresh.done():
+                await asyncio.shield(self._revocation_refresh)
+            if self._revocations_stale():
+                logger.warning("Token revocations are stale; validating with auth service")
+                return await self._validate_cached(token)
+        try:
+            header = jwt.get_unverified_header(token)
+            key = await self._verification_key(header.get("kid"))
+            payload = jwt.decode(token, key, algorithms=[self.jwt_algorithm])
+        except JWTError as e:
+            logger.warning(f"Local token verification failed: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token"
+            )
+
+        if payload.get("type") != "access" or payload.get("sub") is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token"
+            )
+        if payload.get("jti") in self._revoked:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+
+        return {
+            "user_id": int(payload["sub"]),
+            "username": payload.get("username"),
+            "email": payload.get("email"),
+            "role": payload.get("role"),
+            "is_active": payload.get("is_active")
+        }
+
+    async def _verification_key(self, kid: Optional[str]):
+        """Shared secret for HS* tokens, otherwise the auth-service public key matching kid."""
+        if not self.jwt_algorithm.startswith(("RS", "ES")):
+            return self.jwt_secret
+        key = self._jwks.get(kid)
+        if key is None and time.monotonic() - self._jwks_fetched_at >= self.JWKS_REFRESH_SECONDS:
+            await self.refresh_jwks()
+            key = self._jwks.get(kid)
+        if key is None:
+            raise JWTError(f"No published key for kid {kid!r}")
+        return key
+
+    async def refresh_jwks(self):
+        """Fetch the auth-service public keys."""
+        if not self.client:
+            self._create_client()
+        self._jwks_fetched_at = time.monotonic()
+        try:
+            response = await self.client.get(f"{self.auth_service_url}/api/v1/auth/jwks", timeout=5.0)
+            response.raise_for_status()
+            self._jwks = {key.get("kid"): key for key in response.json().get("keys", [])}
+            logger.info(f"Loaded {len(self._jwks)} signing keys from auth service")
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"Failed to fetch auth service JWKS: {e}")
+
+    def _ensure_revocation_poller(self):
+        if self._revocation_task is None or self._revocation_task.done():
+            self._revocation_refresh = asyncio.ensure_future(self.refresh_revocations())
+            self._revocation_task = asyncio.ensure_future(self._poll_revocations())
+
+    async def _poll_revocations(self):
+        await asyncio.shield(self._revocation_refresh)
+        while True:
+            await asyncio.sleep(self.revocation_poll_interval)
+            self._revocation_refresh = asyncio.ensure_future(self.refresh_revocations())
+            await asyncio.shield(self._revocation_refresh)
+
+    def _revocations_stale(self) -> bool:
+        return time.monotonic() - self._revocations_fetched_at > self.revocation_max_staleness
+
+    async def refresh_revocations(self):
+        """Pull, in one request, every access token revoked since the previous poll."""
+        if not self.client:
+            self._create_client()
+        params = {}
+        if self._revocations_since is not None:
+            since = self._revocations_since - timedelta(seconds=self.REVOCATION_POLL_OVERLAP_SECONDS)
+            params["since"] = since.isoformat()
+        try:
+            response = await self.client.get(
+                f"{self.auth_service_url}/api/v1/auth/revocations",
+                params=params,
+                timeout=5.0
+            )
+            response.raise_for_status()
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"Failed to poll token revocations: {e}")
+            return
+
+        now = time.time()
+        for revoked in data.get("revocations", []):
+            expires_at = datetime.fromisoformat(revoked["expires_at"]).replace(tzinfo=timezone.utc)
+            self._revoked[revoked["jti"]] = expires_at.timestamp()
+        # Expired tokens fail the exp check anyway, so their revocations can be dropped
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        self._revocations_since = datetime.fromisoformat(data["server_time"])
+        self._revocations_fetched_at = time.monotonic()
+
     def _mock_user_data(self) -> Dict[str, Any]:
         """Mock user data for development."""
         return {
@@ -78,10 +323,18 @@ class AuthClient:
             "is_active": True
         }
 
+    def cache_stats(self) -> Dict[str, Any]:
+        """Token cache metrics, used to size AUTH_CACHE_MAX_SIZE / AUTH_CACHE_TTL_SECONDS."""
+        return self.cache.stats()
+
     async def close(self):
-        """Close the HTTP client."""
+        """Stop revocation polling and close the HTTP client."""
+        for task in (self._revocation_task, self._revocation_refresh):
+            if task is not None:
+                task.cancel()
+        self._revocation_task = self._revocation_refresh = None
         if self.client:
             await self.client.aclose()
 
 # Global auth client instance
-auth_client = AuthClient()
\ No newline at end of file
+auth_client = AuthClient()
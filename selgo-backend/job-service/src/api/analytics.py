@@ -3,6 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
+from uuid import UUID
 from ..database.database import get_db
 from ..services.analytics_service import JobAnalyticsService
 from ..utils.auth_utils import get_current_user
@@ -12,7 +13,7 @@ analytics_service = JobAnalyticsService()
 
 @router.get("/jobs/{job_id}", response_model=Dict[str, Any])
 async def get_job_analytics(
-    job_id: int,
+    job_id: UUID,
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
@@ -74,7 +75,7 @@ async def get_user_activity_analytics(
 
 @router.post("/track", response_model=Dict[str, str])
 async def track_job_interaction(
-    job_id: int,
+    job_id: UUID,
     interaction_type: str,
     session_id: Optional[str] = None,
     time_spent: Optional[int] = None,
@@ -84,8 +85,7 @@ async def track_job_interaction(
     """Track user interaction with job (can be anonymous)."""
     user_id = current_user["user_id"] if current_user else None
     
-    analytics_service.track_job_interaction(
-        db=db,
+    await analytics_service.track_job_interaction(
         job_id=job_id,
         interaction_type=interaction_type,
         user_id=user_id,
@@ -1,14 +1,15 @@
 # File: job-service/src/api/cv.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..database.database import get_db
 from ..services.cv_service import CVService
 from ..models.schemas import (
     CVCreate, CVUpdate, CVResponse, CVBuilderData,
-    FileUploadResponse, MessageResponse
+    FileUploadResponse, MessageResponse, CVBuildResponse, CVRenderJobResponse
 )
 from ..utils.auth_utils import get_current_user
 
@@ -22,8 +23,7 @@ async def create_cv(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new CV."""
-    mock_token = "mock_token"  # In production, extract from request
-    return cv_service.create_cv(db, mock_token, cv_data)
+    return cv_service.create_cv(db, current_user, cv_data)
 
 @router.get("/", response_model=List[CVResponse])
 async def get_user_cvs(
@@ -31,27 +31,24 @@ async def get_user_cvs(
     current_user: dict = Depends(get_current_user)
 ):
     """Get all CVs for the current user."""
-    mock_token = "mock_token"  # In production, extract from request
-    return cv_service.get_user_cvs(db, mock_token)
+    return cv_service.get_user_cvs(db, current_user)
 
-@router.post("/build", response_model=CVResponse)
+@router.post("/build", response_model=CVBuildResponse)
 async def build_cv(
     cv_builder_data: CVBuilderData,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Build CV from CV builder data (Complete Resume Builder feature)."""
-    mock_token = "mock_token"  # In production, extract from request
-    return cv_service.build_cv_from_profile(db, mock_token, cv_builder_data)
+    return cv_service.build_cv_from_profile(db, current_user, cv_builder_data)
 
-@router.post("/generate-from-profile", response_model=CVResponse)
+@router.post("/generate-from-profile", response_model=CVBuildResponse)
 async def generate_cv_from_profile(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Generate CV from user's job profile."""
-    mock_token = "mock_token"  # In production, extract from request
-    return cv_service.generate_cv_from_profile(db, mock_token)
+    return cv_service.generate_cv_from_profile(db, current_user)
 
 @router.post("/upload", response_model=FileUploadResponse)
 async def upload_cv(
@@ -61,8 +58,16 @@ async def upload_cv(
     current_user: dict = Depends(get_current_user)
 ):
     """Upload CV file (Add a CV feature)."""
-    mock_token = "mock_token"  # In production, extract from request
-    return cv_service.upload_cv(db, mock_token, file, title)
+    return cv_service.upload_cv(db, current_user, file, title)
+
+@router.get("/render-jobs/{job_id}", response_model=CVRenderJobResponse)
+async def get_cv_render_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the status of a CV PDF render."""
+    return cv_service.get_render_job(db, current_user, job_id)
 
 @router.get("/{cv_id}", response_model=CVResponse)
 async def get_cv(
@@ -71,8 +76,7 @@ async def get_cv(
     current_user: dict = Depends(get_current_user)
 ):
     """Get CV by ID."""
-    mock_token = "mock_token"  # In production, extract from request
-    return cv_service.get_cv_by_id(db, mock_token, cv_id)
+    return cv_service.get_cv_by_id(db, current_user, cv_id)
 
 @router.put("/{cv_id}", response_model=CVResponse)
 async def update_cv(
@@ -82,8 +86,7 @@ async def update_cv(
     current_user: dict = Depends(get_current_user)
 ):
     """Update CV."""
-    mock_token = "mock_token"  # In production, extract from request
-    return cv_service.update_cv(db, mock_token, cv_id, cv_data)
+    return cv_service.update_cv(db, current_user, cv_id, cv_data)
 
 @router.delete("/{cv_id}", response_model=MessageResponse)
 async def delete_cv(
@@ -92,16 +95,21 @@ async def delete_cv(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete CV."""
-    mock_token = "mock_token"  # In production, extract from request
-    return cv_service.delete_cv(db, mock_token, cv_id)
+    return cv_service.delete_cv(db, current_user, cv_id)
 
 @router.get("/{cv_id}/download")
 async def download_cv(
     cv_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Download CV as PDF (Download Profile as CV feature)."""
-    mock_token = "mock_token"  # In production, extract from request
-    file_path = cv_service.download_cv(db, mock_token, cv_id)
+    """Download CV as PDF (Download Profile as CV feature); 202 with the render job while it is being generated."""
+    file_path = cv_service.download_cv(db, current_user, cv_id)
+    if isinstance(file_path, CVRenderJobResponse):
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(file_path),
+            headers={"Location": str(request.url_for("get_cv_render_job", job_id=file_path.job_id))}
+        )
     return FileResponse(file_path, media_type='application/pdf', filename=f"cv_{cv_id}.pdf")
\ No newline at end of file
@@ -1,9 +1,9 @@
 # File: job-service/src/api/jobs.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..database.database import get_db
-from ..services.job_service import JobService
+from ..services.job_service import JobService, statistics_cache
 from sqlalchemy import func, desc
 from ..models.schemas import (
     JobStatisticsResponse, FilterOptionsResponse, JobCategoryResponse,
@@ -13,7 +13,7 @@ from ..models.schemas import (
     JobCreate, JobUpdate, JobResponse, JobSearchRequest, JobSearchResponse,
     MessageResponse, JobTypeEnum, ExperienceLevelEnum
 )
-from ..utils.auth_utils import get_current_user, get_user_from_token
+from ..utils.auth_utils import get_current_user, get_optional_user
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,9 +28,7 @@ async def create_job(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new job posting."""
-    # Extract token from current_user or create a mock token
-    mock_token = "mock_token"  # In production, extract from request
-    return job_service.create_job(db, job_data, mock_token)
+    return job_service.create_job(db, job_data, current_user)
 
 @router.get("/search", response_model=JobSearchResponse)
 def search_jobs(
@@ -94,8 +92,7 @@ async def get_job_recommendations(
     current_user: dict = Depends(get_current_user)
 ):
     """Get personalized job recommendations."""
-    mock_token = "mock_token"  # In production, extract from request
-    return job_service.get_job_recommendations(db, mock_token, limit)
+    return job_service.get_job_recommendations(db, current_user, limit)
 
 @router.get("/saved", response_model=List[JobResponse])
 async def get_saved_jobs(
@@ -103,8 +100,7 @@ async def get_saved_jobs(
     current_user: dict = Depends(get_current_user)
 ):
     """Get user's saved jobs."""
-    mock_token = "mock_token"  # In production, extract from request
-    return job_service.get_user_saved_jobs(db, mock_token)
+    return job_service.get_user_saved_jobs(db, current_user)
 
 @router.get("/viewed", response_model=List[JobResponse])
 async def get_viewed_jobs(
@@ -113,8 +109,7 @@ async def get_viewed_jobs(
     current_user: dict = Depends(get_current_user)
 ):
     """Get user's recently viewed jobs (Last Viewed Jobs feature)."""
-    mock_token = "mock_token"  # In production, extract from request
-    return job_service.get_user_viewed_jobs(db, mock_token, limit)
+    return job_service.get_user_viewed_jobs(db, current_user, limit)
 
 @router.get("/company/{company_id}", response_model=List[JobResponse])
 def get_jobs_by_company(
@@ -128,20 +123,22 @@ def get_jobs_by_company(
 @router.get("/{job_id}", response_model=JobResponse)
 def get_job_by_id(
     job_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Optional[dict] = Depends(get_optional_user)
 ):
     """Get job by ID and increment view count."""
-    # For anonymous access, pass None for user_token
-    return job_service.get_job_by_id(db, job_id, None)
+    return job_service.get_job_by_id(db, job_id, current_user, request.client.host if request.client else None)
 
 @router.get("/slug/{slug}", response_model=JobResponse)
 def get_job_by_slug(
     slug: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Optional[dict] = Depends(get_optional_user)
 ):
     """Get job by slug and increment view count."""
-    # For anonymous access, pass None for user_token
-    return job_service.get_job_by_slug(db, slug, None)
+    return job_service.get_job_by_slug(db, slug, current_user, request.client.host if request.client else None)
 
 @router.get("/{job_id}/similar", response_model=List[JobResponse])
 def get_similar_jobs(
@@ -160,8 +157,7 @@ async def update_job(
     current_user: dict = Depends(get_current_user)
 ):
     """Update job posting."""
-    mock_token = "mock_token"  # In production, extract from request
-    return job_service.update_job(db, job_id, job_data, mock_token)
+    return job_service.update_job(db, job_id, job_data, current_user)
 
 @router.delete("/{job_id}", response_model=MessageResponse)
 async def delete_job(
@@ -170,8 +166,7 @@ async def delete_job(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete job posting."""
-    mock_token = "mock_token"  # In production, extract from request
-    return job_service.delete_job(db, job_id, mock_token)
+    return job_service.delete_job(db, job_id, current_user)
 
 @router.post("/{job_id}/save", response_model=MessageResponse)
 async def save_job(
@@ -180,8 +175,7 @@ async def save_job(
     current_user: dict = Depends(get_current_user)
 ):
     """Save job for user."""
-    mock_token = "mock_token"  # In production, extract from request
-    return job_service.save_job(db, job_id, mock_token)
+    return job_service.save_job(db, job_id, current_user)
 
 @router.delete("/{job_id}/save", response_model=MessageResponse)
 async def unsave_job(
@@ -190,18 +184,17 @@ async def unsave_job(
     current_user: dict = Depends(get_current_user)
 ):
     """Remove saved job for user."""
-    mock_token = "mock_token"  # In production, extract from request
-    return job_service.unsave_job(db, job_id, mock_token)
+    return job_service.unsave_job(db, job_id, current_user)
 
 @router.get("/statistics", response_model=JobStatisticsResponse)
-def get_job_statistics(db: Session = Depends(get_db)):
+def get_job_statistics(request: Request, db: Session = Depends(get_db)):
     """Get job platform statistics."""
-    return job_service.get_job_statistics(db)
+    return statistics_cache.respond(request, job_service.get_job_statistics(db))
 
 @router.get("/filter-options", response_model=FilterOptionsResponse)
-def get_filter_options(db: Session = Depends(get_db)):
+def get_filter_options(request: Request, db: Session = Depends(get_db)):
     """Get available filter options for job search."""
-    return job_service.get_filter_options(db)
+    return statistics_cache.respond(request, job_service.get_filter_options(db))
 
 @router.get("/categories", response_model=List[JobCategoryResponse])
 def get_job_categories(db: Session = Depends(get_db)):
@@ -225,7 +218,9 @@ async def bulk_job_action(
 @router.get("/feed", response_model=JobFeedResponse)
 def get_job_feed(
     feed_request: JobFeedRequest = Depends(),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: Optional[dict] = Depends(get_optional_user)
 ):
     """Get personalized job feed for homepage."""
-    return job_service.get_job_feed(db, feed_request)
\ No newline at end of file
+    user_id = current_user["user_id"] if current_user else None
+    return job_service.get_job_feed(db, feed_request, user_id)
\ No newline at end of file
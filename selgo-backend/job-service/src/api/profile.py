@@ -25,8 +25,7 @@ async def create_profile(
     current_user: dict = Depends(get_current_user)
 ):
     """Create or get job profile."""
-    mock_token = "mock_token"  # In production, extract from request
-    return profile_service.create_or_get_profile(db, mock_token, profile_data)
+    return profile_service.create_or_get_profile(db, current_user, profile_data)
 
 @router.get("/", response_model=JobProfileResponse)
 async def get_profile(
@@ -34,8 +33,7 @@ async def get_profile(
     current_user: dict = Depends(get_current_user)
 ):
     """Get user's job profile."""
-    mock_token = "mock_token"  # In production, extract from request
-    return profile_service.get_profile(db, mock_token)
+    return profile_service.get_profile(db, current_user)
 
 @router.put("/", response_model=JobProfileResponse)
 async def update_profile(
@@ -44,8 +42,7 @@ async def update_profile(
     current_user: dict = Depends(get_current_user)
 ):
     """Update user's job profile."""
-    mock_token = "mock_token"  # In production, extract from request
-    return profile_service.update_profile(db, mock_token, profile_data)
+    return profile_service.update_profile(db, current_user, profile_data)
 
 @router.delete("/", response_model=MessageResponse)
 async def delete_profile(
@@ -53,8 +50,7 @@ async def delete_profile(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete user's job profile."""
-    mock_token = "mock_token"  # In production, extract from request
-    return profile_service.delete_profile(db, mock_token)
+    return profile_service.delete_profile(db, current_user)
 
 # Work Experience endpoints
 @router.post("/experience", response_model=WorkExperienceResponse)
@@ -64,8 +60,7 @@ async def add_work_experience(
     current_user: dict = Depends(get_current_user)
 ):
     """Add work experience to profile."""
-    mock_token = "mock_token"  # In production, extract from request
-    return profile_service.add_work_experience(db, mock_token, experience_data)
+    return profile_service.add_work_experience(db, current_user, experience_data)
 
 @router.get("/experience", response_model=List[WorkExperienceResponse])
 async def get_work_experiences(
@@ -73,8 +68,7 @@ async def get_work_experiences(
     current_user: dict = Depends(get_current_user)
 ):
     """Get user's work experiences."""
-    mock_token = "mock_token"  # In production, extract from request
-    return profile_service.get_work_experiences(db, mock_token)
+    return profile_service.get_work_experiences(db, current_user)
 
 @router.put("/experience/{experience_id}", response_model=WorkExperienceResponse)
 async def update_work_experience(
@@ -84,8 +78,7 @@ async def update_work_experience(
     current_user: dict = Depends(get_current_user)
 ):
     """Update work experience."""
-    mock_token = "mock_token"  # In production, extract from request
-    return profile_service.update_work_experience(db, mock_token, experience_id, experience_data)
+    return profile_service.update_work_experience(db, current_user, experience_id, experience_data)
 
 @router.delete("/experience/{experience_id}", response_model=MessageResponse)
 async def delete_work_experience(
@@ -94,8 +87,7 @@ async def delete_work_experience(
     current_user: dict = Depends(get_current_user)
 ):
     """Delete work experience."""
-    mock_token = "mock_token"  # In production, extract from request
-    return profile_service.delete_work_experience(db, mock_token, experience_id)
+    return profile_service.delete_work_experience(db, current_user, experience_id)
 
 # Education endpoints
 @router.post("/education", response_model=EducationResponse)
@@ -105,8 +97,7 @@ async def add_education(
     current_user: dict = Depends(get_current_user)
 ):
     """Add education to profile."""
-    mock_token = "mock_token"  # In production, extract from request
-    return profile_service.add_education(db, mock_token, education_data)
+    return profile_service.add_education(db, current_user, education_data)
 
 # Skills endpoints
 @router.post("/skills")
@@ -118,8 +109,7 @@ async def add_skill(
     current_user: dict = Depends(get_current_user)
 ):
     """Add skill to profile."""
-    mock_token = "mock_token"  # In production, extract from request
-    return profile_service.add_skill(db, mock_token, skill_name, proficiency_level, years_of_experience)
+    return profile_service.add_skill(db, current_user, skill_name, proficiency_level, years_of_experience)
 
 @router.get("/skills/search")
 def search_skills(
@@ -139,8 +129,7 @@ async def add_language(
     current_user: dict = Depends(get_current_user)
 ):
     """Add language to profile."""
-    mock_token = "mock_token"  # In production, extract from request
-    return profile_service.add_language(db, mock_token, language_name, proficiency_level)
+    return profile_service.add_language(db, current_user, language_name, proficiency_level)
 
 @router.get("/languages/search")
 def search_languages(
@@ -160,8 +149,7 @@ async def get_profile_dashboard(
     current_user: dict = Depends(get_current_user)
 ):
     """Get complete profile dashboard with salary comparison."""
-    mock_token = "mock_token"
-    return profile_service.get_profile_with_salary_comparison(db, mock_token)
+    return profile_service.get_profile_with_salary_comparison(db, current_user)
 
 @router.get("/salary-comparison", response_model=Dict[str, Any])
 async def get_salary_comparison_for_profile(
@@ -169,11 +157,8 @@ async def get_salary_comparison_for_profile(
     current_user: dict = Depends(get_current_user)
 ):
     """Get salary comparison based on user's current job profile."""
-    mock_token = "mock_token"
-    
     try:
-        user_info = get_user_from_token(mock_token)
-        user_id = user_info["user_id"]
+        user_id = current_user["user_id"]
         
         profile = profile_service.profile_repo.get_profile_by_user_id(db, user_id)
         if not profile or not profile.work_experiences:
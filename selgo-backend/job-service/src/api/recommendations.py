@@ -3,6 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
+from uuid import UUID
 from ..database.database import get_db
 from ..services.recommendation_service import RecommendationService
 from ..services.analytics_service import JobAnalyticsService
@@ -64,7 +65,7 @@ async def get_job_preferences(
 
 @router.post("/{job_id}/interaction", response_model=MessageResponse)
 async def track_recommendation_interaction(
-    job_id: int,
+    job_id: UUID,
     interaction_type: str = Query(..., description="view, click, apply, dismiss"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
@@ -78,8 +79,8 @@ async def track_recommendation_interaction(
     )
     
     # Also track general analytics
-    analytics_service.track_job_interaction(
-        db, job_id, interaction_type, user_id
+    await analytics_service.track_job_interaction(
+        job_id, interaction_type, user_id
     )
     
     return MessageResponse(message=f"Interaction '{interaction_type}' tracked successfully")
\ No newline at end of file
@@ -60,8 +60,7 @@ async def add_salary_data(
     current_user: dict = Depends(get_current_user)
 ):
     """Add salary data for comparison (contributes to anonymous statistics)."""
-    mock_token = "mock_token"  # In production, extract from request
-    return salary_service.add_salary_data(db, mock_token, salary_data)
+    return salary_service.add_salary_data(db, current_user, salary_data)
 
 @router.get("/insights/{job_title}")
 def get_salary_insights(
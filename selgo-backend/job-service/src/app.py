@@ -6,6 +6,14 @@ from fastapi.staticfiles import StaticFiles
 from .config.config import settings
 from .database.database import engine, Base
 from .api.routes import router as main_router
+from .utils.auth_client import auth_client
+from .services.interaction_pipeline import interaction_pipeline, ensure_counter_index
+from .utils.view_counter import view_counter
+from .services.recommendation_index import recommendation_index
+from .services.job_similarity import job_similarity_index
+from .services.job_service import statistics_cache
+from .services.job_feed import job_feed
+from .services.cv_renderer import cv_render_queue
 import logging
 import os
 
@@ -51,7 +59,15 @@ def health_check():
         "status": "healthy", 
         "service": "job", 
         "version": "1.0.0",
-        "database": "connected"
+        "database": "connected",
+        "auth_cache": auth_client.cache_stats(),
+        "interaction_pipeline": interaction_pipeline.stats(),
+        "view_counter": view_counter.stats(),
+        "recommendation_index": recommendation_index.stats(),
+        "job_similarity": job_similarity_index.stats(),
+        "statistics_cache": statistics_cache.stats(),
+        "job_feed": job_feed.stats(),
+        "cv_render_queue": cv_render_queue.stats()
     }
 
 @app.get("/")
@@ -64,12 +80,15 @@ def root():
     }
 
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     try:
         # Create database tables
         Base.metadata.create_all(bind=engine)
         logger.info("Job database tables created successfully")
         
+        # Conflict target of the interaction counter upserts, for tables created before it
+        ensure_counter_index(engine)
+        
         # Create CV template file if it doesn't exist
         template_dir = "templates"
         if not os.path.exists(template_dir):
@@ -82,5 +101,36 @@ def startup_event():
                 f.write(create_cv_template_html())
             logger.info("CV template created successfully")
         
+        await view_counter.start()
+        await recommendation_index.start()
+        await job_similarity_index.start()
+        
+    except Exception as e:
+        logger.error(f"Error during startup: {e}")
+@app.on_event("shutdown")
+async def shutdown_event():
+    try:
+        await interaction_pipeline.stop()
+        logger.info("Flushed pending job interactions")
+    except Exception as e:
+        logger.error(f"Error flushing job interactions: {e}")
+    try:
+        await recommendation_index.stop()
+        await job_similarity_index.stop()
+    except Exception as e:
+        logger.error(f"Error stopping recommendation indexes: {e}")
+    try:
+        await view_counter.stop()
+        logger.info("Flushed pending job views")
+    except Exception as e:
+        logger.error(f"Error flushing job views: {e}")
+    try:
+        await cv_render_queue.stop()
+        logger.info("CV render workers stopped")
+    except Exception as e:
+        logger.error(f"Error stopping CV render workers: {e}")
+    try:
+        await auth_client.close()
+        logger.info("Auth client closed successfully")
     except Exception as e:
-        logger.error(f"Error during startup: {e}")
\ No newline at end of file
+        logger.error(f"Error closing auth client: {e}")
@@ -61,6 +61,27 @@ class Settings(BaseSettings):
     
     # Auth service settings
     AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL", "http://localhost:8001")
+    # When false, requests run as the development mock user without contacting auth-service
+    AUTH_VALIDATION_ENABLED: bool = os.getenv("AUTH_VALIDATION_ENABLED", "false").lower() == "true"
+    AUTH_HTTP_TIMEOUT_SECONDS: float = float(os.getenv("AUTH_HTTP_TIMEOUT_SECONDS", "3"))
+    AUTH_HTTP_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("AUTH_HTTP_CONNECT_TIMEOUT_SECONDS", "1"))
+    AUTH_HTTP_MAX_CONNECTIONS: int = int(os.getenv("AUTH_HTTP_MAX_CONNECTIONS", "100"))
+    AUTH_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("AUTH_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    AUTH_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("AUTH_HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    AUTH_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("AUTH_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    AUTH_CIRCUIT_RESET_SECONDS: float = float(os.getenv("AUTH_CIRCUIT_RESET_SECONDS", "10"))
+    
+    # Token validation cache
+    AUTH_CACHE_MAX_SIZE: int = int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000"))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+    # Token verification ("remote" calls auth-service per token, "local" verifies JWTs in-process)
+    AUTH_VERIFY_MODE: str = os.getenv("AUTH_VERIFY_MODE", "remote")
+    AUTH_JWT_ALGORITHM: str = os.getenv("AUTH_JWT_ALGORITHM", "HS256")
+    AUTH_JWT_SECRET: str = os.getenv("AUTH_JWT_SECRET", "")  # Shared key for HS256; RS256 keys come from auth-service JWKS
+    AUTH_REVOCATION_POLL_SECONDS: float = float(os.getenv("AUTH_REVOCATION_POLL_SECONDS", "30"))
+    # Local verification falls back to auth-service while revocations are older than this
+    AUTH_REVOCATION_MAX_STALENESS_SECONDS: float = float(os.getenv("AUTH_REVOCATION_MAX_STALENESS_SECONDS", "90"))
     
     # File upload settings
     UPLOAD_DIR: str = "uploads"
@@ -70,6 +91,49 @@ class Settings(BaseSettings):
     # Redis settings (for caching)
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
     
+    # Job search: matches counted exactly up to this many, estimated beyond
+    SEARCH_EXACT_COUNT_LIMIT: int = int(os.getenv("SEARCH_EXACT_COUNT_LIMIT", "10000"))
+    
+    # Bulk job actions: ids per UPDATE/DELETE statement and transaction
+    BULK_ACTION_CHUNK_SIZE: int = int(os.getenv("BULK_ACTION_CHUNK_SIZE", "500"))
+    
+    # Cached /statistics and /filter-options snapshots
+    STATISTICS_CACHE_TTL_SECONDS: float = float(os.getenv("STATISTICS_CACHE_TTL_SECONDS", "60"))
+    
+    # Job feed: ids per ranked segment, how long a feed snapshot is served to new readers,
+    # and how many snapshots stay addressable by refresh token for paging
+    FEED_SEGMENT_SIZE: int = int(os.getenv("FEED_SEGMENT_SIZE", "300"))
+    FEED_SNAPSHOT_TTL_SECONDS: float = float(os.getenv("FEED_SNAPSHOT_TTL_SECONDS", "120"))
+    FEED_MAX_SNAPSHOTS: int = int(os.getenv("FEED_MAX_SNAPSHOTS", "64"))
+    
+    # CV PDF rendering: worker processes, and how many render handles stay queryable
+    CV_RENDER_WORKERS: int = int(os.getenv("CV_RENDER_WORKERS", "2"))
+    CV_RENDER_MAX_JOBS: int = int(os.getenv("CV_RENDER_MAX_JOBS", "1000"))
+    
+    # Job view de-duplication ("memory" rotating Bloom filters per worker, "redis" exact and shared)
+    VIEW_DEDUP_BACKEND: str = os.getenv("VIEW_DEDUP_BACKEND", "memory")
+    VIEW_DEDUP_WINDOW_HOURS: float = float(os.getenv("VIEW_DEDUP_WINDOW_HOURS", "24"))
+    VIEW_DEDUP_EXPECTED_VIEWS: int = int(os.getenv("VIEW_DEDUP_EXPECTED_VIEWS", "1000000"))  # Distinct views per window
+    VIEW_DEDUP_ERROR_RATE: float = float(os.getenv("VIEW_DEDUP_ERROR_RATE", "0.001"))
+    VIEW_COUNT_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("VIEW_COUNT_FLUSH_INTERVAL_SECONDS", "5"))
+    VIEW_COUNT_MAX_PENDING: int = int(os.getenv("VIEW_COUNT_MAX_PENDING", "5000"))
+    
+    # Job interaction analytics pipeline
+    INTERACTION_BATCH_SIZE: int = int(os.getenv("INTERACTION_BATCH_SIZE", "500"))
+    INTERACTION_FLUSH_INTERVAL_MS: int = int(os.getenv("INTERACTION_FLUSH_INTERVAL_MS", "1000"))
+    INTERACTION_QUEUE_MAX_SIZE: int = int(os.getenv("INTERACTION_QUEUE_MAX_SIZE", "50000"))
+    INTERACTION_ENQUEUE_TIMEOUT_SECONDS: float = float(os.getenv("INTERACTION_ENQUEUE_TIMEOUT_SECONDS", "0.05"))
+    INTERACTION_MAX_WRITE_ATTEMPTS: int = int(os.getenv("INTERACTION_MAX_WRITE_ATTEMPTS", "5"))
+    INTERACTION_MAX_PARKED_WRITES: int = int(os.getenv("INTERACTION_MAX_PARKED_WRITES", "200"))
+    
+    # Job recommendation index (rebuilt in the background)
+    RECOMMENDATION_INDEX_REFRESH_SECONDS: float = float(os.getenv("RECOMMENDATION_INDEX_REFRESH_SECONDS", "300"))
+    RECOMMENDATION_TRENDING_POOL_SIZE: int = int(os.getenv("RECOMMENDATION_TRENDING_POOL_SIZE", "200"))
+    JOB_SIMILARITY_TOP_K: int = int(os.getenv("JOB_SIMILARITY_TOP_K", "50"))
+    JOB_SIMILARITY_REFRESH_SECONDS: float = float(os.getenv("JOB_SIMILARITY_REFRESH_SECONDS", "600"))
+    JOB_SIMILARITY_VIEW_WINDOW_DAYS: int = int(os.getenv("JOB_SIMILARITY_VIEW_WINDOW_DAYS", "90"))
+    JOB_SIMILARITY_FULL_REBUILD_HOURS: float = float(os.getenv("JOB_SIMILARITY_FULL_REBUILD_HOURS", "24"))
+    
     # Environment
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     
@@ -1,6 +1,6 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from ..config.config import settings
 import logging
 
@@ -21,4 +21,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def uses_postgres(db: Session) -> bool:
+    """True when the session is bound to PostgreSQL (aggregates/indexes SQLite lacks)."""
+    return db.get_bind().dialect.name == "postgresql"
@@ -1,6 +1,7 @@
 # File: job-service/src/models/analytics_models.py
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum, JSON, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database.database import Base
@@ -10,9 +11,9 @@ class JobAnalytics(Base):
     __tablename__ = 'job_analytics'
     
     id = Column(Integer, primary_key=True, index=True)
-    job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False)
+    job_id = Column(UUID(as_uuid=True), ForeignKey('jobs.id'), nullable=False)
     
-    # Daily analytics
+    # Daily analytics (date is the UTC day at midnight; one row per job and day)
     date = Column(DateTime, nullable=False)
     views_count = Column(Integer, default=0)
     unique_views_count = Column(Integer, default=0)
@@ -29,14 +30,19 @@ class JobAnalytics(Base):
     created_at = Column(DateTime, default=func.now())
     
     # Relationships
-    job = relationship("Job", back_populates="analytics")
+    job = relationship("Job")
+    
+    __table_args__ = (
+        # Conflict target for the batched counter upserts
+        UniqueConstraint('job_id', 'date', name='uq_job_analytics_job_date'),
+    )
 
 class UserJobInteraction(Base):
     __tablename__ = 'user_job_interactions'
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=True, index=True)  # Nullable for anonymous users
-    job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False)
+    job_id = Column(UUID(as_uuid=True), ForeignKey('jobs.id'), nullable=False)
     
     # Interaction details
     interaction_type = Column(String(50), nullable=False)  # view, click, apply, save, share
@@ -54,4 +60,4 @@ class UserJobInteraction(Base):
     created_at = Column(DateTime, default=func.now())
     
     # Relationships
-    job = relationship("Job", back_populates="interactions")
\ No newline at end of file
+    job = relationship("Job")
\ No newline at end of file
@@ -1,8 +1,8 @@
 # File: job-service/src/models/job_models.py
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum, JSON, DECIMAL, Index, Table
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum, JSON, DECIMAL, Index, Table, Computed, DDL, event
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from geoalchemy2 import Geometry
 from ..database.database import Base
@@ -241,6 +241,22 @@ class JobCategory(Base):
     parent = relationship("JobCategory", remote_side=[id], backref="children")
     jobs = relationship("Job", back_populates="category")
 
+# 'simple' keeps job search language-agnostic (Norwegian and English postings share one index)
+JOB_SEARCH_TEXT_CONFIG = "simple"
+
+# Weighted search document: title (A) > short_description (B) > description (C)
+JOB_SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{JOB_SEARCH_TEXT_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{JOB_SEARCH_TEXT_CONFIG}', coalesce(short_description, '')), 'B') || "
+    f"setweight(to_tsvector('{JOB_SEARCH_TEXT_CONFIG}', coalesce(description, '')), 'C')"
+)
+
+# Array columns a search or alert "tags" criterion matches against
+JOB_TAG_COLUMNS = ("keywords", "required_skills", "preferred_skills", "technologies")
+
+# work_arrangement value the "is_remote" criterion stands for
+REMOTE_WORK_ARRANGEMENT = "remote"
+
 class Job(Base):
     __tablename__ = 'jobs'
     
@@ -378,13 +394,15 @@ class Job(Base):
     expires_at = Column(DateTime)
     filled_at = Column(DateTime)
     
+    # Full-text search document, generated by Postgres from the columns above
+    search_vector = deferred(Column(TSVECTOR, Computed(JOB_SEARCH_VECTOR_SQL, persisted=True)))
+    
     # Relationships
     company = relationship("Company", back_populates="jobs")
     category = relationship("JobCategory", back_populates="jobs")
     applications = relationship("JobApplication", back_populates="job", cascade="all, delete-orphan")
     views = relationship("JobView", back_populates="job", cascade="all, delete-orphan")
     saves = relationship("JobSave", back_populates="job", cascade="all, delete-orphan")
-    alerts = relationship("JobAlert", back_populates="job", cascade="all, delete-orphan")
     
     # Indexes for better performance
     __table_args__ = (
@@ -397,8 +415,17 @@ class Job(Base):
         Index('idx_job_status', 'status'),
         Index('idx_job_created', 'created_at'),
         Index('idx_job_featured', 'is_featured'),
+        Index('idx_job_search_vector', 'search_vector', postgresql_using='gin'),
+        # Trigram indexes serve the substring and fuzzy location filters
+        *[
+            Index(f'idx_job_{column}_trgm', column, postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+            for column in ('location', 'city', 'state_province', 'country')
+        ],
     )
 
+# Trigram operator classes for the location indexes
+event.listen(Job.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
 class JobApplication(Base):
     __tablename__ = 'job_applications'
     
@@ -461,7 +488,7 @@ class JobView(Base):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     job_id = Column(UUID(as_uuid=True), ForeignKey('jobs.id'), nullable=False)
-    viewer_id = Column(UUID(as_uuid=True))  # User ID from auth service, nullable for anonymous
+    user_id = Column("viewer_id", Integer)  # User ID from auth service, nullable for anonymous
     
     # View Details
     ip_address = Column(String(45))
@@ -491,7 +518,7 @@ class JobSave(Base):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     job_id = Column(UUID(as_uuid=True), ForeignKey('jobs.id'), nullable=False)
-    user_id = Column(UUID(as_uuid=True), nullable=False)  # User ID from auth service
+    user_id = Column(Integer, nullable=False)  # User ID from auth service
     
     # Save Details
     notes = Column(Text)  # Personal notes about the job
@@ -507,6 +534,9 @@ class JobSave(Base):
         Index('idx_job_save_user', 'user_id'),
     )
 
+# Name the repositories and services use for saved jobs
+SavedJob = JobSave
+
 class JobAlert(Base):
     __tablename__ = 'job_alerts'
     
@@ -547,9 +577,6 @@ class JobAlert(Base):
     
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
-    
-    # Relationships
-    job = relationship("Job", back_populates="alerts")
 
 class CompanyReview(Base):
     __tablename__ = 'company_reviews'
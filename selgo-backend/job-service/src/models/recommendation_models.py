@@ -1,6 +1,7 @@
 # File: job-service/src/models/recommendation_models.py
 
 from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Enum, JSON
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database.database import Base
@@ -17,7 +18,7 @@ class JobRecommendation(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False, index=True)
-    job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False)
+    job_id = Column(UUID(as_uuid=True), ForeignKey('jobs.id'), nullable=False)
     
     # Recommendation scoring
     score = Column(Float, nullable=False)
@@ -154,7 +154,7 @@ class JobSearchRequest(BaseModel):
     posted_within_days: Union[int, None] = Field(default=None)
     page: int = Field(default=1, ge=1)
     limit: int = Field(default=20, ge=1, le=100)
-    sort_by: Union[str, None] = "created_at"  # created_at, salary_max, view_count
+    sort_by: Union[str, None] = Field(default=None)  # relevance, created_at, salary_max, view_count; relevance when q is given, else created_at
     sort_order: Union[str, None] = "desc"  # asc, desc
 
 class JobSearchResponse(BaseModel):
@@ -163,6 +163,7 @@ class JobSearchResponse(BaseModel):
     page: int
     limit: int
     total_pages: int
+    total_is_estimate: bool = False  # True when total is the planner's estimate for a very large result set
 
 # Profile Schemas
 class JobProfileBase(BaseModel):
@@ -346,6 +347,18 @@ class CVResponse(CVBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+class CVRenderJobResponse(BaseModel):
+    job_id: str
+    cv_id: int
+    status: str  # queued, rendering, completed, failed
+    file_size: Union[int, None] = Field(default=None)
+    error: Union[str, None] = Field(default=None)
+    created_at: datetime
+    finished_at: Union[datetime, None] = Field(default=None)
+
+class CVBuildResponse(CVResponse):
+    render_job: Union[CVRenderJobResponse, None] = Field(default=None)  # Poll /cv/render-jobs/{job_id}
+
 # CV Builder Steps Schemas
 class ContactInfoStep(BaseModel):
     email: str
@@ -751,12 +764,15 @@ class JobFeedRequest(BaseModel):
     user_skills: Union[List[str, None]] = None
     feed_type: str = "mixed"  # recent, recommended, trending, mixed
     limit: int = Field(default=20, ge=1, le=100)
+    refresh_token: Union[str, None] = Field(default=None)  # Feed snapshot to page through
+    cursor: int = Field(default=0, ge=0)
 
 class JobFeedResponse(BaseModel):
     jobs: List[JobResponseWithAnalytics]
     feed_type: str
     personalized: bool
-    refresh_token: str  # For pagination/refresh
+    refresh_token: str  # Identifies the feed snapshot; send back with next_cursor
+    next_cursor: Union[int, None] = Field(default=None)
 
 # Company Follow Schemas
 class CompanyFollowResponse(BaseModel):
@@ -164,8 +164,11 @@ class CVRepository:
         """Delete CV."""
         db_cv = db.query(CV).filter(CV.id == cv_id).first()
         if db_cv:
-            # Delete associated file if exists
-            if db_cv.file_path and os.path.exists(db_cv.file_path):
+            # Delete associated file unless another CV with the same content still uses it
+            shared = db_cv.file_path and db.query(CV.id).filter(
+                CV.file_path == db_cv.file_path, CV.id != cv_id
+            ).first() is not None
+            if db_cv.file_path and not shared and os.path.exists(db_cv.file_path):
                 try:
                     os.remove(db_cv.file_path)
                 except OSError:
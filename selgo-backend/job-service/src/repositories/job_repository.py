@@ -1,10 +1,17 @@
 # File: job-service/src/repositories/job_repository.py
 
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, asc, func, and_, or_
-from typing import Optional, List, Dict, Any, Tuple
-from ..models.job_models import Job, Company, JobCategory, JobApplication, JobView, SavedJob
+from sqlalchemy.orm.interfaces import ONETOMANY
+from sqlalchemy import desc, asc, func, and_, or_, update, delete, literal
+from typing import Optional, List, Dict, Any, Set, Tuple
+from ..models.job_models import (
+    Job, Company, JobCategory, JobApplication, JobView, SavedJob, JOB_SEARCH_TEXT_CONFIG,
+    JOB_TAG_COLUMNS, REMOTE_WORK_ARRANGEMENT
+)
 from ..models.schemas import JobCreate, JobUpdate, JobSearchRequest
+from ..utils.view_counter import view_counter, view_deduplicator
+from ..config.config import settings
+from ..database.database import uses_postgres
 from datetime import datetime, timedelta
 import logging
 
@@ -44,27 +51,55 @@ class JobRepository:
             joinedload(Job.category)
         ).filter(Job.slug == slug).first()
     
-    def search_jobs(self, db: Session, search_params: JobSearchRequest) -> Tuple[List[Job], int]:
-        """Search jobs with filtering, sorting, and pagination."""
+    def search_jobs(self, db: Session, search_params: JobSearchRequest) -> Tuple[List[Job], int, bool]:
+        """
+        Search jobs with filtering, sorting, and pagination.
+        
+        Returns (jobs, total, total_is_estimate). The total is exact up to
+        SEARCH_EXACT_COUNT_LIMIT matches; beyond that it is the planner's estimate.
+        """
         query = db.query(Job).options(
             joinedload(Job.company),
             joinedload(Job.category)
         )
         
-        # Apply filters
-        query = self._apply_search_filters(query, search_params)
+        full_text = uses_postgres(db)
         
-        # Get total count before pagination
-        total = query.count()
+        # Apply filters
+        query = self._apply_search_filters(query, search_params, full_text)
         
         # Apply sorting
-        query = self._apply_sorting(query, search_params.sort_by, search_params.sort_order)
+        query = self._apply_sorting(query, search_params.sort_by, search_params.sort_order, search_params.q, full_text)
         
         # Apply pagination
         offset = (search_params.page - 1) * search_params.limit
         jobs = query.offset(offset).limit(search_params.limit).all()
         
-        return jobs, total
+        # A partial page already tells the total
+        if jobs and len(jobs) < search_params.limit:
+            return jobs, offset + len(jobs), False
+        total, is_estimate = self._count_search_results(db, query)
+        return jobs, total, is_estimate
+    
+    def _count_search_results(self, db: Session, query) -> Tuple[int, bool]:
+        """Exact count up to the limit, the planner's row estimate beyond it."""
+        ids = query.with_entities(Job.id).order_by(None)
+        limit = settings.SEARCH_EXACT_COUNT_LIMIT
+        capped = db.query(func.count()).select_from(ids.limit(limit).subquery()).scalar()
+        if capped < limit:
+            return capped, False
+        if not uses_postgres(db):
+            return capped, True
+        
+        statement = ids.statement.compile(
+            dialect=db.get_bind().dialect,
+            compile_kwargs={"render_postcompile": True}
+        )
+        plan = db.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", statement.params
+        ).scalar()
+        # Never report fewer than were actually counted
+        return max(int(plan[0]["Plan"]["Plan Rows"]), capped), True
     
     def get_featured_jobs(self, db: Session, limit: int = 10) -> List[Job]:
         """Get featured jobs."""
@@ -137,38 +172,80 @@ class JobRepository:
             return True
         return False
     
-    def increment_view_count(self, db: Session, job_id: int, user_id: Optional[int] = None, ip_address: Optional[str] = None) -> None:
-        """Increment job view count and track view."""
-        # Check if this user/IP already viewed this job recently (within 24 hours)
-        recent_view = None
-        if user_id:
-            recent_view = db.query(JobView).filter(
-                JobView.job_id == job_id,
-                JobView.user_id == user_id,
-                JobView.viewed_at > datetime.utcnow() - timedelta(hours=24)
-            ).first()
-        elif ip_address:
-            recent_view = db.query(JobView).filter(
-                JobView.job_id == job_id,
-                JobView.ip_address == ip_address,
-                JobView.viewed_at > datetime.utcnow() - timedelta(hours=24)
-            ).first()
-        
-        if not recent_view:
-            # Create new view record
-            job_view = JobView(
-                job_id=job_id,
-                user_id=user_id,
-                ip_address=ip_address
-            )
-            db.add(job_view)
-            
-            # Increment view count
-            db.query(Job).filter(Job.id == job_id).update({
-                Job.view_count: Job.view_count + 1
-            })
-            
-            db.commit()
+    def bulk_update_jobs(self, db: Session, job_ids: List[Any], user_id: Any, values: Dict[str, Any]) -> Set[Any]:
+        """Set values on the user's jobs among job_ids in one statement; returns the ids updated."""
+        if not job_ids:
+            return set()
+        result = db.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.posted_by == user_id)
+            .values(**values, updated_at=func.now())
+            .returning(Job.id)
+            .execution_options(synchronize_session=False)
+        )
+        return {row[0] for row in result}
+    
+    def bulk_delete_jobs(self, db: Session, job_ids: List[Any], user_id: Any) -> Set[Any]:
+        """Delete the user's jobs among job_ids and their dependent rows; returns the ids deleted."""
+        if not job_ids:
+            return set()
+        owned = [row[0] for row in db.query(Job.id).filter(Job.id.in_(job_ids), Job.posted_by == user_id)]
+        if not owned:
+            return set()
+        # Set-based equivalent of the ORM delete cascade: only Job's cascading
+        # relationships (applications, views, saves), as db.delete(job) would
+        for relationship in Job.__mapper__.relationships:
+            if relationship.cascade.delete and relationship.direction is ONETOMANY:
+                for column in relationship.remote_side:
+                    db.execute(delete(relationship.target).where(column.in_(owned)))
+        result = db.execute(
+            delete(Job)
+            .where(Job.id.in_(owned), Job.posted_by == user_id)
+            .returning(Job.id)
+            .execution_options(synchronize_session=False)
+        )
+        return {row[0] for row in result}
+    
+    def existing_job_ids(self, db: Session, job_ids: List[Any]) -> Set[Any]:
+        return {row[0] for row in db.query(Job.id).filter(Job.id.in_(job_ids))}
+    
+    def increment_view_count(self, db: Session, job_id: int, user_id: Optional[int] = None, ip_address: Optional[str] = None) -> bool:
+        """
+        Count a job view unless this user/IP was already counted for the job within 24 hours.
+        
+        The check is answered in memory (or redis) and the increment is aggregated and
+        written by view_counter, so no query runs on the request path.
+        """
+        viewer = f"user:{user_id}" if user_id else (f"ip:{ip_address}" if ip_address else None)
+        if viewer is not None and not view_deduplicator.first_seen(job_id, viewer):
+            return False
+        
+        view_counter.record(job_id, user_id, ip_address)
+        return True
+    
+    def get_jobs_by_ids(self, db: Session, job_ids: List[Any]) -> List[Job]:
+        """Jobs with their company, in the order of job_ids."""
+        if not job_ids:
+            return []
+        jobs = {job.id: job for job in db.query(Job).options(
+            joinedload(Job.company)
+        ).filter(Job.id.in_(job_ids))}
+        return [jobs[job_id] for job_id in job_ids if job_id in jobs]
+    
+    def get_user_job_flags(self, db: Session, user_id: Any, job_ids: List[Any]) -> Tuple[Set[Any], Set[Any]]:
+        """Which of the jobs the user has saved and applied to, in one round trip."""
+        if not job_ids:
+            return set(), set()
+        saved = db.query(SavedJob.job_id, literal("saved")).filter(
+            SavedJob.user_id == user_id, SavedJob.job_id.in_(job_ids)
+        )
+        applied = db.query(JobApplication.job_id, literal("applied")).filter(
+            JobApplication.applicant_id == user_id, JobApplication.job_id.in_(job_ids)
+        )
+        saved_ids, applied_ids = set(), set()
+        for job_id, kind in saved.union_all(applied):
+            (saved_ids if kind == "saved" else applied_ids).add(job_id)
+        return saved_ids, applied_ids
     
     def get_user_viewed_jobs(self, db: Session, user_id: int, limit: int = 20) -> List[Job]:
         """Get jobs viewed by user."""
@@ -213,30 +290,35 @@ class JobRepository:
             SavedJob.user_id == user_id
         ).order_by(desc(SavedJob.saved_at)).all()
     
-    def _apply_search_filters(self, query, search_params: JobSearchRequest):
+    def _apply_search_filters(self, query, search_params: JobSearchRequest, full_text: bool = True):
         """Apply search filters to query."""
-        # Text search
+        # Text search: weighted tsvector on Postgres, substring match elsewhere
         if search_params.q:
-            search_term = f"%{search_params.q}%"
-            query = query.filter(
-                or_(
-                    Job.title.ilike(search_term),
-                    Job.description.ilike(search_term),
-                    Job.short_description.ilike(search_term)
+            if full_text:
+                query = query.filter(Job.search_vector.op("@@")(self._search_tsquery(search_params.q)))
+            else:
+                search_term = f"%{search_params.q}%"
+                query = query.filter(
+                    or_(
+                        Job.title.ilike(search_term),
+                        Job.description.ilike(search_term),
+                        Job.short_description.ilike(search_term)
+                    )
                 )
-            )
         
-        # Location filter
+        # Location filter; served by the trigram indexes on Postgres
         if search_params.location:
             location_term = f"%{search_params.location}%"
-            query = query.filter(
-                or_(
-                    Job.location.ilike(location_term),
-                    Job.city.ilike(location_term),
-                    Job.state.ilike(location_term),
-                    Job.country.ilike(location_term)
-                )
-            )
+            location_filters = [
+                Job.location.ilike(location_term),
+                Job.city.ilike(location_term),
+                Job.state_province.ilike(location_term),
+                Job.country.ilike(location_term)
+            ]
+            if full_text:
+                # Trigram similarity also catches misspelt cities
+                location_filters.append(Job.city.op("%")(search_params.location))
+            query = query.filter(or_(*location_filters))
         
         # Job type filter
         if search_params.job_type:
@@ -265,7 +347,10 @@ class JobRepository:
         
         # Remote filter
         if search_params.is_remote is not None:
-            query = query.filter(Job.is_remote == search_params.is_remote)
+            if search_params.is_remote:
+                query = query.filter(Job.work_arrangement == REMOTE_WORK_ARRANGEMENT)
+            else:
+                query = query.filter(Job.work_arrangement.is_distinct_from(REMOTE_WORK_ARRANGEMENT))
         
         # Company filter
         if search_params.company_id:
@@ -275,10 +360,10 @@ class JobRepository:
         if search_params.category_id:
             query = query.filter(Job.category_id == search_params.category_id)
         
-        # Tags filter
+        # Tags filter: each tag must appear among the job's keywords or skills
         if search_params.tags:
             for tag in search_params.tags:
-                query = query.filter(Job.tags.contains([tag]))
+                query = query.filter(or_(*(getattr(Job, column).contains([tag]) for column in JOB_TAG_COLUMNS)))
         
         # Posted within days filter
         if search_params.posted_within_days:
@@ -290,13 +375,21 @@ class JobRepository:
         
         return query
     
-    def _apply_sorting(self, query, sort_by: str, sort_order: str):
-        """Apply sorting to query."""
+    def _apply_sorting(self, query, sort_by: Optional[str], sort_order: str,
+                       q: Optional[str] = None, full_text: bool = True):
+        """Apply sorting to query; keyword searches default to relevance."""
         if sort_order == "desc":
             order_func = desc
         else:
             order_func = asc
         
+        if sort_by is None:
+            sort_by = "relevance" if q else "created_at"
+        
+        if sort_by == "relevance" and q and full_text:
+            rank = func.ts_rank_cd(Job.search_vector, self._search_tsquery(q))
+            return query.order_by(desc(rank), desc(Job.created_at))
+        
         if sort_by == "salary_max":
             query = query.order_by(order_func(Job.salary_max))
         elif sort_by == "view_count":
@@ -310,6 +403,10 @@ class JobRepository:
         
         return query
     
+    @staticmethod
+    def _search_tsquery(q: str):
+        return func.websearch_to_tsquery(JOB_SEARCH_TEXT_CONFIG, q)
+    
     def _generate_slug(self, db: Session, title: str) -> str:
         """Generate unique slug from title."""
         import re
@@ -0,0 +1,241 @@
+# File: job-service/src/services/alert_matcher.py
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from datetime import datetime
+import logging
+import re
+
+from ..models.job_models import JOB_TAG_COLUMNS, REMOTE_WORK_ARRANGEMENT
+
+logger = logging.getLogger(__name__)
+
+IndexKey = Tuple[str, Any]
+
+# pg_trgm.similarity_threshold default, used by the city % location search filter
+CITY_SIMILARITY_THRESHOLD = 0.3
+
+# Words of a query term; the 'simple' text search config splits and lowercases the same way
+_WORD = re.compile(r"[^\W_]+")
+# websearch_to_tsquery terms: an optional leading "-", then a quoted phrase or a bare word
+_QUERY_TERM = re.compile(r'(-?)("[^"]*"?|\S+)')
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _word_trigrams(text: str) -> Set[str]:
+    """Trigrams as pg_trgm extracts them: per word, padded with two spaces before and one after."""
+    return {trigram for word in _words(text) for trigram in _trigrams(f"  {word} ")}
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _parse_query(q: str) -> Tuple[List[List[List[str]]], List[List[str]]]:
+    """
+    websearch_to_tsquery semantics: terms are ANDed, "or" joins its neighbours
+    and a leading "-" excludes a term. Returns (required, excluded): each
+    required clause lists alternatives, each alternative the words it needs.
+    """
+    required: List[List[List[str]]] = []
+    excluded: List[List[str]] = []
+    alternative = False
+    for negated, term in _QUERY_TERM.findall(q):
+        if not negated and term.lower() == "or":
+            alternative = bool(required)
+            continue
+        words = _words(term)
+        if not words:
+            continue
+        if negated:
+            excluded.append(words)
+        elif alternative:
+            required[-1].append(words)
+        else:
+            required.append([words])
+        alternative = False
+    return required, excluded
+
+
+def _value(value: Any) -> Any:
+    """Enum members and plain values compare the same way."""
+    return getattr(value, "value", value)
+
+
+class AlertCriteria:
+    """
+    An alert's search_criteria in matchable form.
+
+    Matching follows JobRepository._apply_search_filters on Postgres, so an
+    alert matches the same jobs its saved search would return: q is matched
+    word by word like websearch_to_tsquery over the search vector, and
+    location by substring or, for the city, by trigram similarity. Quoted
+    phrases only require their words, not their order.
+    """
+
+    def __init__(self, alert_id: int, user_id: int, frequency: str, since: datetime, search_criteria: Dict[str, Any]):
+        self.alert_id = alert_id
+        self.user_id = user_id
+        self.frequency = frequency
+        self.since = since
+        criteria = search_criteria or {}
+        self.q_required, self.q_excluded = _parse_query(criteria.get("q") or "")
+        self.location = (criteria.get("location") or "").lower() or None
+        self.location_trigrams = _word_trigrams(self.location) if self.location else set()
+        self.job_types = {_value(v) for v in criteria.get("job_type") or []}
+        self.experience_levels = {_value(v) for v in criteria.get("experience_level") or []}
+        self.salary_min = criteria.get("salary_min")
+        self.salary_max = criteria.get("salary_max")
+        self.is_remote = criteria.get("is_remote")
+        self.company_id = criteria.get("company_id")
+        self.category_id = criteria.get("category_id")
+        self.tags = list(criteria.get("tags") or [])
+
+    def index_keys(self) -> List[IndexKey]:
+        """
+        Keys this alert is filed under; a job must produce at least one of them to match.
+
+        The most selective required criterion is used. q is filed under a word every
+        match contains. location is filed under one of its trigrams, which every
+        substring match contains, and under each of its word trigrams, one of which
+        every similar city shares.
+        """
+        if self.tags:
+            return [("tag", self.tags[0])]
+        if self.company_id:
+            return [("company", str(self.company_id))]
+        if self.category_id:
+            return [("category", self.category_id)]
+        for clause in self.q_required:
+            if len(clause) == 1:
+                return [("word", clause[0][0])]
+        if self.location and len(self.location) >= 3:
+            return [("location", self.location[:3])] + [("city", trigram) for trigram in self.location_trigrams]
+        if self.job_types:
+            return [("job_type", job_type) for job_type in self.job_types]
+        if self.experience_levels:
+            return [("experience", level) for level in self.experience_levels]
+        if self.is_remote is not None:
+            return [("remote", bool(self.is_remote))]
+        return []
+
+    def matches(self, job: "JobDocument") -> bool:
+        if job.created_at is None or job.created_at < self.since:
+            return False
+        if self.q_required and not all(
+            any(all(word in job.words for word in words) for words in clause) for clause in self.q_required
+        ):
+            return False
+        if any(all(word in job.words for word in words) for words in self.q_excluded):
+            return False
+        if self.location and not (
+            any(self.location in field for field in job.location_fields)
+            or _similarity(self.location_trigrams, job.city_trigrams) > CITY_SIMILARITY_THRESHOLD
+        ):
+            return False
+        if self.job_types and job.job_type not in self.job_types:
+            return False
+        if self.experience_levels and job.experience_level not in self.experience_levels:
+            return False
+        if self.salary_min and not _at_least(self.salary_min, job.salary_min, job.salary_max):
+            return False
+        if self.salary_max and not _at_most(self.salary_max, job.salary_min, job.salary_max):
+            return False
+        if self.is_remote is not None and job.is_remote != self.is_remote:
+            return False
+        if self.company_id and str(self.company_id) != job.company_id:
+            return False
+        if self.category_id and self.category_id != job.category_id:
+            return False
+        if self.tags and not all(tag in job.tags for tag in self.tags):
+            return False
+        return True
+
+
+def _at_least(bound: float, salary_min: Optional[float], salary_max: Optional[float]) -> bool:
+    return any(value is not None and value >= bound for value in (salary_min, salary_max))
+
+
+def _at_most(bound: float, salary_min: Optional[float], salary_max: Optional[float]) -> bool:
+    return any(value is not None and value <= bound for value in (salary_max, salary_min))
+
+
+class JobDocument:
+    """The fields of a Job that alerts can filter on, normalised once per job."""
+
+    def __init__(self, job: Any):
+        self.job = job
+        self.created_at = job.created_at
+        self.words = {
+            word for field in ("title", "description", "short_description")
+            for word in _words(getattr(job, field, None) or "")
+        }
+        self.location_fields = [
+            (getattr(job, field, None) or "").lower()
+            for field in ("location", "city", "state_province", "country")
+        ]
+        self.city_trigrams = _word_trigrams(getattr(job, "city", None) or "")
+        self.job_type = _value(getattr(job, "job_type", None))
+        self.experience_level = _value(getattr(job, "experience_level", None))
+        self.salary_min = float(job.salary_min) if getattr(job, "salary_min", None) is not None else None
+        self.salary_max = float(job.salary_max) if getattr(job, "salary_max", None) is not None else None
+        self.is_remote = getattr(job, "work_arrangement", None) == REMOTE_WORK_ARRANGEMENT
+        self.company_id = str(job.company_id) if getattr(job, "company_id", None) is not None else None
+        self.category_id = getattr(job, "category_id", None)
+        self.tags = {tag for column in JOB_TAG_COLUMNS for tag in getattr(job, column, None) or []}
+
+    def index_keys(self) -> Iterable[IndexKey]:
+        for word in self.words:
+            yield ("word", word)
+        for field in self.location_fields:
+            for trigram in _trigrams(field):
+                yield ("location", trigram)
+        for trigram in self.city_trigrams:
+            yield ("city", trigram)
+        for tag in self.tags:
+            yield ("tag", tag)
+        if self.company_id is not None:
+            yield ("company", self.company_id)
+        if self.category_id is not None:
+            yield ("category", self.category_id)
+        if self.job_type is not None:
+            yield ("job_type", self.job_type)
+        if self.experience_level is not None:
+            yield ("experience", self.experience_level)
+        yield ("remote", self.is_remote)
+
+
+class AlertMatcher:
+    """Inverted index over alert criteria; each job is matched against only the alerts it could satisfy."""
+
+    def __init__(self, alerts: Iterable[AlertCriteria]):
+        self.alerts: Dict[int, AlertCriteria] = {}
+        self._postings: Dict[IndexKey, List[AlertCriteria]] = {}
+        # Alerts without any selective criterion are checked against every job
+        self._unanchored: List[AlertCriteria] = []
+        self.candidate_checks = 0
+        for alert in alerts:
+            self.add(alert)
+
+    def add(self, alert: AlertCriteria) -> None:
+        self.alerts[alert.alert_id] = alert
+        keys = alert.index_keys()
+        if not keys:
+            self._unanchored.append(alert)
+        for key in keys:
+            self._postings.setdefault(key, []).append(alert)
+
+    def match(self, job: JobDocument) -> List[AlertCriteria]:
+        """Alerts the job satisfies."""
+        candidates: Dict[int, AlertCriteria] = {alert.alert_id: alert for alert in self._unanchored}
+        for key in job.index_keys():
+            for alert in self._postings.get(key, ()):
+                candidates[alert.alert_id] = alert
+        self.candidate_checks += len(candidates)
+        return [alert for alert in candidates.values() if alert.matches(job)]
@@ -3,67 +3,34 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, and_
 from typing import Dict, Any, List, Optional
+from uuid import UUID
 from datetime import datetime, timedelta
 from ..models.analytics_models import JobAnalytics, UserJobInteraction
 from ..models.job_models import Job, JobView, SavedJob, JobApplication
+from .interaction_pipeline import interaction_pipeline
 import logging
 
 logger = logging.getLogger(__name__)
 
 class JobAnalyticsService:
     
-    def track_job_interaction(self, db: Session, job_id: int, interaction_type: str,
+    async def track_job_interaction(self, job_id: UUID, interaction_type: str,
                             user_id: Optional[int] = None, session_id: Optional[str] = None,
                             ip_address: Optional[str] = None, user_agent: Optional[str] = None,
-                            referrer: Optional[str] = None, time_spent: Optional[int] = None) -> None:
-        """Track user interaction with job."""
-        try:
-            interaction = UserJobInteraction(
-                user_id=user_id,
-                job_id=job_id,
-                interaction_type=interaction_type,
-                session_id=session_id,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                referrer=referrer,
-                time_spent=time_spent
-            )
-            
-            db.add(interaction)
-            db.commit()
-            
-            # Update daily analytics
-            self._update_daily_analytics(db, job_id, interaction_type)
-            
-        except Exception as e:
-            logger.error(f"Error tracking job interaction: {str(e)}")
-            db.rollback()
-    
-    def _update_daily_analytics(self, db: Session, job_id: int, interaction_type: str) -> None:
-        """Update daily analytics for a job."""
-        today = datetime.utcnow().date()
-        
-        # Get or create daily analytics record
-        analytics = db.query(JobAnalytics).filter(
-            JobAnalytics.job_id == job_id,
-            func.date(JobAnalytics.date) == today
-        ).first()
-        
-        if not analytics:
-            analytics = JobAnalytics(job_id=job_id, date=datetime.utcnow())
-            db.add(analytics)
-        
-        # Update counters based on interaction type
-        if interaction_type == "view":
-            analytics.views_count += 1
-        elif interaction_type == "apply":
-            analytics.applications_count += 1
-        elif interaction_type == "save":
-            analytics.saves_count += 1
-        
-        db.commit()
+                            referrer: Optional[str] = None, time_spent: Optional[int] = None) -> bool:
+        """Track user interaction with job; written asynchronously in batches with the daily counters."""
+        return await interaction_pipeline.submit(
+            job_id,
+            interaction_type,
+            user_id=user_id,
+            session_id=session_id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            referrer=referrer,
+            time_spent=time_spent
+        )
     
-    def get_job_analytics(self, db: Session, job_id: int, days: int = 30) -> Dict[str, Any]:
+    def get_job_analytics(self, db: Session, job_id: UUID, days: int = 30) -> Dict[str, Any]:
         """Get analytics for a specific job."""
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
@@ -8,7 +8,6 @@ from ..models.schemas import (
     ArticleCategoryResponse, PopularSearchesGrouped,
     MessageResponse
 )
-from ..utils.auth_utils import get_user_from_token
 from fastapi import HTTPException, status
 import logging
 
@@ -0,0 +1,162 @@
+# File: job-service/src/services/cv_renderer.py
+
+from sqlalchemy.orm import Session
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from datetime import datetime
+from ..config.config import settings
+from ..database.database import SessionLocal
+from ..repositories.cv_repository import CVRepository
+from ..utils.pdf_utils import cv_content_hash, render_cv_pdf, rendered_cv_file
+import multiprocessing
+import asyncio
+import logging
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class RenderJob:
+    """Handle of one CV render, as reported by the render status endpoint."""
+
+    def __init__(self, cv_id: int, content_hash: str):
+        self.job_id = uuid.uuid4().hex
+        self.cv_id = cv_id
+        self.content_hash = content_hash
+        self.status = "queued"  # queued, rendering, completed, failed
+        self.file_size: Optional[int] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self._future: Optional[Future] = None
+
+    @property
+    def current_status(self) -> str:
+        if self.status == "queued" and self._future is not None and self._future.running():
+            return "rendering"
+        return self.status
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "cv_id": self.cv_id,
+            "status": self.current_status,
+            "file_size": self.file_size,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+class CVRenderQueue:
+    """
+    Renders CV PDFs in a process pool, off the request workers.
+
+    Renders are keyed by the content hash of the CV data and template: a CV
+    whose PDF already exists is completed without rendering, and concurrent
+    requests for the same content share one render. When a render finishes
+    its file is recorded on the CV row.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 workers: Optional[int] = None, max_jobs: Optional[int] = None):
+        self._session_factory = session_factory
+        self.workers = workers or settings.CV_RENDER_WORKERS
+        self.max_jobs = max_jobs or settings.CV_RENDER_MAX_JOBS
+        self.cv_repo = CVRepository()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, RenderJob]" = OrderedDict()
+        self._latest: Dict[int, str] = {}  # cv_id -> its most recent job
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.deduplicated = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned, not forked: the parent holds threads, DB connections and an event loop
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(self, cv_id: int, cv_data: Dict[str, Any]) -> RenderJob:
+        """Queue a render of serialized CV builder data for the CV; returns its handle."""
+        job = RenderJob(cv_id, cv_content_hash(cv_data))
+        self._track(job)
+
+        rendered = rendered_cv_file(job.content_hash)
+        if rendered:
+            self.deduplicated += 1
+            self._finish(job, rendered)
+            return job
+
+        with self._lock:
+            future = self._in_flight.get(job.content_hash)
+            if future is None:
+                future = self._pool().submit(render_cv_pdf, cv_data, job.content_hash)
+                self._in_flight[job.content_hash] = future
+                future.add_done_callback(lambda _, content_hash=job.content_hash: self._in_flight.pop(content_hash, None))
+                self.renders += 1
+            else:
+                self.deduplicated += 1
+            job._future = future
+        future.add_done_callback(lambda done: self._on_done(job, done))
+        return job
+
+    def _track(self, job: RenderJob) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._latest[job.cv_id] = job.job_id
+            while len(self._jobs) > self.max_jobs:
+                _, dropped = self._jobs.popitem(last=False)
+                if self._latest.get(dropped.cv_id) == dropped.job_id:
+                    del self._latest[dropped.cv_id]
+
+    def _on_done(self, job: RenderJob, future: Future) -> None:
+        try:
+            self._finish(job, future.result())
+        except Exception as e:
+            logger.error(f"Failed to render PDF for CV {job.cv_id}: {e}")
+            job.error = str(e)
+            job.status = "failed"
+            job.finished_at = datetime.utcnow()
+
+    def _finish(self, job: RenderJob, rendered: Tuple[str, int]) -> None:
+        file_path, file_size = rendered
+        db = self._session_factory()
+        try:
+            self.cv_repo.update_cv_file_info(db, job.cv_id, file_path, file_size)
+        finally:
+            db.close()
+        job.file_size = file_size
+        job.status = "completed"
+        job.finished_at = datetime.utcnow()
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        return self._jobs.get(job_id)
+
+    def latest_for_cv(self, cv_id: int) -> Optional[RenderJob]:
+        job_id = self._latest.get(cv_id)
+        return self._jobs.get(job_id) if job_id else None
+
+    async def stop(self) -> None:
+        """Let queued renders finish and shut the worker processes down."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "in_flight": len(self._in_flight),
+            "tracked_jobs": len(self._jobs),
+            "renders": self.renders,
+            "deduplicated": self.deduplicated
+        }
+
+
+# Process-wide render queue; its worker processes start on first use
+cv_render_queue = CVRenderQueue()
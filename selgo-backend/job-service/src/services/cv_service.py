@@ -1,17 +1,17 @@
 # File: job-service/src/services/cv_service.py
 
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from ..repositories.cv_repository import CVRepository
 from ..repositories.profile_repository import ProfileRepository
 from ..models.schemas import (
     CVCreate, CVUpdate, CVResponse, CVBuilderData,
-    FileUploadResponse, MessageResponse, CVTemplateEnum
+    FileUploadResponse, MessageResponse, CVTemplateEnum,
+    CVBuildResponse, CVRenderJobResponse
 )
 from ..models.cv_models import CVTemplate, CVStatus  # Import the actual enum classes
-from ..utils.auth_utils import get_user_from_token
-from ..utils.pdf_utils import generate_cv_pdf
 from ..utils.file_utils import save_uploaded_file, validate_file
+from .cv_renderer import cv_render_queue
 from fastapi import HTTPException, status, UploadFile
 import logging
 import os
@@ -31,10 +31,10 @@ class CVService:
         self.cv_repo = CVRepository()
         self.profile_repo = ProfileRepository()
     
-    def create_cv(self, db: Session, user_token: str, cv_data: CVCreate) -> CVResponse:
+    def create_cv(self, db: Session, current_user: Dict[str, Any], cv_data: CVCreate) -> CVResponse:
         """Create a new CV."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             cv = self.cv_repo.create_cv(db, cv_data, user_id)
@@ -47,10 +47,10 @@ class CVService:
                 detail="Failed to create CV"
             )
     
-    def get_cv_by_id(self, db: Session, user_token: str, cv_id: int) -> CVResponse:
+    def get_cv_by_id(self, db: Session, current_user: Dict[str, Any], cv_id: int) -> CVResponse:
         """Get CV by ID."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             cv = self.cv_repo.get_cv_by_id(db, cv_id)
@@ -78,10 +78,10 @@ class CVService:
                 detail="Failed to get CV"
             )
     
-    def get_user_cvs(self, db: Session, user_token: str) -> List[CVResponse]:
+    def get_user_cvs(self, db: Session, current_user: Dict[str, Any]) -> List[CVResponse]:
         """Get all CVs for a user."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             cvs = self.cv_repo.get_cvs_by_user(db, user_id)
@@ -94,10 +94,10 @@ class CVService:
                 detail="Failed to get CVs"
             )
     
-    def update_cv(self, db: Session, user_token: str, cv_id: int, cv_data: CVUpdate) -> CVResponse:
+    def update_cv(self, db: Session, current_user: Dict[str, Any], cv_id: int, cv_data: CVUpdate) -> CVResponse:
         """Update CV."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Get CV and verify ownership
@@ -126,10 +126,10 @@ class CVService:
                 detail="Failed to update CV"
             )
     
-    def delete_cv(self, db: Session, user_token: str, cv_id: int) -> MessageResponse:
+    def delete_cv(self, db: Session, current_user: Dict[str, Any], cv_id: int) -> MessageResponse:
         """Delete CV."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Get CV and verify ownership
@@ -164,10 +164,10 @@ class CVService:
                 detail="Failed to delete CV"
             )
     
-    def build_cv_from_profile(self, db: Session, user_token: str, cv_builder_data: CVBuilderData) -> CVResponse:
-        """Build CV from CV builder data."""
+    def build_cv_from_profile(self, db: Session, current_user: Dict[str, Any], cv_builder_data: CVBuilderData) -> CVBuildResponse:
+        """Build CV from CV builder data; the PDF is rendered in the background."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Serialize datetime objects in cv_builder_data
@@ -181,15 +181,7 @@ class CVService:
             )
             
             cv = self.cv_repo.create_cv(db, cv_data, user_id)
-            
-            # Generate PDF
-            try:
-                pdf_path, file_size = generate_cv_pdf(cv.id, cv_builder_data)
-                self.cv_repo.update_cv_file_info(db, cv.id, pdf_path, file_size)
-            except Exception as e:
-                logger.warning(f"Failed to generate PDF for CV {cv.id}: {str(e)}")
-            
-            return CVResponse.model_validate(cv)
+            return self._build_response(db, cv, cv_data_dict)
             
         except Exception as e:
             logger.error(f"Error building CV from profile: {str(e)}")
@@ -198,6 +190,36 @@ class CVService:
                 detail="Failed to build CV"
             )
     
+    def _build_response(self, db: Session, cv, cv_data_dict: Dict[str, Any]) -> CVBuildResponse:
+        """CV response with the handle of its queued PDF render."""
+        render_job = None
+        try:
+            job = cv_render_queue.submit(cv.id, cv_data_dict)
+            render_job = CVRenderJobResponse(**job.to_dict())
+            if job.status == "completed":
+                # Served from an earlier render of the same content, file info already written
+                db.refresh(cv)
+        except Exception as e:
+            logger.warning(f"Failed to queue PDF for CV {cv.id}: {str(e)}")
+        
+        response = CVBuildResponse.model_validate(cv)
+        response.render_job = render_job
+        return response
+    
+    def get_render_job(self, db: Session, current_user: Dict[str, Any], job_id: str) -> CVRenderJobResponse:
+        """Get the status of a CV PDF render."""
+        user_info = current_user
+        user_id = user_info["user_id"]
+        
+        job = cv_render_queue.get(job_id)
+        cv = self.cv_repo.get_cv_by_id(db, job.cv_id) if job else None
+        if not job or not cv or cv.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Render job not found"
+            )
+        return CVRenderJobResponse(**job.to_dict())
+    
     def _serialize_cv_builder_data(self, cv_builder_data: CVBuilderData) -> Dict[str, Any]:
         """Convert CVBuilderData to a JSON-serializable dictionary."""
         try:
@@ -230,10 +252,10 @@ class CVService:
                 } if cv_builder_data.summary else None
             }
     
-    def generate_cv_from_profile(self, db: Session, user_token: str) -> CVResponse:
+    def generate_cv_from_profile(self, db: Session, current_user: Dict[str, Any]) -> CVBuildResponse:
         """Generate CV from user's job profile."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Get user's profile
@@ -258,15 +280,7 @@ class CVService:
             )
             
             cv = self.cv_repo.create_cv(db, cv_data, user_id)
-            
-            # Generate PDF
-            try:
-                pdf_path, file_size = generate_cv_pdf(cv.id, cv_builder_data)
-                self.cv_repo.update_cv_file_info(db, cv.id, pdf_path, file_size)
-            except Exception as e:
-                logger.warning(f"Failed to generate PDF for CV {cv.id}: {str(e)}")
-            
-            return CVResponse.model_validate(cv)
+            return self._build_response(db, cv, cv_data_dict)
             
         except HTTPException:
             raise
@@ -277,10 +291,10 @@ class CVService:
                 detail="Failed to generate CV from profile"
             )
     
-    def upload_cv(self, db: Session, user_token: str, file: UploadFile, title: Optional[str] = None) -> FileUploadResponse:
+    def upload_cv(self, db: Session, current_user: Dict[str, Any], file: UploadFile, title: Optional[str] = None) -> FileUploadResponse:
         """Upload CV file."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Validate file
@@ -314,10 +328,15 @@ class CVService:
                 detail="Failed to upload CV"
             )
     
-    def download_cv(self, db: Session, user_token: str, cv_id: int) -> str:
-        """Get CV download path and increment download count."""
+    def download_cv(self, db: Session, current_user: Dict[str, Any], cv_id: int) -> Union[str, CVRenderJobResponse]:
+        """
+        Get CV download path and increment download count.
+        
+        While the PDF is not rendered yet, returns the handle of its render instead,
+        queueing one if none is pending.
+        """
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             cv = self.cv_repo.get_cv_by_id(db, cv_id)
@@ -335,10 +354,19 @@ class CVService:
                 )
             
             if not cv.file_path or not os.path.exists(cv.file_path):
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="CV file not found"
-                )
+                job = cv_render_queue.latest_for_cv(cv_id)
+                if job is None or job.current_status in ("completed", "failed"):
+                    cv_data = json.loads(cv.cv_data) if isinstance(cv.cv_data, str) else cv.cv_data
+                    if not cv_data:
+                        raise HTTPException(
+                            status_code=status.HTTP_404_NOT_FOUND,
+                            detail="CV file not found"
+                        )
+                    job = cv_render_queue.submit(cv_id, cv_data)
+                    if job.status == "completed":
+                        db.refresh(cv)
+                if job.status != "completed":
+                    return CVRenderJobResponse(**job.to_dict())
             
             # Increment download count
             self.cv_repo.increment_cv_download_count(db, cv_id)
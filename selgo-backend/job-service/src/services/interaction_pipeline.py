@@ -0,0 +1,289 @@
+# File: job-service/src/services/interaction_pipeline.py
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from datetime import datetime, time
+from collections import deque
+from uuid import UUID
+from ..config.config import settings
+from ..database.database import SessionLocal, uses_postgres
+from ..models.analytics_models import JobAnalytics, UserJobInteraction
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Daily JobAnalytics counter incremented by each interaction type
+COUNTER_COLUMNS = {
+    "view": "views_count",
+    "apply": "applications_count",
+    "save": "saves_count"
+}
+
+# Optional UserJobInteraction columns; every queued event carries all of them for executemany
+INTERACTION_FIELDS = ("user_id", "session_id", "ip_address", "user_agent", "referrer", "time_spent")
+
+# The conflict target of the counter upserts
+COUNTER_INDEX = "uq_job_analytics_job_date"
+
+_STOP = object()
+
+# Databases created before the unique index existed hold timestamped, possibly
+# duplicated rows per job and day: fold each group into its oldest row at
+# midnight, summing the counters, before the index can be built
+_FOLD_DAILY_COUNTERS_SQL = """
+WITH days AS (
+    SELECT min(id) AS keep_id,
+           coalesce(sum(views_count), 0) AS views_count,
+           coalesce(sum(unique_views_count), 0) AS unique_views_count,
+           coalesce(sum(applications_count), 0) AS applications_count,
+           coalesce(sum(saves_count), 0) AS saves_count
+    FROM job_analytics
+    GROUP BY job_id, date_trunc('day', date)
+)
+UPDATE job_analytics AS row
+SET date = date_trunc('day', row.date),
+    views_count = days.views_count,
+    unique_views_count = days.unique_views_count,
+    applications_count = days.applications_count,
+    saves_count = days.saves_count
+FROM days
+WHERE row.id = days.keep_id
+"""
+
+_DELETE_FOLDED_COUNTERS_SQL = """
+DELETE FROM job_analytics AS row
+USING job_analytics AS kept
+WHERE kept.job_id = row.job_id
+  AND kept.date = date_trunc('day', row.date)
+  AND kept.id < row.id
+"""
+
+
+def ensure_counter_index(engine: Engine) -> bool:
+    """
+    Create the (job_id, date) unique index the counter upserts conflict on, if missing.
+
+    create_all only adds it to new tables, so an existing job_analytics table
+    is de-duplicated first. Returns True when the index had to be built.
+    """
+    if engine.dialect.name != "postgresql":
+        return False
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": COUNTER_INDEX}).scalar() is not None:
+            return False
+        # Blocks concurrent counter writes (and other workers starting up) until the index exists
+        conn.execute(text("LOCK TABLE job_analytics IN SHARE ROW EXCLUSIVE MODE"))
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": COUNTER_INDEX}).scalar() is not None:
+            return False
+        conn.execute(text(_FOLD_DAILY_COUNTERS_SQL))
+        removed = conn.execute(text(_DELETE_FOLDED_COUNTERS_SQL)).rowcount
+        conn.execute(text(f"CREATE UNIQUE INDEX {COUNTER_INDEX} ON job_analytics (job_id, date)"))
+    logger.info(f"Created {COUNTER_INDEX}; folded {removed} duplicate daily analytics rows")
+    return True
+
+
+class InteractionPipeline:
+    """
+    Buffers job interactions and writes them in batches.
+
+    Each batch is one executemany INSERT of the raw interactions plus one
+    INSERT ... ON CONFLICT DO UPDATE per (job, day) counter row, so popular
+    jobs no longer serialize page views on read-modify-write row locks.
+    The queue is bounded: when writes fall behind, producers wait up to
+    enqueue_timeout and the event is then dropped and counted.
+
+    Events and counters are written in separate transactions, so a failing
+    upsert cannot lose the raw events. A write that fails is parked and
+    retried ahead of the next batch, up to max_write_attempts times.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 max_queue_size: Optional[int] = None, enqueue_timeout: Optional[float] = None,
+                 max_write_attempts: Optional[int] = None, max_parked_writes: Optional[int] = None):
+        self._session_factory = session_factory
+        self.batch_size = batch_size or settings.INTERACTION_BATCH_SIZE
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else settings.INTERACTION_FLUSH_INTERVAL_MS / 1000
+        )
+        self.max_queue_size = max_queue_size or settings.INTERACTION_QUEUE_MAX_SIZE
+        self.enqueue_timeout = (
+            enqueue_timeout if enqueue_timeout is not None
+            else settings.INTERACTION_ENQUEUE_TIMEOUT_SECONDS
+        )
+        self.max_write_attempts = max_write_attempts or settings.INTERACTION_MAX_WRITE_ATTEMPTS
+        self.max_parked_writes = max_parked_writes or settings.INTERACTION_MAX_PARKED_WRITES
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # (write, rows, failed attempts) waiting to be retried, oldest first
+        self._parked: Deque[Tuple[Callable[[List[Dict[str, Any]]], None], List[Dict[str, Any]], int]] = deque()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, job_id: UUID, interaction_type: str, **fields: Optional[Any]) -> bool:
+        """Queue one interaction; returns False if it had to be dropped."""
+        if self._task is None or self._task.done():
+            await self.start()
+        event = {field: fields.get(field) for field in INTERACTION_FIELDS}
+        event.update(job_id=job_id, interaction_type=interaction_type, created_at=datetime.utcnow())
+        try:
+            await asyncio.wait_for(self._queue.put(event), self.enqueue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            # Logged sparsely: under overload every log line is itself extra work
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Interaction queue full ({self.max_queue_size}); {self.dropped} events dropped so far")
+            return False
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await self._queue.get()
+            if event is _STOP:
+                return
+            batch = [event]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if event is _STOP:
+                    stopping = True
+                    break
+                batch.append(event)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        counters = self._daily_counters(batch)
+        pending = list(self._parked)
+        self._parked.clear()
+        if batch:
+            pending.append((self._write_events, batch, 0))
+        if counters:
+            # Sorted so concurrent workers lock counter rows in the same order
+            pending.append((self._write_counters, [counters[key] for key in sorted(counters)], 0))
+
+        loop = asyncio.get_running_loop()
+        # Once a kind of write fails, later ones of that kind would most likely fail
+        # the same way and are parked untried; the other kind is still attempted
+        failing = set()
+        for write, rows, attempts in pending:
+            if write not in failing:
+                try:
+                    await loop.run_in_executor(None, write, rows)
+                    if write == self._write_events:
+                        self.written += len(rows)
+                    continue
+                except Exception as e:
+                    failing.add(write)
+                    attempts += 1
+                    logger.error(f"Failed to write {len(rows)} job interaction rows (attempt {attempts}): {e}")
+            self._park(write, rows, attempts)
+
+    def _park(self, write: Callable[[List[Dict[str, Any]]], None], rows: List[Dict[str, Any]], attempts: int) -> None:
+        if attempts >= self.max_write_attempts or len(self._parked) >= self.max_parked_writes:
+            if write == self._write_events:
+                self.failed += len(rows)
+            logger.error(f"Giving up on {len(rows)} job interaction rows after {attempts} failed attempts")
+            return
+        self._parked.append((write, rows, attempts))
+
+    def _write_events(self, batch: List[Dict[str, Any]]) -> None:
+        """One executemany for the raw events."""
+        db = self._session_factory()
+        try:
+            db.execute(insert(UserJobInteraction), batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write_counters(self, rows: List[Dict[str, Any]]) -> None:
+        """Add the per (job, day) deltas to the daily counter rows."""
+        db = self._session_factory()
+        try:
+            upsert = (postgresql.insert if uses_postgres(db) else sqlite.insert)(JobAnalytics)
+            excluded = upsert.excluded
+            upsert = upsert.on_conflict_do_update(
+                index_elements=[JobAnalytics.job_id, JobAnalytics.date],
+                set_={
+                    column: getattr(JobAnalytics, column) + getattr(excluded, column)
+                    for column in COUNTER_COLUMNS.values()
+                }
+            )
+            db.execute(upsert, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _daily_counters(batch: List[Dict[str, Any]]) -> Dict[Tuple[int, datetime], Dict[str, Any]]:
+        """Per (job, day) counter deltas for the batch."""
+        counters: Dict[Tuple[int, datetime], Dict[str, Any]] = {}
+        for event in batch:
+            column = COUNTER_COLUMNS.get(event["interaction_type"])
+            if column is None:
+                continue
+            day = datetime.combine(event["created_at"].date(), time.min)
+            row = counters.get((event["job_id"], day))
+            if row is None:
+                row = counters[(event["job_id"], day)] = {
+                    "job_id": event["job_id"],
+                    "date": day,
+                    **{name: 0 for name in COUNTER_COLUMNS.values()}
+                }
+            row[column] += 1
+        return counters
+
+    async def stop(self) -> None:
+        """Write everything still queued, then stop the writer."""
+        if self._task is None:
+            return
+        if not self._task.done():
+            await self._queue.put(_STOP)
+            await self._task
+        self._task = None
+        if self._parked:
+            await self._flush([])
+        if self._parked:
+            lost = sum(len(rows) for write, rows, _ in self._parked if write == self._write_events)
+            self.failed += lost
+            self._parked.clear()
+            logger.error(f"Stopped with unwritten job interactions; {lost} events lost")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "parked_writes": len(self._parked)
+        }
+
+
+# Process-wide pipeline; started by the first submit and drained on app shutdown
+interaction_pipeline = InteractionPipeline()
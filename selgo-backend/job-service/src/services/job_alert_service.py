@@ -1,17 +1,25 @@
 # File: job-service/src/services/job_alert_service.py
 
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Dict, Any, Tuple
 from ..models.recommendation_models import JobAlert  # Changed from job_models to recommendation_models
+from ..models.job_models import Job
 from ..models.schemas import JobAlertCreate, JobAlertResponse, JobAlertUpdate, MessageResponse
 from ..repositories.job_repository import JobRepository
+from .alert_matcher import AlertCriteria, AlertMatcher, JobDocument
 from fastapi import HTTPException, status
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 class JobAlertService:
+    # Most jobs listed per alert in one notification (the saved search's first page)
+    MAX_JOBS_PER_ALERT = 20
+    # New jobs are streamed from the database in batches of this size
+    JOB_STREAM_BATCH_SIZE = 500
+    
     def __init__(self):
         self.job_repo = JobRepository()
     
@@ -144,44 +152,100 @@ class JobAlertService:
                 detail="Failed to toggle job alert"
             )
     
-    def check_and_send_alerts(self, db: Session) -> Dict[str, int]:
-        """Check all active alerts and send notifications for matching jobs."""
+    def check_and_send_alerts(self, db: Session) -> Dict[str, Any]:
+        """
+        Match newly posted jobs against all due alerts and send one notification per user and frequency.
+        
+        Due alerts are indexed in memory by their search criteria, then jobs posted since
+        the oldest alert window are streamed through the index once, so a sweep costs
+        O(new jobs) instead of one search query per alert.
+        """
+        started = time.perf_counter()
         try:
-            # Get all active alerts
             active_alerts = db.query(JobAlert).filter(
                 JobAlert.is_active == True
             ).all()
             
-            alerts_processed = 0
-            notifications_sent = 0
+            now = datetime.utcnow()
+            due_alerts = {alert.id: alert for alert in active_alerts if self._should_send_alert(alert)}
+            matcher = AlertMatcher(
+                AlertCriteria(
+                    alert_id=alert.id,
+                    user_id=alert.user_id,
+                    frequency=alert.frequency,
+                    since=alert.last_sent_at or now - timedelta(days=1),
+                    search_criteria=alert.search_criteria
+                )
+                for alert in due_alerts.values()
+            )
+            
+            matches: Dict[int, List[Dict[str, Any]]] = {}
+            jobs_scanned = 0
+            if matcher.alerts:
+                oldest_window = min(criteria.since for criteria in matcher.alerts.values())
+                for job in self._stream_new_jobs(db, oldest_window):
+                    jobs_scanned += 1
+                    document = JobDocument(job)
+                    for criteria in matcher.match(document):
+                        matches.setdefault(criteria.alert_id, []).append(self._job_summary(job))
             
-            for alert in active_alerts:
-                # Check if it's time to send alert based on frequency
-                if self._should_send_alert(alert):
-                    matching_jobs = self._find_matching_jobs(db, alert)
-                    
-                    if matching_jobs:
-                        # Send notification (implement email/push logic)
-                        self._send_alert_notification(alert, matching_jobs)
-                        
-                        # Update alert statistics
-                        alert.total_jobs_sent += len(matching_jobs)
-                        alert.last_sent_at = datetime.utcnow()
-                        notifications_sent += 1
-                
-                alerts_processed += 1
+            # Batch per user and frequency window so a user with several alerts gets one digest
+            digests: Dict[Tuple[int, str], Dict[int, List[Dict[str, Any]]]] = {}
+            for alert_id, jobs in matches.items():
+                alert = due_alerts[alert_id]
+                jobs.sort(key=lambda job: job['created_at'], reverse=True)
+                jobs = jobs[:self.MAX_JOBS_PER_ALERT]
+                digests.setdefault((alert.user_id, alert.frequency), {})[alert_id] = jobs
+                alert.total_jobs_sent = (alert.total_jobs_sent or 0) + len(jobs)
+                alert.last_sent_at = now
+            
+            for (user_id, frequency), alert_jobs in digests.items():
+                self._send_digest_notification(
+                    user_id, frequency,
+                    [(due_alerts[alert_id], jobs) for alert_id, jobs in alert_jobs.items()]
+                )
             
             db.commit()
             
-            return {
-                'alerts_processed': alerts_processed,
-                'notifications_sent': notifications_sent
+            elapsed = time.perf_counter() - started
+            metrics = {
+                'alerts_processed': len(active_alerts),
+                'alerts_due': len(due_alerts),
+                'alerts_matched': len(matches),
+                'notifications_sent': len(digests),
+                'jobs_scanned': jobs_scanned,
+                'candidate_checks': matcher.candidate_checks,
+                'duration_seconds': round(elapsed, 4),
+                'jobs_per_second': round(jobs_scanned / elapsed, 1) if elapsed > 0 else 0.0
             }
+            logger.info(f"Job alert sweep finished: {metrics}")
+            return metrics
             
         except Exception as e:
             logger.error(f"Error checking and sending alerts: {str(e)}")
+            db.rollback()
             return {'alerts_processed': 0, 'notifications_sent': 0}
     
+    def _stream_new_jobs(self, db: Session, since: datetime):
+        """Active jobs posted since `since`, fetched in batches rather than all at once."""
+        return db.query(Job).options(
+            joinedload(Job.company)
+        ).filter(
+            Job.status == "active",
+            Job.created_at >= since
+        ).order_by(Job.created_at).yield_per(self.JOB_STREAM_BATCH_SIZE)
+    
+    def _job_summary(self, job: Job) -> Dict[str, Any]:
+        return {
+            'id': job.id,
+            'title': job.title,
+            'company': job.company.name if job.company else None,
+            'location': job.location,
+            'salary_min': job.salary_min,
+            'salary_max': job.salary_max,
+            'created_at': job.created_at
+        }
+    
     def _should_send_alert(self, alert: JobAlert) -> bool:
         """Check if alert should be sent based on frequency."""
         if not alert.last_sent_at:
@@ -199,56 +263,23 @@ class JobAlertService:
         
         return False
     
-    def _find_matching_jobs(self, db: Session, alert: JobAlert) -> List[Dict[str, Any]]:
-        """Find jobs matching the alert criteria."""
+    def _send_digest_notification(self, user_id: int, frequency: str, 
+                                  alert_jobs: List[Tuple[JobAlert, List[Dict[str, Any]]]]) -> None:
+        """Send one notification covering every alert of a user that matched in this window."""
         try:
-            # Convert alert criteria to search parameters
-            from ..models.schemas import JobSearchRequest
-            
-            search_params = JobSearchRequest(**alert.search_criteria)
-            
-            # Only get jobs created since last alert or in last 24 hours
-            if alert.last_sent_at:
-                search_params.posted_within_days = (datetime.utcnow() - alert.last_sent_at).days
-            else:
-                search_params.posted_within_days = 1
-            
-            # Search for matching jobs
-            jobs, total = self.job_repo.search_jobs(db, search_params)
-            
-            return [
-                {
-                    'id': job.id,
-                    'title': job.title,
-                    'company': job.company.name if job.company else None,
-                    'location': job.location,
-                    'salary_min': job.salary_min,
-                    'salary_max': job.salary_max,
-                    'created_at': job.created_at
-                }
-                for job in jobs
-            ]
-            
-        except Exception as e:
-            logger.error(f"Error finding matching jobs for alert {alert.id}: {str(e)}")
-            return []
-    
-    def _send_alert_notification(self, alert: JobAlert, matching_jobs: List[Dict[str, Any]]) -> None:
-        """Send notification for job alert."""
-        try:
-            # This would integrate with email/push notification service
-            logger.info(f"Sending alert notification for alert {alert.id} with {len(matching_jobs)} jobs")
+            total_jobs = sum(len(jobs) for _, jobs in alert_jobs)
+            logger.info(
+                f"Sending {frequency} alert digest to user {user_id}: "
+                f"{len(alert_jobs)} alerts, {total_jobs} jobs"
+            )
             
             # Example email implementation:
-            # subject = f"New jobs matching your alert: {alert.alert_name}"
-            # body = self._generate_alert_email_body(alert, matching_jobs)
+            # subject = f"{total_jobs} new jobs match your alerts"
+            # body = "\n".join(self._generate_alert_email_body(alert, jobs) for alert, jobs in alert_jobs)
             # send_email(user_email, subject, body)
             
-            # Example push notification:
-            # send_push_notification(alert.user_id, f"{len(matching_jobs)} new jobs match your alert")
-            
         except Exception as e:
-            logger.error(f"Error sending alert notification: {str(e)}")
+            logger.error(f"Error sending alert digest: {str(e)}")
     
     def _generate_alert_email_body(self, alert: JobAlert, matching_jobs: List[Dict[str, Any]]) -> str:
         """Generate email body for job alert."""
@@ -0,0 +1,128 @@
+# File: job-service/src/services/job_feed.py
+
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from ..config.config import settings
+from ..models.job_models import Job
+import hashlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Ranked segments every feed is assembled from
+FEED_SEGMENTS = {
+    "recent": lambda query: query.order_by(desc(Job.created_at), desc(Job.id)),
+    "featured": lambda query: query.filter(Job.is_featured == True).order_by(desc(Job.created_at), desc(Job.id)),
+    "trending": lambda query: query.order_by(desc(Job.view_count), desc(Job.id))
+}
+
+# Segments per feed type; "mixed" interleaves them
+FEED_TYPES = {
+    "recent": ("recent",),
+    "recommended": ("featured",),
+    "trending": ("trending",),
+    "mixed": ("recent", "featured", "trending")
+}
+
+
+class FeedSnapshot:
+    """A feed's de-duplicated, ranked job ids at one point in time."""
+
+    def __init__(self, feed_type: str, job_ids: List[Any]):
+        self.feed_type = feed_type
+        self.job_ids = job_ids
+        self.created_at = time.monotonic()
+        # Derived from the contents, so workers that build the same feed agree on the token
+        digest = hashlib.sha1(f"{feed_type}:{','.join(map(str, job_ids))}".encode()).hexdigest()
+        self.token = f"{feed_type}.{digest[:20]}"
+
+    def page(self, cursor: int, limit: int) -> List[Any]:
+        return self.job_ids[cursor:cursor + limit]
+
+
+class JobFeedEngine:
+    """
+    Builds feed snapshots from id-only segment queries and keeps them in memory.
+
+    The newest snapshot per feed type is reused for FEED_SNAPSHOT_TTL_SECONDS;
+    older ones stay addressable by their refresh token so a client paging
+    through a feed keeps a stable order while newer snapshots are served to
+    new readers.
+    """
+
+    def __init__(self, segment_size: Optional[int] = None, snapshot_ttl: Optional[float] = None,
+                 max_snapshots: Optional[int] = None):
+        self.segment_size = segment_size or settings.FEED_SEGMENT_SIZE
+        self.snapshot_ttl = snapshot_ttl or settings.FEED_SNAPSHOT_TTL_SECONDS
+        self.max_snapshots = max_snapshots or settings.FEED_MAX_SNAPSHOTS
+        self._current: Dict[str, FeedSnapshot] = {}
+        self._by_token: "OrderedDict[str, FeedSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def snapshot(self, db: Session, feed_type: str, refresh_token: Optional[str] = None) -> FeedSnapshot:
+        """The snapshot a token refers to, else the current one for the feed type."""
+        if feed_type not in FEED_TYPES:
+            feed_type = "mixed"
+        if refresh_token:
+            snapshot = self._by_token.get(refresh_token)
+            if snapshot is not None and snapshot.feed_type == feed_type:
+                return snapshot
+
+        snapshot = self._current.get(feed_type)
+        if snapshot is not None and time.monotonic() - snapshot.created_at < self.snapshot_ttl:
+            return snapshot
+        with self._lock:
+            snapshot = self._current.get(feed_type)
+            if snapshot is None or time.monotonic() - snapshot.created_at >= self.snapshot_ttl:
+                snapshot = self._build(db, feed_type)
+        return snapshot
+
+    def resume(self, db: Session, feed_type: str, refresh_token: Optional[str], cursor: int) -> Tuple[FeedSnapshot, int]:
+        """
+        The snapshot to page through and the cursor to continue from.
+
+        A cursor is only meaningful in the snapshot its token names; when that
+        snapshot has been evicted the client starts over at the top of the
+        current one, whose token the response carries.
+        """
+        snapshot = self.snapshot(db, feed_type, refresh_token)
+        return snapshot, cursor if refresh_token == snapshot.token else 0
+
+    def _build(self, db: Session, feed_type: str) -> FeedSnapshot:
+        segments = [
+            [job_id for (job_id,) in FEED_SEGMENTS[name](
+                db.query(Job.id).filter(Job.status == "active")
+            ).limit(self.segment_size)]
+            for name in FEED_TYPES[feed_type]
+        ]
+        snapshot = FeedSnapshot(feed_type, self._interleave(segments))
+
+        self._current[feed_type] = snapshot
+        self._by_token[snapshot.token] = snapshot
+        self._by_token.move_to_end(snapshot.token)
+        while len(self._by_token) > self.max_snapshots:
+            self._by_token.popitem(last=False)
+        return snapshot
+
+    @staticmethod
+    def _interleave(segments: List[List[Any]]) -> List[Any]:
+        """Round-robin over the segments, keeping each job's first (best) position."""
+        seen = set()
+        job_ids = []
+        for position in range(max((len(segment) for segment in segments), default=0)):
+            for segment in segments:
+                if position < len(segment) and segment[position] not in seen:
+                    seen.add(segment[position])
+                    job_ids.append(segment[position])
+        return job_ids
+
+    def stats(self) -> Dict[str, Any]:
+        return {"snapshots": len(self._by_token), "feed_types": sorted(self._current)}
+
+
+# Process-wide feed snapshots
+job_feed = JobFeedEngine()
@@ -8,29 +8,43 @@ from ..models.schemas import (
     JobSearchResponse, MessageResponse
 )
 from ..models.job_models import Job, Company, JobCategory, JobApplication, JobType, ExperienceLevel, JobStatus  # Added missing imports
-from ..utils.auth_utils import get_user_from_token
 from fastapi import HTTPException, status
 import logging
 
     
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, and_, case
+from datetime import datetime
+from ..config.config import settings
+from ..utils.response_cache import CachedResponse, ResponseCache
 from ..models.schemas import (
     JobStatisticsResponse, FilterOptionsResponse, JobCategoryResponse,
-    BulkJobAction, BulkJobResponse, JobFeedRequest, JobFeedResponse
+    BulkJobAction, BulkJobResponse, JobFeedRequest, JobFeedResponse, JobResponseWithAnalytics
 )
+from .job_feed import job_feed
 
 
 logger = logging.getLogger(__name__)
 
+# Platform statistics and filter options; invalidated on job writes
+statistics_cache = ResponseCache(ttl=settings.STATISTICS_CACHE_TTL_SECONDS)
+
+# Column values set by each bulk action; "delete" is handled separately
+BULK_ACTION_VALUES = {
+    "activate": {"status": JobStatus.ACTIVE.value},
+    "deactivate": {"status": JobStatus.PAUSED.value},
+    "feature": {"is_featured": True},
+    "unfeature": {"is_featured": False}
+}
+
 class JobService:
     def __init__(self):
         self.job_repo = JobRepository()
     
-    def create_job(self, db: Session, job_data: JobCreate, user_token: str) -> JobResponse:
+    def create_job(self, db: Session, job_data: JobCreate, current_user: Dict[str, Any]) -> JobResponse:
         """Create a new job posting."""
         try:
             # Validate user token and get user info
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Verify company exists
@@ -43,6 +57,7 @@ class JobService:
             
             # Create job
             job = self.job_repo.create_job(db, job_data, user_id)
+            statistics_cache.invalidate()
             
             # Convert to response model
             return JobResponse.model_validate(job)
@@ -54,7 +69,7 @@ class JobService:
                 detail="Failed to create job"
             )
     
-    def get_job_by_id(self, db: Session, job_id: int, user_token: Optional[str] = None) -> JobResponse:
+    def get_job_by_id(self, db: Session, job_id: int, current_user: Optional[Dict[str, Any]] = None, ip_address: Optional[str] = None) -> JobResponse:
         """Get job by ID and increment view count."""
         job = self.job_repo.get_job_by_id(db, job_id)
         if not job:
@@ -64,20 +79,14 @@ class JobService:
             )
         
         # Track view if user is provided
-        user_id = None
-        if user_token:
-            try:
-                user_info = get_user_from_token(user_token)
-                user_id = user_info["user_id"]
-            except:
-                pass  # Anonymous view
+        user_id = current_user["user_id"] if current_user else None
         
         # Increment view count
-        self.job_repo.increment_view_count(db, job_id, user_id)
+        self.job_repo.increment_view_count(db, job_id, user_id, ip_address)
         
         return JobResponse.model_validate(job)
     
-    def get_job_by_slug(self, db: Session, slug: str, user_token: Optional[str] = None) -> JobResponse:
+    def get_job_by_slug(self, db: Session, slug: str, current_user: Optional[Dict[str, Any]] = None, ip_address: Optional[str] = None) -> JobResponse:
         """Get job by slug and increment view count."""
         job = self.job_repo.get_job_by_slug(db, slug)
         if not job:
@@ -87,23 +96,17 @@ class JobService:
             )
         
         # Track view if user is provided
-        user_id = None
-        if user_token:
-            try:
-                user_info = get_user_from_token(user_token)
-                user_id = user_info["user_id"]
-            except:
-                pass  # Anonymous view
+        user_id = current_user["user_id"] if current_user else None
         
         # Increment view count
-        self.job_repo.increment_view_count(db, job.id, user_id)
+        self.job_repo.increment_view_count(db, job.id, user_id, ip_address)
         
         return JobResponse.model_validate(job)
     
     def search_jobs(self, db: Session, search_params: JobSearchRequest) -> JobSearchResponse:
         """Search jobs with filtering and pagination."""
         try:
-            jobs, total = self.job_repo.search_jobs(db, search_params)
+            jobs, total, total_is_estimate = self.job_repo.search_jobs(db, search_params)
             
             # Calculate total pages
             total_pages = (total + search_params.limit - 1) // search_params.limit
@@ -116,7 +119,8 @@ class JobService:
                 total=total,
                 page=search_params.page,
                 limit=search_params.limit,
-                total_pages=total_pages
+                total_pages=total_pages,
+                total_is_estimate=total_is_estimate
             )
             
         except Exception as e:
@@ -150,10 +154,10 @@ class JobService:
                 detail="Failed to get recent jobs"
             )
     
-    def get_job_recommendations(self, db: Session, user_token: str, limit: int = 10) -> List[JobResponse]:
+    def get_job_recommendations(self, db: Session, current_user: Dict[str, Any], limit: int = 10) -> List[JobResponse]:
         """Get job recommendations for user."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # For now, return recent jobs
@@ -187,10 +191,10 @@ class JobService:
                 detail="Failed to get similar jobs"
             )
     
-    def update_job(self, db: Session, job_id: int, job_data: JobUpdate, user_token: str) -> JobResponse:
+    def update_job(self, db: Session, job_id: int, job_data: JobUpdate, current_user: Dict[str, Any]) -> JobResponse:
         """Update job posting."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Get job and verify ownership
@@ -215,6 +219,8 @@ class JobService:
                     detail="Failed to update job"
                 )
             
+            statistics_cache.invalidate()
+            
             return JobResponse.model_validate(updated_job)
             
         except HTTPException:
@@ -226,10 +232,10 @@ class JobService:
                 detail="Failed to update job"
             )
     
-    def delete_job(self, db: Session, job_id: int, user_token: str) -> MessageResponse:
+    def delete_job(self, db: Session, job_id: int, current_user: Dict[str, Any]) -> MessageResponse:
         """Delete job posting."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Get job and verify ownership
@@ -254,6 +260,8 @@ class JobService:
                     detail="Failed to delete job"
                 )
             
+            statistics_cache.invalidate()
+            
             return MessageResponse(message="Job deleted successfully")
             
         except HTTPException:
@@ -265,10 +273,10 @@ class JobService:
                 detail="Failed to delete job"
             )
     
-    def save_job(self, db: Session, job_id: int, user_token: str) -> MessageResponse:
+    def save_job(self, db: Session, job_id: int, current_user: Dict[str, Any]) -> MessageResponse:
         """Save job for user."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Verify job exists
@@ -295,10 +303,10 @@ class JobService:
                 detail="Failed to save job"
             )
     
-    def unsave_job(self, db: Session, job_id: int, user_token: str) -> MessageResponse:
+    def unsave_job(self, db: Session, job_id: int, current_user: Dict[str, Any]) -> MessageResponse:
         """Remove saved job for user."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             success = self.job_repo.unsave_job(db, job_id, user_id)
@@ -319,10 +327,10 @@ class JobService:
                 detail="Failed to remove saved job"
             )
     
-    def get_user_saved_jobs(self, db: Session, user_token: str) -> List[JobResponse]:
+    def get_user_saved_jobs(self, db: Session, current_user: Dict[str, Any]) -> List[JobResponse]:
         """Get saved jobs for user."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             jobs = self.job_repo.get_user_saved_jobs(db, user_id)
@@ -335,10 +343,10 @@ class JobService:
                 detail="Failed to get saved jobs"
             )
     
-    def get_user_viewed_jobs(self, db: Session, user_token: str, limit: int = 20) -> List[JobResponse]:
+    def get_user_viewed_jobs(self, db: Session, current_user: Dict[str, Any], limit: int = 20) -> List[JobResponse]:
         """Get jobs viewed by user (Last Viewed Jobs feature)."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             jobs = self.job_repo.get_user_viewed_jobs(db, user_id, limit)
@@ -363,137 +371,154 @@ class JobService:
                 detail="Failed to get jobs by company"
             )
 
-    def get_job_statistics(self, db: Session) -> JobStatisticsResponse:
-        """Get overall job platform statistics."""
+    def get_job_statistics(self, db: Session) -> CachedResponse:
+        """Get overall job platform statistics (cached snapshot)."""
         try:
-            # Get basic counts
-            total_jobs = db.query(Job).count()
-            active_jobs = db.query(Job).filter(Job.status == "active").count()
-            
-            # Jobs this month
-            from datetime import datetime, timedelta
-            start_of_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            jobs_this_month = db.query(Job).filter(Job.created_at >= start_of_month).count()
-            
-            # Total applications
-            total_applications = db.query(JobApplication).count()
-            
-            # Average applications per job
-            avg_applications = total_applications / total_jobs if total_jobs > 0 else 0
-            
-            # Top categories
-            top_categories = db.query(
-                JobCategory.name,
-                func.count(Job.id).label('job_count')
-            ).join(Job).group_by(JobCategory.name).order_by(desc('job_count')).limit(5).all()
-            
-            top_categories_data = [
-                {"name": cat.name, "job_count": cat.job_count}
-                for cat in top_categories
-            ]
-            
-            # Top companies
-            top_companies = db.query(
-                Company.name,
-                func.count(Job.id).label('job_count')
-            ).join(Job).group_by(Company.name).order_by(desc('job_count')).limit(5).all()
-            
-            top_companies_data = [
-                {"name": comp.name, "job_count": comp.job_count}
-                for comp in top_companies
-            ]
-            
-            # Salary insights
-            salary_stats = db.query(
-                func.avg(Job.salary_min).label('avg_min_salary'),
-                func.avg(Job.salary_max).label('avg_max_salary'),
-                func.min(Job.salary_min).label('min_salary'),
-                func.max(Job.salary_max).label('max_salary')
-            ).filter(
-                Job.salary_min.isnot(None),
-                Job.salary_max.isnot(None)
-            ).first()
-            
-            salary_insights = {
-                "average_min_salary": salary_stats.avg_min_salary or 0,
-                "average_max_salary": salary_stats.avg_max_salary or 0,
-                "lowest_salary": salary_stats.min_salary or 0,
-                "highest_salary": salary_stats.max_salary or 0
-            }
-            
-            return JobStatisticsResponse(
-                total_jobs=total_jobs,
-                active_jobs=active_jobs,
-                jobs_this_month=jobs_this_month,
-                total_applications=total_applications,
-                avg_applications_per_job=round(avg_applications, 2),
-                top_categories=top_categories_data,
-                top_companies=top_companies_data,
-                salary_insights=salary_insights
-            )
-            
+            return statistics_cache.get("statistics", lambda: self._build_job_statistics(db))
         except Exception as e:
             logger.error(f"Error getting job statistics: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to get job statistics"
             )
+    
+    def _build_job_statistics(self, db: Session) -> JobStatisticsResponse:
+        # Counts and salary aggregates in one scan of jobs
+        start_of_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        with_salary = and_(Job.salary_min.isnot(None), Job.salary_max.isnot(None))
+        totals = db.query(
+            func.count(Job.id).label('total_jobs'),
+            func.count(case((Job.status == "active", 1))).label('active_jobs'),
+            func.count(case((Job.created_at >= start_of_month, 1))).label('jobs_this_month'),
+            func.avg(case((with_salary, Job.salary_min))).label('avg_min_salary'),
+            func.avg(case((with_salary, Job.salary_max))).label('avg_max_salary'),
+            func.min(case((with_salary, Job.salary_min))).label('min_salary'),
+            func.max(case((with_salary, Job.salary_max))).label('max_salary')
+        ).one()
+        
+        # Total applications
+        total_applications = db.query(func.count(JobApplication.id)).scalar() or 0
+        
+        # Average applications per job
+        avg_applications = total_applications / totals.total_jobs if totals.total_jobs > 0 else 0
+        
+        # Top categories
+        top_categories = db.query(
+            JobCategory.name,
+            func.count(Job.id).label('job_count')
+        ).join(Job).group_by(JobCategory.name).order_by(desc('job_count')).limit(5).all()
+        
+        top_categories_data = [
+            {"name": cat.name, "job_count": cat.job_count}
+            for cat in top_categories
+        ]
+        
+        # Top companies
+        top_companies = db.query(
+            Company.name,
+            func.count(Job.id).label('job_count')
+        ).join(Job).group_by(Company.name).order_by(desc('job_count')).limit(5).all()
+        
+        top_companies_data = [
+            {"name": comp.name, "job_count": comp.job_count}
+            for comp in top_companies
+        ]
+        
+        # Salary insights
+        salary_insights = {
+            "average_min_salary": totals.avg_min_salary or 0,
+            "average_max_salary": totals.avg_max_salary or 0,
+            "lowest_salary": totals.min_salary or 0,
+            "highest_salary": totals.max_salary or 0
+        }
+        
+        return JobStatisticsResponse(
+            total_jobs=totals.total_jobs,
+            active_jobs=totals.active_jobs,
+            jobs_this_month=totals.jobs_this_month,
+            total_applications=total_applications,
+            avg_applications_per_job=round(avg_applications, 2),
+            top_categories=top_categories_data,
+            top_companies=top_companies_data,
+            salary_insights=salary_insights
+        )
 
-    def get_filter_options(self, db: Session) -> FilterOptionsResponse:
-        """Get available filter options for job search."""
+    def get_filter_options(self, db: Session) -> CachedResponse:
+        """Get available filter options for job search (cached snapshot)."""
         try:
-            # Job types
-            job_types = [{"value": jt.value, "label": jt.value.replace("_", " ").title()} for jt in JobType]
-            
-            # Experience levels
-            experience_levels = [{"value": el.value, "label": el.value.replace("_", " ").title()} for el in ExperienceLevel]
-            
-            # Industries (from companies)
-            industries = db.query(Company.industry).filter(Company.industry.isnot(None)).distinct().all()
-            industries_data = [{"name": ind[0], "job_count": 0} for ind in industries if ind[0]]
-            
-            # Company sizes
-            company_sizes = [
-                {"value": "1-10", "label": "1-10 employees"},
-                {"value": "11-50", "label": "11-50 employees"},
-                {"value": "51-200", "label": "51-200 employees"},
-                {"value": "201-1000", "label": "201-1000 employees"},
-                {"value": "1000+", "label": "1000+ employees"}
-            ]
-            
-            # Locations (from jobs)
-            locations = db.query(Job.city).filter(Job.city.isnot(None)).distinct().limit(50).all()
-            locations_data = [{"city": loc[0], "job_count": 0} for loc in locations if loc[0]]
-            
-            # Salary ranges
-            salary_ranges = [
-                {"min": 0, "max": 50000, "label": "$0 - $50k"},
-                {"min": 50000, "max": 100000, "label": "$50k - $100k"},
-                {"min": 100000, "max": 150000, "label": "$100k - $150k"},
-                {"min": 150000, "max": 200000, "label": "$150k - $200k"},
-                {"min": 200000, "max": None, "label": "$200k+"}
-            ]
-            
-            # Categories
-            categories = db.query(JobCategory).filter(JobCategory.is_active == True).all()
-            categories_data = [JobCategoryResponse.model_validate(cat) for cat in categories]
-            
-            return FilterOptionsResponse(
-                job_types=job_types,
-                experience_levels=experience_levels,
-                industries=industries_data,
-                company_sizes=company_sizes,
-                locations=locations_data,
-                salary_ranges=salary_ranges,
-                categories=categories_data
-            )
-            
+            return statistics_cache.get("filter_options", lambda: self._build_filter_options(db))
         except Exception as e:
             logger.error(f"Error getting filter options: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to get filter options"
             )
+    
+    def _build_filter_options(self, db: Session) -> FilterOptionsResponse:
+        # Job types
+        job_types = [{"value": jt.value, "label": jt.value.replace("_", " ").title()} for jt in JobType]
+        
+        # Experience levels
+        experience_levels = [{"value": el.value, "label": el.value.replace("_", " ").title()} for el in ExperienceLevel]
+        
+        # Industries (from companies) with their active job counts
+        industries = db.query(
+            Company.industry,
+            func.count(Job.id).label('job_count')
+        ).outerjoin(
+            Job, and_(Job.company_id == Company.id, Job.status == "active")
+        ).filter(Company.industry.isnot(None)).group_by(Company.industry).order_by(desc('job_count')).all()
+        industries_data = [{"name": ind.industry, "job_count": ind.job_count} for ind in industries if ind.industry]
+        
+        # Company sizes
+        company_sizes = [
+            {"value": "1-10", "label": "1-10 employees"},
+            {"value": "11-50", "label": "11-50 employees"},
+            {"value": "51-200", "label": "51-200 employees"},
+            {"value": "201-1000", "label": "201-1000 employees"},
+            {"value": "1000+", "label": "1000+ employees"}
+        ]
+        
+        # Locations (from active jobs), busiest first
+        locations = db.query(
+            Job.city,
+            func.count(Job.id).label('job_count')
+        ).filter(
+            Job.city.isnot(None),
+            Job.status == "active"
+        ).group_by(Job.city).order_by(desc('job_count')).limit(50).all()
+        locations_data = [{"city": loc.city, "job_count": loc.job_count} for loc in locations if loc.city]
+        
+        # Salary ranges
+        salary_ranges = [
+            {"min": 0, "max": 50000, "label": "$0 - $50k"},
+            {"min": 50000, "max": 100000, "label": "$50k - $100k"},
+            {"min": 100000, "max": 150000, "label": "$100k - $150k"},
+            {"min": 150000, "max": 200000, "label": "$150k - $200k"},
+            {"min": 200000, "max": None, "label": "$200k+"}
+        ]
+        
+        # Categories with their active job counts
+        categories = db.query(
+            JobCategory,
+            func.count(Job.id).label('job_count')
+        ).outerjoin(
+            Job, and_(Job.category_id == JobCategory.id, Job.status == "active")
+        ).filter(JobCategory.is_active == True).group_by(JobCategory.id).all()
+        categories_data = [
+            JobCategoryResponse.model_validate(category).model_copy(update={"job_count": job_count})
+            for category, job_count in categories
+        ]
+        
+        return FilterOptionsResponse(
+            job_types=job_types,
+            experience_levels=experience_levels,
+            industries=industries_data,
+            company_sizes=company_sizes,
+            locations=locations_data,
+            salary_ranges=salary_ranges,
+            categories=categories_data
+        )
 
     def get_job_categories(self, db: Session) -> List[JobCategoryResponse]:
         """Get all job categories."""
@@ -522,44 +547,50 @@ class JobService:
             )
 
     def bulk_job_action(self, db: Session, bulk_action: BulkJobAction, user_id: int) -> BulkJobResponse:
-        """Perform bulk actions on jobs."""
+        """
+        Perform bulk actions on jobs.
+        
+        Each chunk of ids is one UPDATE/DELETE restricted to the user's own jobs;
+        ids it did not return are reported as failed.
+        """
         try:
+            job_ids = list(dict.fromkeys(bulk_action.job_ids))
+            if bulk_action.action != "delete" and bulk_action.action not in BULK_ACTION_VALUES:
+                return BulkJobResponse(
+                    successful=[],
+                    failed=[{"job_id": job_id, "error": "Invalid action"} for job_id in job_ids],
+                    total_processed=len(bulk_action.job_ids)
+                )
+            
             successful = []
             failed = []
-            
-            for job_id in bulk_action.job_ids:
+            chunk_size = settings.BULK_ACTION_CHUNK_SIZE
+            for start in range(0, len(job_ids), chunk_size):
+                chunk = job_ids[start:start + chunk_size]
                 try:
-                    job = db.query(Job).filter(Job.id == job_id).first()
-                    if not job:
-                        failed.append({"job_id": job_id, "error": "Job not found"})
-                        continue
-                    
-                    # Check if user has permission (admin or job owner)
-                    if user_id != job.posted_by:
-                        failed.append({"job_id": job_id, "error": "Not authorized"})
-                        continue
-                    
-                    # Perform action
-                    if bulk_action.action == "activate":
-                        job.status = JobStatus.ACTIVE
-                    elif bulk_action.action == "deactivate":
-                        job.status = JobStatus.PAUSED
-                    elif bulk_action.action == "delete":
-                        db.delete(job)
-                    elif bulk_action.action == "feature":
-                        job.featured = True
-                    elif bulk_action.action == "unfeature":
-                        job.featured = False
+                    if bulk_action.action == "delete":
+                        done = self.job_repo.bulk_delete_jobs(db, chunk, user_id)
                     else:
-                        failed.append({"job_id": job_id, "error": "Invalid action"})
-                        continue
-                    
-                    successful.append(job_id)
-                    
+                        done = self.job_repo.bulk_update_jobs(db, chunk, user_id, BULK_ACTION_VALUES[bulk_action.action])
+                    db.commit()
                 except Exception as e:
-                    failed.append({"job_id": job_id, "error": str(e)})
-            
-            db.commit()
+                    db.rollback()
+                    logger.error(f"Bulk {bulk_action.action} failed for {len(chunk)} jobs: {str(e)}")
+                    failed.extend({"job_id": job_id, "error": str(e)} for job_id in chunk)
+                    continue
+                
+                successful.extend(job_id for job_id in chunk if job_id in done)
+                missed = [job_id for job_id in chunk if job_id not in done]
+                if missed:
+                    existing = self.job_repo.existing_job_ids(db, missed)
+                    failed.extend(
+                        {"job_id": job_id, "error": "Not authorized" if job_id in existing else "Job not found"}
+                        for job_id in missed
+                    )
+            
+            # Once per batch, not per job
+            if successful:
+                statistics_cache.invalidate()
             
             return BulkJobResponse(
                 successful=successful,
@@ -574,49 +605,38 @@ class JobService:
                 detail="Failed to perform bulk action"
             )
 
-    def get_job_feed(self, db: Session, feed_request: JobFeedRequest) -> JobFeedResponse:
-        """Get personalized job feed for homepage."""
+    def get_job_feed(self, db: Session, feed_request: JobFeedRequest, user_id: Optional[Any] = None) -> JobFeedResponse:
+        """
+        Get personalized job feed for homepage.
+        
+        Pages are slices of a cached feed snapshot; passing back refresh_token and
+        next_cursor continues the same snapshot without duplicates or gaps; a
+        token whose snapshot is gone restarts at the top of the current one.
+        """
         try:
-            jobs = []
+            snapshot, cursor = job_feed.resume(db, feed_request.feed_type, feed_request.refresh_token, feed_request.cursor)
+            page_ids = snapshot.page(cursor, feed_request.limit)
+            jobs = self.job_repo.get_jobs_by_ids(db, page_ids)
             
-            if feed_request.feed_type == "recent":
-                jobs = self.job_repo.get_recent_jobs(db, feed_request.limit)
-            elif feed_request.feed_type == "trending":
-                # Get jobs with high view counts
-                jobs = db.query(Job).filter(
-                    Job.status == "active"
-                ).order_by(desc(Job.view_count)).limit(feed_request.limit).all()
-            elif feed_request.feed_type == "recommended":
-                # Basic recommendation logic
-                jobs = self.job_repo.get_featured_jobs(db, feed_request.limit)
-            else:  # mixed
-                # Get a mix of recent, featured, and trending
-                recent = self.job_repo.get_recent_jobs(db, feed_request.limit // 3)
-                featured = self.job_repo.get_featured_jobs(db, feed_request.limit // 3)
-                trending = db.query(Job).filter(
-                    Job.status == "active"
-                ).order_by(desc(Job.view_count)).limit(feed_request.limit // 3).all()
-                
-                jobs = recent + featured + trending
-                jobs = jobs[:feed_request.limit]  # Limit total
+            saved_ids, applied_ids = set(), set()
+            if user_id is not None:
+                saved_ids, applied_ids = self.job_repo.get_user_job_flags(db, user_id, page_ids)
             
-            # Convert to response format
             job_responses = []
             for job in jobs:
-                job_dict = job.__dict__.copy()
-                job_dict['analytics'] = {"views": job.view_count, "applications": job.application_count}
-                job_dict['is_saved'] = False  # Would check user's saved jobs
-                job_dict['is_applied'] = False  # Would check user's applications
-                job_responses.append(job_dict)
-            
-            import uuid
-            refresh_token = str(uuid.uuid4())
+                job_response = JobResponseWithAnalytics.model_validate(job)
+                job_response.analytics = {"views": job.view_count, "applications": job.application_count}
+                job_response.is_saved = job.id in saved_ids
+                job_response.is_applied = job.id in applied_ids
+                job_responses.append(job_response)
             
+            next_cursor = cursor + len(page_ids)
             return JobFeedResponse(
                 jobs=job_responses,
-                feed_type=feed_request.feed_type,
-                personalized=bool(feed_request.user_skills or feed_request.user_location),
-                refresh_token=refresh_token
+                feed_type=snapshot.feed_type,
+                personalized=bool(feed_request.user_skills or feed_request.user_location or user_id is not None),
+                refresh_token=snapshot.token,
+                next_cursor=next_cursor if next_cursor < len(snapshot.job_ids) else None
             )
             
         except Exception as e:
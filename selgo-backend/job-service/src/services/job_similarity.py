@@ -0,0 +1,258 @@
+# File: job-service/src/services/job_similarity.py
+
+from sqlalchemy.orm import Session
+from scipy import sparse
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from datetime import datetime, timedelta
+from ..config.config import settings
+from ..database.database import SessionLocal
+from ..models.job_models import Job, JobView, SavedJob
+import numpy as np
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Interaction weights; a save is a much stronger signal than a view
+SAVE_WEIGHT = 1.0
+VIEW_WEIGHT = 0.3
+
+# Incremental loads re-read this far behind the watermark, since views are written in delayed batches
+WATERMARK_OVERLAP = timedelta(minutes=2)
+
+# Jobs whose similarity rows are computed per sparse product
+BUILD_CHUNK_SIZE = 1000
+
+
+class _SimilarityState:
+    """Interaction matrix and top-K neighbour lists; replaced whole on a full rebuild."""
+
+    def __init__(self):
+        self.job_ids: List[Any] = []
+        self.job_index: Dict[Any, int] = {}
+        self.user_index: Dict[Any, int] = {}
+        # (user, job) -> strongest interaction weight, so re-reading an interaction is harmless
+        self.weights: Dict[Tuple[int, int], float] = {}
+        self.active: np.ndarray = np.zeros(0, dtype=bool)
+        # job -> (neighbour jobs, similarities), both sorted by similarity
+        self.neighbours: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self.watermark: Optional[datetime] = None
+        self.built_at: Optional[datetime] = None
+
+    def job(self, job_id: Any) -> int:
+        index = self.job_index.get(job_id)
+        if index is None:
+            index = self.job_index[job_id] = len(self.job_ids)
+            self.job_ids.append(job_id)
+        return index
+
+    def add(self, user_id: Any, job_id: Any, weight: float) -> Optional[Tuple[int, int]]:
+        """Record an interaction; returns its (user, job) cell if it changed the matrix."""
+        user = self.user_index.setdefault(user_id, len(self.user_index))
+        job = self.job(job_id)
+        if self.weights.get((user, job), 0.0) >= weight:
+            return None
+        self.weights[(user, job)] = weight
+        return user, job
+
+    def matrix(self) -> sparse.csr_matrix:
+        """users x jobs interaction matrix."""
+        if not self.weights:
+            return sparse.csr_matrix((len(self.user_index), len(self.job_ids)), dtype=np.float32)
+        pairs = np.array(list(self.weights.keys()), dtype=np.int64)
+        data = np.fromiter(self.weights.values(), dtype=np.float32, count=len(self.weights))
+        return sparse.csr_matrix(
+            (data, (pairs[:, 0], pairs[:, 1])),
+            shape=(len(self.user_index), len(self.job_ids))
+        )
+
+
+class JobSimilarityIndex:
+    """
+    Top-K item-item similarities between jobs from co-saves and co-views.
+
+    Similarity is the cosine between the jobs' user interaction columns. A
+    refresh only reads interactions newer than the last one and recomputes
+    the neighbour lists of the jobs those users interacted with; a full
+    rebuild every JOB_SIMILARITY_FULL_REBUILD_HOURS drops views that left
+    the window and corrects the drift of incremental updates.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, top_k: Optional[int] = None,
+                 refresh_interval: Optional[float] = None, view_window_days: Optional[int] = None,
+                 full_rebuild_hours: Optional[float] = None):
+        self._session_factory = session_factory
+        self.top_k = top_k or settings.JOB_SIMILARITY_TOP_K
+        self.refresh_interval = refresh_interval or settings.JOB_SIMILARITY_REFRESH_SECONDS
+        self.view_window = timedelta(days=view_window_days or settings.JOB_SIMILARITY_VIEW_WINDOW_DAYS)
+        self.full_rebuild_interval = timedelta(hours=full_rebuild_hours or settings.JOB_SIMILARITY_FULL_REBUILD_HOURS)
+        self._state = _SimilarityState()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.last_refresh_jobs = 0
+        self.last_refresh_seconds = 0.0
+
+    def refresh(self) -> None:
+        """Incremental update, or a full rebuild when one is due."""
+        with self._lock:
+            started = time.monotonic()
+            state = self._state
+            full = state.built_at is None or datetime.utcnow() - state.built_at >= self.full_rebuild_interval
+            if full:
+                state = _SimilarityState()
+            db = self._session_factory()
+            try:
+                dirty = self._load_interactions(db, state)
+                active_ids = {job_id for (job_id,) in db.query(Job.id).filter(Job.status == "active")}
+            finally:
+                db.close()
+
+            state.active = np.array([job_id in active_ids for job_id in state.job_ids], dtype=bool)
+            matrix = state.matrix()
+            jobs = np.arange(len(state.job_ids)) if full else self._affected_jobs(matrix, dirty)
+            self._compute_neighbours(state, matrix, jobs)
+            if full:
+                state.built_at = datetime.utcnow()
+                # Swapped in whole, so lookups never see a half-built index
+                self._state = state
+
+            self.last_refresh_jobs = len(jobs)
+            self.last_refresh_seconds = time.monotonic() - started
+            logger.info(
+                f"Job similarity {'rebuilt' if full else 'updated'}: {len(jobs)} jobs recomputed "
+                f"in {self.last_refresh_seconds:.2f}s"
+            )
+
+    def _load_interactions(self, db: Session, state: _SimilarityState) -> Set[Tuple[int, int]]:
+        """Read saves and views into state; returns the (user, job) cells that changed."""
+        since = state.watermark - WATERMARK_OVERLAP if state.watermark else None
+        view_since = datetime.utcnow() - self.view_window
+        if since is not None:
+            view_since = max(view_since, since)
+
+        saves = db.query(SavedJob.user_id, SavedJob.job_id, SavedJob.saved_at)
+        if since is not None:
+            saves = saves.filter(SavedJob.saved_at >= since)
+        views = db.query(JobView.user_id, JobView.job_id, JobView.viewed_at).filter(
+            JobView.user_id.isnot(None),
+            JobView.viewed_at >= view_since
+        )
+
+        dirty: Set[Tuple[int, int]] = set()
+        watermark = state.watermark
+        for query, weight in ((saves, SAVE_WEIGHT), (views, VIEW_WEIGHT)):
+            for user_id, job_id, at in query.yield_per(5000):
+                cell = state.add(user_id, job_id, weight)
+                if cell is not None:
+                    dirty.add(cell)
+                if at is not None and (watermark is None or at > watermark):
+                    watermark = at
+        state.watermark = watermark
+        return dirty
+
+    @staticmethod
+    def _affected_jobs(matrix: sparse.csr_matrix, dirty: Set[Tuple[int, int]]) -> np.ndarray:
+        """
+        Jobs whose co-occurrences changed: every job of a user with a new interaction.
+
+        Jobs only related to those through other users keep their lists until
+        the next full rebuild, although the changed norms shift their scores slightly.
+        """
+        if not dirty:
+            return np.zeros(0, dtype=np.int64)
+        users = np.unique(np.array([user for user, _ in dirty], dtype=np.int64))
+        return np.unique(matrix[users].indices).astype(np.int64)
+
+    def _compute_neighbours(self, state: _SimilarityState, matrix: sparse.csr_matrix, jobs: np.ndarray) -> None:
+        if not len(jobs):
+            return
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+        norms[norms == 0] = 1.0
+        columns = matrix.tocsc()
+        for start in range(0, len(jobs), BUILD_CHUNK_SIZE):
+            chunk = jobs[start:start + BUILD_CHUNK_SIZE]
+            # Co-occurrence of each job in the chunk with every job, scaled to cosine similarity
+            products = (columns[:, chunk].T @ matrix).tocsr()
+            for offset, job in enumerate(chunk):
+                row = slice(products.indptr[offset], products.indptr[offset + 1])
+                others = products.indices[row]
+                scores = products.data[row] / (norms[job] * norms[others])
+                keep = (others != job) & state.active[others]
+                others, scores = others[keep], scores[keep]
+                if not len(others):
+                    state.neighbours.pop(int(job), None)
+                    continue
+                if len(others) > self.top_k:
+                    top = np.argpartition(-scores, self.top_k - 1)[:self.top_k]
+                    others, scores = others[top], scores[top]
+                order = np.argsort(-scores, kind="stable")
+                state.neighbours[int(job)] = (others[order].astype(np.int32), scores[order].astype(np.float32))
+
+    def similar_jobs(self, interactions: Iterable[Tuple[Any, float]], exclude: Set[Any], limit: int) -> List[Tuple[Any, float]]:
+        """
+        Merge the neighbour lists of the jobs a user interacted with.
+
+        interactions are (job_id, weight) pairs; returns (job_id, score) pairs,
+        best first, leaving out the excluded jobs.
+        """
+        state = self._state
+        neighbour_ids, neighbour_scores = [], []
+        for job_id, weight in interactions:
+            entry = state.neighbours.get(state.job_index.get(job_id, -1))
+            if entry is not None:
+                neighbour_ids.append(entry[0])
+                neighbour_scores.append(entry[1] * weight)
+        if not neighbour_ids:
+            return []
+
+        jobs, inverse = np.unique(np.concatenate(neighbour_ids), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate(neighbour_scores))
+        results = []
+        for i in np.argsort(-totals, kind="stable"):
+            job_id = state.job_ids[jobs[i]]
+            if job_id in exclude:
+                continue
+            results.append((job_id, float(totals[i])))
+            if len(results) == limit:
+                break
+        return results
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.refresh)
+            except Exception as e:
+                logger.error(f"Failed to refresh job similarity index: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        state = self._state
+        return {
+            "built_at": state.built_at.isoformat() if state.built_at else None,
+            "jobs": len(state.job_ids),
+            "users": len(state.user_index),
+            "interactions": len(state.weights),
+            "jobs_with_neighbours": len(state.neighbours),
+            "last_refresh_jobs": self.last_refresh_jobs,
+            "last_refresh_seconds": round(self.last_refresh_seconds, 3)
+        }
+
+
+# Process-wide index refreshed by the app lifecycle hooks
+job_similarity_index = JobSimilarityIndex()
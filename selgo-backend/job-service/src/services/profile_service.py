@@ -12,7 +12,6 @@ from ..models.schemas import (
     SalaryEntryCreate, SalaryEntryResponse,
     MessageResponse
 )
-from ..utils.auth_utils import get_user_from_token
 from fastapi import HTTPException, status
 import logging
 
@@ -22,10 +21,10 @@ class ProfileService:
     def __init__(self):
         self.profile_repo = ProfileRepository()
     
-    def create_or_get_profile(self, db: Session, user_token: str, profile_data: Optional[JobProfileCreate] = None) -> JobProfileResponse:
+    def create_or_get_profile(self, db: Session, current_user: Dict[str, Any], profile_data: Optional[JobProfileCreate] = None) -> JobProfileResponse:
         """Create profile if it doesn't exist, or get existing profile."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Check if profile already exists
@@ -47,10 +46,10 @@ class ProfileService:
                 detail="Failed to create or get profile"
             )
     
-    def get_profile(self, db: Session, user_token: str) -> JobProfileResponse:
+    def get_profile(self, db: Session, current_user: Dict[str, Any]) -> JobProfileResponse:
         """Get user's job profile."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             profile = self.profile_repo.get_profile_by_user_id(db, user_id)
@@ -71,10 +70,10 @@ class ProfileService:
                 detail="Failed to get profile"
             )
     
-    def update_profile(self, db: Session, user_token: str, profile_data: JobProfileUpdate) -> JobProfileResponse:
+    def update_profile(self, db: Session, current_user: Dict[str, Any], profile_data: JobProfileUpdate) -> JobProfileResponse:
         """Update user's job profile."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             updated_profile = self.profile_repo.update_profile(db, user_id, profile_data)
@@ -95,10 +94,10 @@ class ProfileService:
                 detail="Failed to update profile"
             )
     
-    def delete_profile(self, db: Session, user_token: str) -> MessageResponse:
+    def delete_profile(self, db: Session, current_user: Dict[str, Any]) -> MessageResponse:
         """Delete user's job profile."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             success = self.profile_repo.delete_profile(db, user_id)
@@ -120,10 +119,10 @@ class ProfileService:
             )
     
     # Work Experience Methods
-    def add_work_experience(self, db: Session, user_token: str, experience_data: WorkExperienceCreate) -> WorkExperienceResponse:
+    def add_work_experience(self, db: Session, current_user: Dict[str, Any], experience_data: WorkExperienceCreate) -> WorkExperienceResponse:
         """Add work experience to profile."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Get profile
@@ -146,10 +145,10 @@ class ProfileService:
                 detail="Failed to add work experience"
             )
     
-    def update_work_experience(self, db: Session, user_token: str, experience_id: int, experience_data: Dict[str, Any]) -> WorkExperienceResponse:
+    def update_work_experience(self, db: Session, current_user: Dict[str, Any], experience_id: int, experience_data: Dict[str, Any]) -> WorkExperienceResponse:
         """Update work experience."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Verify ownership through profile
@@ -178,10 +177,10 @@ class ProfileService:
                 detail="Failed to update work experience"
             )
     
-    def delete_work_experience(self, db: Session, user_token: str, experience_id: int) -> MessageResponse:
+    def delete_work_experience(self, db: Session, current_user: Dict[str, Any], experience_id: int) -> MessageResponse:
         """Delete work experience."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Verify ownership through profile
@@ -210,10 +209,10 @@ class ProfileService:
                 detail="Failed to delete work experience"
             )
     
-    def get_work_experiences(self, db: Session, user_token: str) -> List[WorkExperienceResponse]:
+    def get_work_experiences(self, db: Session, current_user: Dict[str, Any]) -> List[WorkExperienceResponse]:
         """Get user's work experiences."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             profile = self.profile_repo.get_profile_by_user_id(db, user_id)
@@ -236,10 +235,10 @@ class ProfileService:
             )
     
     # Education Methods
-    def add_education(self, db: Session, user_token: str, education_data: EducationCreate) -> EducationResponse:
+    def add_education(self, db: Session, current_user: Dict[str, Any], education_data: EducationCreate) -> EducationResponse:
         """Add education to profile."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             profile = self.profile_repo.get_profile_by_user_id(db, user_id)
@@ -261,10 +260,10 @@ class ProfileService:
                 detail="Failed to add education"
             )
     
-    def update_education(self, db: Session, user_token: str, education_id: int, education_data: Dict[str, Any]) -> EducationResponse:
+    def update_education(self, db: Session, current_user: Dict[str, Any], education_id: int, education_data: Dict[str, Any]) -> EducationResponse:
         """Update education."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             profile = self.profile_repo.get_profile_by_user_id(db, user_id)
@@ -292,10 +291,10 @@ class ProfileService:
                 detail="Failed to update education"
             )
     
-    def delete_education(self, db: Session, user_token: str, education_id: int) -> MessageResponse:
+    def delete_education(self, db: Session, current_user: Dict[str, Any], education_id: int) -> MessageResponse:
         """Delete education."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             profile = self.profile_repo.get_profile_by_user_id(db, user_id)
@@ -324,10 +323,10 @@ class ProfileService:
             )
     
     # Skill Methods
-    def add_skill(self, db: Session, user_token: str, skill_name: str, proficiency_level: str, years_of_experience: Optional[int] = None) -> UserSkillResponse:
+    def add_skill(self, db: Session, current_user: Dict[str, Any], skill_name: str, proficiency_level: str, years_of_experience: Optional[int] = None) -> UserSkillResponse:
         """Add skill to profile."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             profile = self.profile_repo.get_profile_by_user_id(db, user_id)
@@ -372,10 +371,10 @@ class ProfileService:
             )
     
     # Language Methods
-    def add_language(self, db: Session, user_token: str, language_name: str, proficiency_level: str) -> UserLanguageResponse:
+    def add_language(self, db: Session, current_user: Dict[str, Any], language_name: str, proficiency_level: str) -> UserLanguageResponse:
         """Add language to profile."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             profile = self.profile_repo.get_profile_by_user_id(db, user_id)
@@ -419,10 +418,10 @@ class ProfileService:
             )
     
     # Salary Methods
-    def add_salary_entry(self, db: Session, user_token: str, salary_data: SalaryEntryCreate) -> SalaryEntryResponse:
+    def add_salary_entry(self, db: Session, current_user: Dict[str, Any], salary_data: SalaryEntryCreate) -> SalaryEntryResponse:
         """Add salary entry to profile."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             profile = self.profile_repo.get_profile_by_user_id(db, user_id)
@@ -444,10 +443,10 @@ class ProfileService:
                 detail="Failed to add salary entry"
             )
     
-    def get_salary_entries(self, db: Session, user_token: str) -> List[SalaryEntryResponse]:
+    def get_salary_entries(self, db: Session, current_user: Dict[str, Any]) -> List[SalaryEntryResponse]:
         """Get user's salary entries."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             profile = self.profile_repo.get_profile_by_user_id(db, user_id)
@@ -471,10 +470,10 @@ class ProfileService:
             
   
 
-    def get_profile_with_salary_comparison(self, db: Session, user_token: str) -> Dict[str, Any]:
+    def get_profile_with_salary_comparison(self, db: Session, current_user: Dict[str, Any]) -> Dict[str, Any]:
         """Get profile with integrated salary comparison data."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             # Get profile
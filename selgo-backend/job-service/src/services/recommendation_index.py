@@ -0,0 +1,287 @@
+# File: job-service/src/services/recommendation_index.py
+
+from sqlalchemy.orm import Session
+from scipy import sparse
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime, timedelta
+from ..config.config import settings
+from ..database.database import SessionLocal
+from ..models.job_models import Job
+from ..models.profile_models import JobProfile, UserSkill, Skill
+import numpy as np
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Job columns whose values make up a job's skill/tag vector
+JOB_TERM_FIELDS = (
+    "required_skills", "preferred_skills", "technologies",
+    "programming_languages", "tools_software", "keywords"
+)
+
+TRENDING_WINDOW = timedelta(days=7)
+
+
+class UserVector:
+    """A user's profile reduced to what recommendation scoring needs."""
+
+    __slots__ = ("term_ids", "skill_count", "desired_title", "location", "desired_salary_min")
+
+    def __init__(self, skills: List[str], term_index: Dict[str, int], desired_title: Optional[str] = None,
+                 location: Optional[str] = None, desired_salary_min: Optional[float] = None):
+        skills = {skill.lower() for skill in skills if skill}
+        self.term_ids = np.array(sorted(term_index[skill] for skill in skills if skill in term_index), dtype=np.int32)
+        # Unmatched skills still count, as in the per-job skills_match ratio
+        self.skill_count = len(skills)
+        self.desired_title = desired_title
+        self.location = location
+        self.desired_salary_min = desired_salary_min
+
+    @classmethod
+    def from_profile(cls, profile: JobProfile, term_index: Dict[str, int]) -> "UserVector":
+        return cls(
+            [user_skill.skill.name for user_skill in profile.skills or [] if user_skill.skill],
+            term_index,
+            desired_title=profile.desired_job_title,
+            location=profile.location,
+            desired_salary_min=profile.desired_salary_min
+        )
+
+
+class RecommendationSnapshot:
+    """
+    Active jobs as a sparse job x term matrix plus column arrays, and user profile vectors.
+
+    Candidate pools (jobs sharing a term with the user, jobs in the user's
+    location, trending jobs) are read from precomputed postings instead of
+    being queried per request, and candidates are scored together with one
+    sparse product.
+    """
+
+    def __init__(self, job_rows: List[Any], user_rows: List[Any], skill_rows: List[Any], trending_pool_size: int):
+        self.built_at = datetime.utcnow()
+        self.job_ids: List[Any] = []
+        self.location_labels: List[Optional[str]] = []
+        self.terms: List[str] = []
+        self.term_index: Dict[str, int] = {}
+        titles, locations, remote, salary_max, view_counts, created = [], [], [], [], [], []
+        indptr, indices = [0], []
+        self._location_pool: Dict[str, List[int]] = {}
+
+        for row in job_rows:
+            position = len(self.job_ids)
+            self.job_ids.append(row.id)
+            titles.append((row.title or "").lower())
+            locations.append((row.location or "").lower())
+            self.location_labels.append(row.location)
+            remote.append(row.work_arrangement == "remote")
+            salary_max.append(float(row.salary_max) if row.salary_max is not None else np.nan)
+            view_counts.append(row.view_count or 0)
+            created.append(row.created_at.timestamp() if row.created_at else 0.0)
+            for place in {(row.location or "").lower(), (row.city or "").lower()} - {""}:
+                self._location_pool.setdefault(place, []).append(position)
+
+            terms = dict.fromkeys(
+                term.lower() for field in JOB_TERM_FIELDS for term in getattr(row, field) or [] if term
+            )
+            for term in terms:
+                term_id = self.term_index.get(term)
+                if term_id is None:
+                    term_id = self.term_index[term] = len(self.terms)
+                    self.terms.append(term)
+                indices.append(term_id)
+            indptr.append(len(indices))
+
+        self.row_of = {job_id: position for position, job_id in enumerate(self.job_ids)}
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(self.job_ids), len(self.terms))
+        )
+        # Column-major copy: the jobs carrying a term are one contiguous slice
+        self._postings = self.matrix.tocsc()
+        self.titles = np.array(titles, dtype=str)
+        self.locations = np.array(locations, dtype=str)
+        self.remote = np.array(remote, dtype=bool)
+        self.salary_max = np.array(salary_max, dtype=np.float64)
+        self.view_counts = np.array(view_counts, dtype=np.int64)
+        self.created = np.array(created, dtype=np.float64)
+        self._remote_rows = np.flatnonzero(self.remote)
+
+        recent = np.flatnonzero(self.created >= (self.built_at - TRENDING_WINDOW).timestamp())
+        self.trending = recent[np.argsort(-self.view_counts[recent], kind="stable")][:trending_pool_size]
+
+        skills_by_user: Dict[Any, List[str]] = {}
+        for user_id, skill_name in skill_rows:
+            skills_by_user.setdefault(user_id, []).append(skill_name)
+        self.users: Dict[Any, UserVector] = {
+            row.user_id: UserVector(
+                skills_by_user.get(row.user_id, []),
+                self.term_index,
+                desired_title=row.desired_job_title,
+                location=row.location,
+                desired_salary_min=row.desired_salary_min
+            )
+            for row in user_rows
+        }
+        self._title_rows: Dict[str, np.ndarray] = {}
+        self._place_rows: Dict[str, np.ndarray] = {}
+
+    def rows_for(self, job_ids) -> np.ndarray:
+        return np.array([self.row_of[job_id] for job_id in job_ids if job_id in self.row_of], dtype=np.int64)
+
+    def term_rows(self, term_ids: np.ndarray) -> np.ndarray:
+        """Jobs carrying at least one of the terms."""
+        if not len(term_ids):
+            return np.empty(0, dtype=np.int64)
+        return np.unique(self._postings[:, term_ids].indices).astype(np.int64)
+
+    def title_rows(self, title: Optional[str]) -> np.ndarray:
+        """Jobs whose title contains the text (case-insensitive)."""
+        if not title:
+            return np.empty(0, dtype=np.int64)
+        key = title.lower()
+        rows = self._title_rows.get(key)
+        if rows is None:
+            rows = self._title_rows[key] = np.flatnonzero(np.char.find(self.titles, key) >= 0)
+        return rows
+
+    def location_rows(self, location: Optional[str], include_remote: bool = True) -> np.ndarray:
+        """Jobs whose location or city contains the text, plus remote jobs."""
+        if not location:
+            return np.empty(0, dtype=np.int64)
+        key = location.lower()
+        rows = self._place_rows.get(key)
+        if rows is None:
+            # Distinct places are far fewer than jobs, so substring matching runs over those
+            matched = [self._location_pool[place] for place in self._location_pool if key in place]
+            rows = self._place_rows[key] = np.unique(np.concatenate(matched)).astype(np.int64) if matched else np.empty(0, dtype=np.int64)
+        return np.union1d(rows, self._remote_rows) if include_remote else rows
+
+    def content_scores(self, rows: np.ndarray, user: UserVector) -> np.ndarray:
+        """Content-based score of each candidate row; same weights as the per-job formula."""
+        scores = np.zeros(len(rows), dtype=np.float64)
+        if not len(rows):
+            return scores
+
+        # Skills match (40% of score)
+        if user.skill_count and len(user.term_ids):
+            user_terms = np.zeros(len(self.terms), dtype=np.float32)
+            user_terms[user.term_ids] = 1.0
+            scores += (self.matrix[rows] @ user_terms).astype(np.float64) / user.skill_count * 0.4
+
+        # Title match (30% of score)
+        if user.desired_title:
+            scores += (np.char.find(self.titles[rows], user.desired_title.lower()) >= 0) * 0.3
+
+        # Salary match (20% of score)
+        if user.desired_salary_min:
+            with np.errstate(invalid="ignore"):
+                scores += (self.salary_max[rows] >= user.desired_salary_min) * 0.2
+
+        # Location match (10% of score)
+        if user.location:
+            scores += (self.remote[rows] | (np.char.find(self.locations[rows], user.location.lower()) >= 0)) * 0.1
+
+        # Rounded so equal matches tie exactly and fall back to recency
+        return np.minimum(scores.round(6), 1.0)
+
+    def matching_terms(self, row: int, user: UserVector) -> List[str]:
+        job_terms = self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]
+        return [self.terms[term_id] for term_id in np.intersect1d(job_terms, user.term_ids)]
+
+
+class RecommendationIndex:
+    """Holds the current RecommendationSnapshot and rebuilds it periodically off the request path."""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 refresh_interval: Optional[float] = None, trending_pool_size: Optional[int] = None):
+        self._session_factory = session_factory
+        self.refresh_interval = refresh_interval or settings.RECOMMENDATION_INDEX_REFRESH_SECONDS
+        self.trending_pool_size = trending_pool_size or settings.RECOMMENDATION_TRENDING_POOL_SIZE
+        self._snapshot: Optional[RecommendationSnapshot] = None
+        self._build_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.build_seconds = 0.0
+
+    def snapshot(self) -> RecommendationSnapshot:
+        """Current snapshot, built on first use if the background refresh has not run yet."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._build_lock:
+                if self._snapshot is None:
+                    self._build()
+            snapshot = self._snapshot
+        return snapshot
+
+    def refresh(self) -> None:
+        with self._build_lock:
+            self._build()
+
+    def _build(self) -> None:
+        started = time.monotonic()
+        db = self._session_factory()
+        try:
+            job_rows = db.query(
+                Job.id, Job.title, Job.location, Job.city, Job.work_arrangement,
+                Job.salary_max, Job.view_count, Job.created_at,
+                *[getattr(Job, field) for field in JOB_TERM_FIELDS]
+            ).filter(Job.status == "active").yield_per(1000)
+            user_rows = db.query(
+                JobProfile.user_id, JobProfile.desired_job_title,
+                JobProfile.location, JobProfile.desired_salary_min
+            ).all()
+            skill_rows = db.query(JobProfile.user_id, Skill.name).join(
+                UserSkill, UserSkill.profile_id == JobProfile.id
+            ).join(Skill, Skill.id == UserSkill.skill_id).all()
+            snapshot = RecommendationSnapshot(job_rows, user_rows, skill_rows, self.trending_pool_size)
+        finally:
+            db.close()
+        # Swapped in whole, so readers never see a half-built snapshot
+        self._snapshot = snapshot
+        self.build_seconds = time.monotonic() - started
+        logger.info(
+            f"Recommendation index built: {len(snapshot.job_ids)} jobs, {len(snapshot.terms)} terms, "
+            f"{len(snapshot.users)} profiles in {self.build_seconds:.2f}s"
+        )
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.refresh)
+            except Exception as e:
+                logger.error(f"Failed to rebuild recommendation index: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"built": False}
+        return {
+            "built": True,
+            "built_at": snapshot.built_at.isoformat(),
+            "jobs": len(snapshot.job_ids),
+            "terms": len(snapshot.terms),
+            "profiles": len(snapshot.users),
+            "build_seconds": round(self.build_seconds, 3)
+        }
+
+
+# Process-wide index refreshed by the app lifecycle hooks
+recommendation_index = RecommendationIndex()
@@ -1,5 +1,6 @@
 # File: job-service/src/services/recommendation_service.py
 
+from fastapi import HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc, func, and_, or_
 from typing import List, Dict, Any, Optional, Tuple
@@ -7,43 +8,68 @@ from ..models.job_models import Job, JobView, SavedJob
 from ..models.profile_models import JobProfile, UserSkill, UserLanguage
 from ..models.recommendation_models import JobRecommendation, UserJobPreferences, RecommendationAlgorithm
 from ..repositories.job_repository import JobRepository
-from ..utils.auth_utils import get_user_from_token
+from .recommendation_index import RecommendationSnapshot, UserVector, recommendation_index
+from .job_similarity import SAVE_WEIGHT, VIEW_WEIGHT, job_similarity_index
 from datetime import datetime, timedelta
+import numpy as np
 import logging
 import math
 
 logger = logging.getLogger(__name__)
 
+# Saves and views (each) whose neighbours are merged for collaborative filtering
+RECENT_INTERACTIONS = 50
+
 class RecommendationService:
     def __init__(self):
         self.job_repo = JobRepository()
     
     def get_job_recommendations(self, db: Session, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get personalized job recommendations for user."""
+        """Get personalized job recommendations for user; recent jobs for users with nothing to go on."""
         try:
-            # Get user profile and preferences
-            user_profile = self._get_user_profile(db, user_id)
-            user_preferences = self._get_user_preferences(db, user_id)
+            snapshot = recommendation_index.snapshot()
+            user = snapshot.users.get(user_id)
+            if user is None:
+                # Profiles created since the last index build
+                user_profile = self._get_user_profile(db, user_id)
+                user = UserVector.from_profile(user_profile, snapshot.term_index) if user_profile else None
+            
+            # Most recent first; the head of each list feeds collaborative filtering
+            viewed_job_ids = [
+                job_id for (job_id,) in db.query(JobView.job_id).filter(
+                    JobView.user_id == user_id
+                ).order_by(desc(JobView.viewed_at))
+            ]
+            saved_job_ids = [
+                job_id for (job_id,) in db.query(SavedJob.job_id).filter(
+                    SavedJob.user_id == user_id
+                ).order_by(desc(SavedJob.saved_at))
+            ]
+            viewed_rows = snapshot.rows_for(viewed_job_ids)
             
             # Generate recommendations using different algorithms
             recommendations = []
             
             # 1. Content-based recommendations (40% weight)
-            content_based = self._get_content_based_recommendations(db, user_id, user_profile, limit=limit//2)
+            content_based = self._get_content_based_recommendations(snapshot, user, viewed_rows, limit=limit//2)
             recommendations.extend(content_based)
             
             # 2. Collaborative filtering (30% weight)
-            collaborative = self._get_collaborative_recommendations(db, user_id, limit=limit//3)
+            collaborative = self._get_collaborative_recommendations(viewed_job_ids, saved_job_ids, limit=limit//3)
             recommendations.extend(collaborative)
             
             # 3. Location-based recommendations (20% weight)
-            location_based = self._get_location_based_recommendations(db, user_id, user_profile, limit=limit//4)
+            location_based = self._get_location_based_recommendations(snapshot, user, viewed_rows, limit=limit//4)
             recommendations.extend(location_based)
             
             # 4. Recent/trending jobs (10% weight)
-            trending = self._get_trending_recommendations(db, limit=limit//5)
+            trending = self._get_trending_recommendations(snapshot, limit=limit//5)
             recommendations.extend(trending)
             
+            if not recommendations:
+                # No profile, saves or views yet, and no index built
+                return self._get_fallback_recommendations(db, limit)
+            
             # Remove duplicates and sort by score
             unique_recommendations = self._deduplicate_and_rank(recommendations)
             
@@ -55,15 +81,15 @@ class RecommendationService:
             
         except Exception as e:
             logger.error(f"Error generating recommendations for user {user_id}: {str(e)}")
-            # Fallback to recent jobs
-            return self._get_fallback_recommendations(db, limit)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate recommendations"
+            )
     
     def _get_user_profile(self, db: Session, user_id: int) -> Optional[JobProfile]:
         """Get user's job profile."""
         return db.query(JobProfile).options(
-            joinedload(JobProfile.skills).joinedload(UserSkill.skill),
-            joinedload(JobProfile.languages).joinedload(UserLanguage.language),
-            joinedload(JobProfile.work_experiences)
+            joinedload(JobProfile.skills).joinedload(UserSkill.skill)
         ).filter(JobProfile.user_id == user_id).first()
     
     def _get_user_preferences(self, db: Session, user_id: int) -> Optional[UserJobPreferences]:
@@ -72,199 +98,101 @@ class RecommendationService:
             UserJobPreferences.user_id == user_id
         ).first()
     
-    def _get_content_based_recommendations(self, db: Session, user_id: int, 
-                                         user_profile: Optional[JobProfile], limit: int) -> List[Dict[str, Any]]:
+    def _get_content_based_recommendations(self, snapshot: RecommendationSnapshot, user: Optional[UserVector],
+                                         viewed_rows: np.ndarray, limit: int) -> List[Dict[str, Any]]:
         """Generate content-based recommendations based on user profile."""
-        recommendations = []
-        
-        if not user_profile:
-            return recommendations
-        
-        # Get jobs based on user's skills
-        user_skills = [skill.skill.name for skill in user_profile.skills] if user_profile.skills else []
-        
-        # Get jobs based on desired job title
-        desired_titles = [user_profile.desired_job_title] if user_profile.desired_job_title else []
+        if not user or limit <= 0:
+            return []
         
-        # Build query
-        query = db.query(Job).filter(Job.status == "active")
-        
-        # Filter by skills (tags contain user skills)
-        if user_skills:
-            for skill in user_skills[:3]:  # Top 3 skills
-                query = query.filter(Job.tags.contains([skill]))
-        
-        # Filter by desired job titles
-        if desired_titles:
-            title_filters = [Job.title.ilike(f"%{title}%") for title in desired_titles]
-            query = query.filter(or_(*title_filters))
-        
-        # Filter by location preference
-        if user_profile.location:
-            query = query.filter(Job.location.ilike(f"%{user_profile.location}%"))
-        
-        # Filter by salary range
-        if user_profile.desired_salary_min:
-            query = query.filter(Job.salary_min >= user_profile.desired_salary_min)
-        if user_profile.desired_salary_max:
-            query = query.filter(Job.salary_max <= user_profile.desired_salary_max)
-        
-        # Exclude already viewed jobs
-        viewed_job_ids = db.query(JobView.job_id).filter(JobView.user_id == user_id).subquery()
-        query = query.filter(~Job.id.in_(viewed_job_ids))
+        # Candidate pool: jobs sharing a skill, matching the desired title or in the user's area
+        candidates = np.union1d(
+            np.union1d(snapshot.term_rows(user.term_ids), snapshot.title_rows(user.desired_title)),
+            snapshot.location_rows(user.location)
+        )
+        candidates = np.setdiff1d(candidates, viewed_rows, assume_unique=True)
         
-        jobs = query.order_by(desc(Job.created_at)).limit(limit).all()
+        scores = snapshot.content_scores(candidates, user)
+        # Best score first, newest first among equal scores
+        order = np.lexsort((-snapshot.created[candidates], -scores))
+        order = order[scores[order] > 0][:limit]
         
-        for job in jobs:
-            score = self._calculate_content_based_score(job, user_profile)
-            recommendations.append({
-                'job_id': job.id,
-                'score': score,
-                'algorithm': RecommendationAlgorithm.CONTENT_BASED,
-                'reason': self._generate_content_based_reason(job, user_profile)
-            })
-        
-        return recommendations
+        return [{
+            'job_id': snapshot.job_ids[candidates[i]],
+            'score': float(scores[i]),
+            'algorithm': RecommendationAlgorithm.CONTENT_BASED,
+            'reason': self._generate_content_based_reason(snapshot, candidates[i], user)
+        } for i in order]
     
-    def _get_collaborative_recommendations(self, db: Session, user_id: int, limit: int) -> List[Dict[str, Any]]:
-        """Generate collaborative filtering recommendations."""
-        recommendations = []
-        
-        # Find users with similar job viewing/saving patterns
-        user_saved_jobs = db.query(SavedJob.job_id).filter(SavedJob.user_id == user_id).subquery()
-        user_viewed_jobs = db.query(JobView.job_id).filter(JobView.user_id == user_id).subquery()
-        
-        # Find similar users who saved/viewed the same jobs
-        similar_users = db.query(SavedJob.user_id).filter(
-            SavedJob.job_id.in_(user_saved_jobs),
-            SavedJob.user_id != user_id
-        ).group_by(SavedJob.user_id).having(func.count(SavedJob.job_id) >= 2).all()
-        
-        if similar_users:
-            similar_user_ids = [user[0] for user in similar_users]
-            
-            # Get jobs that similar users saved but current user hasn't seen
-            recommended_jobs = db.query(Job).join(SavedJob).filter(
-                SavedJob.user_id.in_(similar_user_ids),
-                ~Job.id.in_(user_saved_jobs),
-                ~Job.id.in_(user_viewed_jobs),
-                Job.status == "active"
-            ).order_by(desc(Job.created_at)).limit(limit).all()
-            
-            for job in recommended_jobs:
-                score = 0.7  # Base collaborative score
-                recommendations.append({
-                    'job_id': job.id,
-                    'score': score,
-                    'algorithm': RecommendationAlgorithm.COLLABORATIVE,
-                    'reason': 'Users with similar interests also saved this job'
-                })
+    def _get_collaborative_recommendations(self, viewed_job_ids: List[Any], saved_job_ids: List[Any],
+                                         limit: int) -> List[Dict[str, Any]]:
+        """Generate collaborative filtering recommendations from jobs similar to the user's recent saves and views."""
+        if limit <= 0:
+            return []
+        
+        interactions = [(job_id, SAVE_WEIGHT) for job_id in saved_job_ids[:RECENT_INTERACTIONS]]
+        interactions += [(job_id, VIEW_WEIGHT) for job_id in dict.fromkeys(viewed_job_ids[:RECENT_INTERACTIONS])]
+        similar = job_similarity_index.similar_jobs(
+            interactions, exclude=set(viewed_job_ids) | set(saved_job_ids), limit=limit
+        )
+        if not similar:
+            return []
         
-        return recommendations
+        top_similarity = similar[0][1]
+        return [{
+            'job_id': job_id,
+            'score': 0.5 + 0.3 * similarity / top_similarity,  # Best neighbour scores 0.8
+            'algorithm': RecommendationAlgorithm.COLLABORATIVE,
+            'reason': 'Users with similar interests also saved or viewed this job'
+        } for job_id, similarity in similar]
     
-    def _get_location_based_recommendations(self, db: Session, user_id: int, 
-                                          user_profile: Optional[JobProfile], limit: int) -> List[Dict[str, Any]]:
+    def _get_location_based_recommendations(self, snapshot: RecommendationSnapshot, user: Optional[UserVector],
+                                          viewed_rows: np.ndarray, limit: int) -> List[Dict[str, Any]]:
         """Generate location-based recommendations."""
-        recommendations = []
-        
-        if not user_profile or not user_profile.location:
-            return recommendations
-        
-        # Get jobs in the same location or nearby
-        location_query = db.query(Job).filter(
-            Job.status == "active",
-            or_(
-                Job.location.ilike(f"%{user_profile.location}%"),
-                Job.city.ilike(f"%{user_profile.location}%"),
-                Job.is_remote == True
-            )
-        )
+        if not user or not user.location or limit <= 0:
+            return []
         
-        # Exclude already viewed jobs
-        viewed_job_ids = db.query(JobView.job_id).filter(JobView.user_id == user_id).subquery()
-        location_query = location_query.filter(~Job.id.in_(viewed_job_ids))
+        # Jobs in the same location or nearby, newest first
+        rows = np.setdiff1d(snapshot.location_rows(user.location), viewed_rows, assume_unique=True)
+        rows = rows[np.argsort(-snapshot.created[rows], kind="stable")][:limit]
         
-        jobs = location_query.order_by(desc(Job.created_at)).limit(limit).all()
-        
-        for job in jobs:
-            score = 0.6 if job.is_remote else 0.8  # Remote jobs get slightly lower score
-            recommendations.append({
-                'job_id': job.id,
-                'score': score,
-                'algorithm': RecommendationAlgorithm.LOCATION_BASED,
-                'reason': f'Located in your preferred area: {user_profile.location}'
-            })
-        
-        return recommendations
+        return [{
+            'job_id': snapshot.job_ids[row],
+            'score': 0.6 if snapshot.remote[row] else 0.8,  # Remote jobs get slightly lower score
+            'algorithm': RecommendationAlgorithm.LOCATION_BASED,
+            'reason': f'Located in your preferred area: {user.location}'
+        } for row in rows]
     
-    def _get_trending_recommendations(self, db: Session, limit: int) -> List[Dict[str, Any]]:
+    def _get_trending_recommendations(self, snapshot: RecommendationSnapshot, limit: int) -> List[Dict[str, Any]]:
         """Get trending/popular jobs."""
-        recommendations = []
+        # Jobs with high view counts posted in the last 7 days
+        cutoff = (datetime.utcnow() - timedelta(days=7)).timestamp()
+        rows = snapshot.trending[snapshot.created[snapshot.trending] >= cutoff][:limit]
         
-        # Get jobs with high view counts in the last 7 days
-        cutoff_date = datetime.utcnow() - timedelta(days=7)
-        trending_jobs = db.query(Job).filter(
-            Job.status == "active",
-            Job.created_at >= cutoff_date
-        ).order_by(desc(Job.view_count)).limit(limit).all()
-        
-        for job in trending_jobs:
-            score = min(0.5 + (job.view_count / 1000), 0.9)  # Score based on views
+        recommendations = []
+        for row in rows:
+            view_count = int(snapshot.view_counts[row])
             recommendations.append({
-                'job_id': job.id,
-                'score': score,
+                'job_id': snapshot.job_ids[row],
+                'score': min(0.5 + (view_count / 1000), 0.9),  # Score based on views
                 'algorithm': RecommendationAlgorithm.CONTENT_BASED,
-                'reason': f'Trending job with {job.view_count} views'
+                'reason': f'Trending job with {view_count} views'
             })
         
         return recommendations
     
-    def _calculate_content_based_score(self, job: Job, user_profile: JobProfile) -> float:
-        """Calculate content-based recommendation score."""
-        score = 0.0
-        
-        # Skills match (40% of score)
-        if user_profile.skills and job.tags:
-            user_skills = set(skill.skill.name.lower() for skill in user_profile.skills)
-            job_tags = set(tag.lower() for tag in job.tags)
-            skills_match = len(user_skills.intersection(job_tags)) / len(user_skills)
-            score += skills_match * 0.4
-        
-        # Title match (30% of score)
-        if user_profile.desired_job_title and job.title:
-            title_match = 1.0 if user_profile.desired_job_title.lower() in job.title.lower() else 0.0
-            score += title_match * 0.3
-        
-        # Salary match (20% of score)
-        if user_profile.desired_salary_min and job.salary_max:
-            if job.salary_max >= user_profile.desired_salary_min:
-                score += 0.2
-        
-        # Location match (10% of score)
-        if user_profile.location and (job.location or job.is_remote):
-            if job.is_remote or user_profile.location.lower() in (job.location or "").lower():
-                score += 0.1
-        
-        return min(score, 1.0)
-    
-    def _generate_content_based_reason(self, job: Job, user_profile: JobProfile) -> str:
+    def _generate_content_based_reason(self, snapshot: RecommendationSnapshot, row: int, user: UserVector) -> str:
         """Generate reason for content-based recommendation."""
         reasons = []
         
-        if user_profile.skills and job.tags:
-            user_skills = set(skill.skill.name.lower() for skill in user_profile.skills)
-            job_tags = set(tag.lower() for tag in job.tags)
-            matching_skills = user_skills.intersection(job_tags)
-            if matching_skills:
-                reasons.append(f"Matches your skills: {', '.join(list(matching_skills)[:2])}")
+        matching_skills = snapshot.matching_terms(row, user)
+        if matching_skills:
+            reasons.append(f"Matches your skills: {', '.join(matching_skills[:2])}")
         
-        if user_profile.desired_job_title and job.title:
-            if user_profile.desired_job_title.lower() in job.title.lower():
-                reasons.append(f"Matches your desired role: {user_profile.desired_job_title}")
+        if user.desired_title and user.desired_title.lower() in snapshot.titles[row]:
+            reasons.append(f"Matches your desired role: {user.desired_title}")
         
-        if user_profile.location and job.location:
-            if user_profile.location.lower() in job.location.lower():
-                reasons.append(f"Located in {job.location}")
+        if user.location and snapshot.locations[row] and user.location.lower() in snapshot.locations[row]:
+            reasons.append(f"Located in {snapshot.location_labels[row]}")
         
         return "; ".join(reasons) if reasons else "Recommended based on your profile"
     
@@ -308,13 +236,19 @@ class RecommendationService:
     
     def _format_recommendations(self, db: Session, recommendations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Format recommendations with job details."""
-        formatted = []
+        if not recommendations:
+            return []
         
-        for rec in recommendations:
-            job = db.query(Job).options(
+        # One IN query for all recommended jobs
+        jobs = {
+            job.id: job for job in db.query(Job).options(
                 joinedload(Job.company)
-            ).filter(Job.id == rec['job_id']).first()
-            
+            ).filter(Job.id.in_([rec['job_id'] for rec in recommendations]))
+        }
+        
+        formatted = []
+        for rec in recommendations:
+            job = jobs.get(rec['job_id'])
             if job:
                 formatted.append({
                     'job_id': job.id,
@@ -331,7 +265,7 @@ class RecommendationService:
         return formatted
     
     def _get_fallback_recommendations(self, db: Session, limit: int) -> List[Dict[str, Any]]:
-        """Fallback recommendations when personalization fails."""
+        """Recently posted jobs, for users without a profile or interactions."""
         jobs = db.query(Job).options(
             joinedload(Job.company)
         ).filter(
@@ -2,7 +2,7 @@
 
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, case, text
+from sqlalchemy import func, and_, or_, case, text, tuple_
 from typing import Dict, Any, Optional, List
 from ..repositories.profile_repository import ProfileRepository
 from ..models.schemas import (
@@ -11,12 +11,24 @@ from ..models.schemas import (
 )
 from ..models.profile_models import SalaryEntry
 from ..models.job_models import Job, Company
-from ..utils.auth_utils import get_user_from_token
+from ..database.database import uses_postgres
 from fastapi import HTTPException, status
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Percentiles reported by salary comparisons
+SALARY_PERCENTILES = (10, 25, 50, 75, 90)
+
+EXPERIENCE_BRACKETS = [
+    (0, 2, "0-2 years"),
+    (3, 5, "3-5 years"), 
+    (6, 10, "6-10 years"),
+    (11, 15, "11-15 years"),
+    (16, 100, "15+ years")
+]
+
 class SalaryService:
     def __init__(self):
         self.profile_repo = ProfileRepository()
@@ -29,28 +41,21 @@ class SalaryService:
             years_of_experience = comparison_request.years_of_experience
             industry = comparison_request.industry
             
-            # Get overall statistics
-            overall_stats = self._get_salary_statistics(db, job_title, location, years_of_experience, industry)
-            
-            # Get industry comparison
-            industry_comparison = self._get_industry_comparison(db, job_title, industry)
+            # Overall statistics and percentile ranking share one aggregate query
+            distribution = self._get_salary_distribution(db, job_title, location, years_of_experience, industry)
+            overall_stats = self._get_salary_statistics(distribution)
             
-            # Get experience level comparison
-            experience_comparison = self._get_experience_comparison(db, job_title, years_of_experience)
-            
-            # Get location comparison
-            location_comparison = self._get_location_comparison(db, job_title, location)
-            
-            # Get company size comparison
-            company_size_comparison = self._get_company_size_comparison(db, job_title)
+            # Industry, experience, location and company size breakdowns share one grouped scan
+            breakdowns = self._get_salary_breakdowns(db, job_title)
+            industry_comparison = self._get_industry_comparison(breakdowns["industry"], industry)
+            experience_comparison = self._get_experience_comparison(breakdowns["experience_range"], years_of_experience)
+            location_comparison = self._get_location_comparison(breakdowns["location"], location)
+            company_size_comparison = self._get_company_size_comparison(breakdowns["company_size"])
             
             # Get similar roles comparison
             similar_roles = self._get_similar_roles_comparison(db, job_title)
             
-            # Calculate percentile ranking
-            percentile_ranking = self._calculate_percentile_ranking(
-                db, job_title, years_of_experience, industry, location
-            )
+            percentile_ranking = self._calculate_percentile_ranking(distribution)
             
             return {
                 "job_title": job_title,
@@ -76,37 +81,74 @@ class SalaryService:
                 detail="Failed to compare salary"
             )
     
-    def _get_salary_statistics(self, db: Session, job_title: str, location: str = None, 
-                             years_of_experience: int = None, industry: str = None) -> Dict[str, Any]:
-        """Get comprehensive salary statistics."""
-        base_query = db.query(SalaryEntry).filter(
+    def _salary_filters(self, job_title: str) -> list:
+        """Filters shared by every comparison query for a job title."""
+        return [
             SalaryEntry.job_title.ilike(f"%{job_title}%"),
             SalaryEntry.is_anonymous == True,
             SalaryEntry.annual_salary > 0
-        )
+        ]
+    
+    def _get_salary_distribution(self, db: Session, job_title: str, location: str = None,
+                                 years_of_experience: int = None, industry: str = None) -> Dict[str, Any]:
+        """
+        Count, average, range and percentiles of matching salaries.
         
-        # Apply filters
+        On PostgreSQL everything comes from one aggregate query using percentile_cont;
+        elsewhere only the salary column is fetched and numpy interpolates the same way.
+        """
+        filters = self._salary_filters(job_title)
         if location:
-            base_query = base_query.filter(SalaryEntry.location.ilike(f"%{location}%"))
+            filters.append(SalaryEntry.location.ilike(f"%{location}%"))
         if years_of_experience is not None:
-            base_query = base_query.filter(
+            filters.append(
                 SalaryEntry.years_of_experience.between(
                     max(0, years_of_experience - 2),
                     years_of_experience + 2
                 )
             )
         if industry:
-            base_query = base_query.filter(SalaryEntry.industry.ilike(f"%{industry}%"))
+            filters.append(SalaryEntry.industry.ilike(f"%{industry}%"))
         
-        # Get aggregated stats
-        stats = base_query.with_entities(
-            func.count(SalaryEntry.id).label('total_entries'),
-            func.avg(SalaryEntry.annual_salary).label('avg_salary'),
-            func.min(SalaryEntry.annual_salary).label('min_salary'),
-            func.max(SalaryEntry.annual_salary).label('max_salary')
-        ).first()
+        if uses_postgres(db):
+            percentile_columns = [
+                func.percentile_cont(p / 100).within_group(SalaryEntry.annual_salary).label(f"p{p}")
+                for p in SALARY_PERCENTILES
+            ]
+            stats = db.query(
+                func.count(SalaryEntry.id).label('total_entries'),
+                func.avg(SalaryEntry.annual_salary).label('avg_salary'),
+                func.min(SalaryEntry.annual_salary).label('min_salary'),
+                func.max(SalaryEntry.annual_salary).label('max_salary'),
+                *percentile_columns
+            ).filter(*filters).one()
+            if not stats.total_entries:
+                return {"total_entries": 0}
+            return {
+                "total_entries": stats.total_entries,
+                "average_salary": float(stats.avg_salary),
+                "min_salary": float(stats.min_salary),
+                "max_salary": float(stats.max_salary),
+                "percentiles": {p: float(getattr(stats, f"p{p}")) for p in SALARY_PERCENTILES}
+            }
         
-        if not stats or not stats.total_entries:
+        salaries = np.fromiter(
+            (row.annual_salary for row in db.query(SalaryEntry.annual_salary).filter(*filters)),
+            dtype=float
+        )
+        if not salaries.size:
+            return {"total_entries": 0}
+        return {
+            "total_entries": int(salaries.size),
+            "average_salary": float(salaries.mean()),
+            "min_salary": float(salaries.min()),
+            "max_salary": float(salaries.max()),
+            "percentiles": dict(zip(SALARY_PERCENTILES, np.percentile(salaries, SALARY_PERCENTILES).tolist()))
+        }
+    
+    def _get_salary_statistics(self, distribution: Dict[str, Any]) -> Dict[str, Any]:
+        """Get comprehensive salary statistics."""
+        if not distribution["total_entries"]:
             return {
                 "total_entries": 0,
                 "average_salary": 0,
@@ -118,164 +160,159 @@ class SalaryService:
                 "currency": "USD"
             }
         
-        # Get percentiles
-        salaries = [entry.annual_salary for entry in base_query.all()]
-        salaries.sort()
-        n = len(salaries)
-        
-        percentile_25 = salaries[n // 4] if n >= 4 else salaries[0]
-        median_salary = salaries[n // 2] if n % 2 == 1 else (salaries[n // 2 - 1] + salaries[n // 2]) / 2
-        percentile_75 = salaries[3 * n // 4] if n >= 4 else salaries[-1]
-        
+        percentiles = distribution["percentiles"]
         return {
-            "total_entries": stats.total_entries,
-            "average_salary": round(stats.avg_salary or 0, 2),
-            "median_salary": round(median_salary, 2),
-            "min_salary": round(stats.min_salary or 0, 2),
-            "max_salary": round(stats.max_salary or 0, 2),
-            "percentile_25": round(percentile_25, 2),
-            "percentile_75": round(percentile_75, 2),
+            "total_entries": distribution["total_entries"],
+            "average_salary": round(distribution["average_salary"], 2),
+            "median_salary": round(percentiles[50], 2),
+            "min_salary": round(distribution["min_salary"], 2),
+            "max_salary": round(distribution["max_salary"], 2),
+            "percentile_25": round(percentiles[25], 2),
+            "percentile_75": round(percentiles[75], 2),
             "currency": "USD"
         }
     
-    def _get_industry_comparison(self, db: Session, job_title: str, user_industry: str = None) -> List[Dict[str, Any]]:
-        """Get salary comparison across different industries."""
-        industry_stats = db.query(
-            SalaryEntry.industry,
+    def _get_salary_breakdowns(self, db: Session, job_title: str) -> Dict[str, Dict[Any, Dict[str, Any]]]:
+        """
+        Salary stats per industry, experience bracket, location and company size.
+        
+        On Postgres one GROUPING SETS query returns just the per-dimension groups;
+        elsewhere each dimension is grouped by its own query.
+        """
+        experience_range = case(
+            *[
+                (SalaryEntry.years_of_experience.between(min_exp, max_exp), label)
+                for min_exp, max_exp, label in EXPERIENCE_BRACKETS
+            ],
+            else_=None
+        )
+        dimensions = {
+            "industry": SalaryEntry.industry,
+            "experience_range": experience_range,
+            "location": SalaryEntry.location,
+            "company_size": SalaryEntry.company_size
+        }
+        aggregates = [
             func.count(SalaryEntry.id).label('count'),
-            func.avg(SalaryEntry.annual_salary).label('avg_salary'),
+            func.avg(SalaryEntry.annual_salary).label('average_salary'),
             func.min(SalaryEntry.annual_salary).label('min_salary'),
             func.max(SalaryEntry.annual_salary).label('max_salary')
-        ).filter(
-            SalaryEntry.job_title.ilike(f"%{job_title}%"),
-            SalaryEntry.is_anonymous == True,
-            SalaryEntry.industry.isnot(None),
-            SalaryEntry.annual_salary > 0
-        ).group_by(
-            SalaryEntry.industry
-        ).having(
-            func.count(SalaryEntry.id) >= 2
-        ).order_by(
-            func.avg(SalaryEntry.annual_salary).desc()
-        ).all()
+        ]
         
+        if uses_postgres(db):
+            # GROUPING(column) is 0 only in the set grouped by that column
+            dimension = case(
+                *[(func.grouping(column) == 0, name) for name, column in dimensions.items()]
+            )
+            rows = db.query(
+                dimension.label('dimension'),
+                *[column.label(name) for name, column in dimensions.items()],
+                *aggregates
+            ).filter(
+                *self._salary_filters(job_title)
+            ).group_by(
+                func.grouping_sets(*[tuple_(column) for column in dimensions.values()])
+            ).having(
+                func.count(SalaryEntry.id) >= 2
+            ).all()
+            grouped = [(row.dimension, getattr(row, row.dimension), row) for row in rows]
+        else:
+            grouped = []
+            for name, column in dimensions.items():
+                rows = db.query(
+                    column.label(name),
+                    *aggregates
+                ).filter(
+                    *self._salary_filters(job_title)
+                ).group_by(
+                    column
+                ).having(
+                    func.count(SalaryEntry.id) >= 2
+                ).all()
+                grouped.extend((name, getattr(row, name), row) for row in rows)
+        
+        breakdowns = {name: {} for name in dimensions}
+        for name, value, row in grouped:
+            if value is None:
+                continue
+            breakdowns[name][value] = {
+                "count": row.count,
+                "average_salary": float(row.average_salary),
+                "min_salary": float(row.min_salary),
+                "max_salary": float(row.max_salary)
+            }
+        return breakdowns
+    
+    @staticmethod
+    def _by_average_salary(groups: Dict[Any, Dict[str, Any]]) -> List[tuple]:
+        return sorted(groups.items(), key=lambda item: item[1]["average_salary"], reverse=True)
+    
+    def _get_industry_comparison(self, industry_stats: Dict[str, Dict[str, Any]], user_industry: str = None) -> List[Dict[str, Any]]:
+        """Get salary comparison across different industries."""
         result = []
-        for stat in industry_stats:
-            is_user_industry = user_industry and stat.industry.lower() == user_industry.lower()
+        for industry, stat in self._by_average_salary(industry_stats):
+            is_user_industry = user_industry and industry.lower() == user_industry.lower()
             result.append({
-                "industry": stat.industry,
-                "count": stat.count,
-                "average_salary": round(stat.avg_salary, 2),
-                "min_salary": round(stat.min_salary, 2),
-                "max_salary": round(stat.max_salary, 2),
+                "industry": industry,
+                "count": stat["count"],
+                "average_salary": round(stat["average_salary"], 2),
+                "min_salary": round(stat["min_salary"], 2),
+                "max_salary": round(stat["max_salary"], 2),
                 "is_user_industry": is_user_industry
             })
         
         return result
     
-    def _get_experience_comparison(self, db: Session, job_title: str, user_experience: int = None) -> List[Dict[str, Any]]:
+    def _get_experience_comparison(self, experience_stats: Dict[str, Dict[str, Any]], user_experience: int = None) -> List[Dict[str, Any]]:
         """Get salary comparison across experience levels."""
-        experience_brackets = [
-            (0, 2, "0-2 years"),
-            (3, 5, "3-5 years"), 
-            (6, 10, "6-10 years"),
-            (11, 15, "11-15 years"),
-            (16, 100, "15+ years")
-        ]
-        
         result = []
-        for min_exp, max_exp, label in experience_brackets:
-            stats = db.query(
-                func.count(SalaryEntry.id).label('count'),
-                func.avg(SalaryEntry.annual_salary).label('avg_salary'),
-                func.min(SalaryEntry.annual_salary).label('min_salary'),
-                func.max(SalaryEntry.annual_salary).label('max_salary')
-            ).filter(
-                SalaryEntry.job_title.ilike(f"%{job_title}%"),
-                SalaryEntry.is_anonymous == True,
-                SalaryEntry.years_of_experience.between(min_exp, max_exp),
-                SalaryEntry.annual_salary > 0
-            ).first()
+        for min_exp, max_exp, label in EXPERIENCE_BRACKETS:
+            stat = experience_stats.get(label)
+            if stat is None:
+                continue
             
-            if stats and stats.count and stats.count >= 2:
-                is_user_bracket = (user_experience is not None and 
-                                 min_exp <= user_experience <= max_exp)
-                
-                result.append({
-                    "experience_range": label,
-                    "min_years": min_exp,
-                    "max_years": max_exp,
-                    "count": stats.count,
-                    "average_salary": round(stats.avg_salary, 2),
-                    "min_salary": round(stats.min_salary, 2),
-                    "max_salary": round(stats.max_salary, 2),
-                    "is_user_bracket": is_user_bracket
-                })
+            is_user_bracket = (user_experience is not None and 
+                             min_exp <= user_experience <= max_exp)
+            
+            result.append({
+                "experience_range": label,
+                "min_years": min_exp,
+                "max_years": max_exp,
+                "count": stat["count"],
+                "average_salary": round(stat["average_salary"], 2),
+                "min_salary": round(stat["min_salary"], 2),
+                "max_salary": round(stat["max_salary"], 2),
+                "is_user_bracket": is_user_bracket
+            })
         
         return result
     
-    def _get_location_comparison(self, db: Session, job_title: str, user_location: str = None) -> List[Dict[str, Any]]:
+    def _get_location_comparison(self, location_stats: Dict[str, Dict[str, Any]], user_location: str = None) -> List[Dict[str, Any]]:
         """Get salary comparison across locations."""
-        location_stats = db.query(
-            SalaryEntry.location,
-            func.count(SalaryEntry.id).label('count'),
-            func.avg(SalaryEntry.annual_salary).label('avg_salary'),
-            func.min(SalaryEntry.annual_salary).label('min_salary'),
-            func.max(SalaryEntry.annual_salary).label('max_salary')
-        ).filter(
-            SalaryEntry.job_title.ilike(f"%{job_title}%"),
-            SalaryEntry.is_anonymous == True,
-            SalaryEntry.location.isnot(None),
-            SalaryEntry.annual_salary > 0
-        ).group_by(
-            SalaryEntry.location
-        ).having(
-            func.count(SalaryEntry.id) >= 2
-        ).order_by(
-            func.avg(SalaryEntry.annual_salary).desc()
-        ).limit(10).all()
-        
         result = []
-        for stat in location_stats:
+        for location, stat in self._by_average_salary(location_stats)[:10]:
             is_user_location = (user_location and 
-                              user_location.lower() in stat.location.lower())
+                              user_location.lower() in location.lower())
             
             result.append({
-                "location": stat.location,
-                "count": stat.count,
-                "average_salary": round(stat.avg_salary, 2),
-                "min_salary": round(stat.min_salary, 2),
-                "max_salary": round(stat.max_salary, 2),
+                "location": location,
+                "count": stat["count"],
+                "average_salary": round(stat["average_salary"], 2),
+                "min_salary": round(stat["min_salary"], 2),
+                "max_salary": round(stat["max_salary"], 2),
                 "is_user_location": is_user_location
             })
         
         return result
     
-    def _get_company_size_comparison(self, db: Session, job_title: str) -> List[Dict[str, Any]]:
+    def _get_company_size_comparison(self, size_stats: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Get salary comparison across company sizes."""
-        size_stats = db.query(
-            SalaryEntry.company_size,
-            func.count(SalaryEntry.id).label('count'),
-            func.avg(SalaryEntry.annual_salary).label('avg_salary')
-        ).filter(
-            SalaryEntry.job_title.ilike(f"%{job_title}%"),
-            SalaryEntry.is_anonymous == True,
-            SalaryEntry.company_size.isnot(None),
-            SalaryEntry.annual_salary > 0
-        ).group_by(
-            SalaryEntry.company_size
-        ).having(
-            func.count(SalaryEntry.id) >= 2
-        ).order_by(
-            func.avg(SalaryEntry.annual_salary).desc()
-        ).all()
-        
         result = []
-        for stat in size_stats:
+        for company_size, stat in self._by_average_salary(size_stats):
             result.append({
-                "company_size": stat.company_size,
-                "count": stat.count,
-                "average_salary": round(stat.avg_salary, 2)
+                "company_size": company_size,
+                "count": stat["count"],
+                "average_salary": round(stat["average_salary"], 2)
             })
         
         return result
@@ -315,48 +352,20 @@ class SalaryService:
         
         return result
     
-    def _calculate_percentile_ranking(self, db: Session, job_title: str, 
-                                    years_of_experience: int = None, 
-                                    industry: str = None, 
-                                    location: str = None) -> Dict[str, Any]:
+    def _calculate_percentile_ranking(self, distribution: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate percentile ranking information."""
-        base_query = db.query(SalaryEntry).filter(
-            SalaryEntry.job_title.ilike(f"%{job_title}%"),
-            SalaryEntry.is_anonymous == True,
-            SalaryEntry.annual_salary > 0
-        )
-        
-        # Apply context filters
-        if years_of_experience is not None:
-            base_query = base_query.filter(
-                SalaryEntry.years_of_experience.between(
-                    max(0, years_of_experience - 2),
-                    years_of_experience + 2
-                )
-            )
-        
-        if industry:
-            base_query = base_query.filter(SalaryEntry.industry.ilike(f"%{industry}%"))
-        
-        if location:
-            base_query = base_query.filter(SalaryEntry.location.ilike(f"%{location}%"))
-        
-        salaries = [entry.annual_salary for entry in base_query.all()]
-        
-        if len(salaries) < 5:
+        if distribution["total_entries"] < 5:
             return {"message": "Insufficient data for percentile calculation"}
         
-        salaries.sort()
-        n = len(salaries)
-        
+        percentiles = distribution["percentiles"]
         return {
-            "total_sample_size": n,
+            "total_sample_size": distribution["total_entries"],
             "percentiles": {
-                "10th": round(salaries[n // 10] if n >= 10 else salaries[0], 2),
-                "25th": round(salaries[n // 4] if n >= 4 else salaries[0], 2),
-                "50th": round(salaries[n // 2] if n % 2 == 1 else (salaries[n // 2 - 1] + salaries[n // 2]) / 2, 2),
-                "75th": round(salaries[3 * n // 4] if n >= 4 else salaries[-1], 2),
-                "90th": round(salaries[9 * n // 10] if n >= 10 else salaries[-1], 2)
+                "10th": round(percentiles[10], 2),
+                "25th": round(percentiles[25], 2),
+                "50th": round(percentiles[50], 2),
+                "75th": round(percentiles[75], 2),
+                "90th": round(percentiles[90], 2)
             }
         }
     
@@ -397,10 +406,10 @@ class SalaryService:
         
         return recommendations
     
-    def add_salary_data(self, db: Session, user_token: str, salary_data: SalaryEntryCreate) -> SalaryEntryResponse:
+    def add_salary_data(self, db: Session, current_user: Dict[str, Any], salary_data: SalaryEntryCreate) -> SalaryEntryResponse:
         """Add salary data for comparison."""
         try:
-            user_info = get_user_from_token(user_token)
+            user_info = current_user
             user_id = user_info["user_id"]
             
             profile = self.profile_repo.get_profile_by_user_id(db, user_id)
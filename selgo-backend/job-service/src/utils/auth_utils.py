@@ -1,37 +1,18 @@
 # job-service/src/utils/auth_utils.py
-import httpx
 from typing import Dict, Any, Optional
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from ..config.config import settings
+from .auth_client import auth_client
 import logging
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 async def validate_token_with_auth_service(token: str) -> Dict[str, Any]:
-    """Validate token with auth service."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://localhost:8001/api/v1/auth/validate",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token"
-                )
-                
-    except httpx.RequestError as e:
-        logger.error(f"Auth service connection error: {str(e)}")
-        # Fallback to mock for development
-        return get_mock_user()
-    except Exception as e:
-        logger.error(f"Token validation error: {str(e)}")
-        return get_mock_user()
+    """Validate token with auth service through the shared pooled, cached client."""
+    return await auth_client.validate_token(token)
 
 def get_mock_user() -> Dict[str, Any]:
     """Mock user for development."""
@@ -45,35 +26,36 @@ def get_mock_user() -> Dict[str, Any]:
 
 def get_user_from_token(token: str) -> Dict[str, Any]:
     """
-    Extract user information from token.
-    For development, this uses mock data.
-    In production, this would validate with the auth service.
+    Extract user information from a token without a network call.
+    With AUTH_VALIDATION_ENABLED the token must have been validated recently
+    (it is read from the validation cache) and a miss is rejected; otherwise
+    the development mock user is returned. Routes should prefer passing the
+    current_user dependency to services.
     """
-    try:
-        # For development, return mock user
-        # In production, uncomment the line below:
-        # return await validate_token_with_auth_service(token)
-        return get_mock_user()
-    except Exception as e:
-        logger.error(f"Error getting user from token: {str(e)}")
+    if not settings.AUTH_VALIDATION_ENABLED:
         return get_mock_user()
+    user_data = auth_client.cached_user(token)
+    if user_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_data
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """Get current user from authorization header."""
-    try:
-        token = credentials.credentials
-        # For production, use: return await validate_token_with_auth_service(token)
-        return get_user_from_token(token)
-    except Exception as e:
-        logger.error(f"Error getting current user: {str(e)}")
+    if not settings.AUTH_VALIDATION_ENABLED:
         return get_mock_user()
+    return await validate_token_with_auth_service(credentials.credentials)
 
-def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Optional[Dict[str, Any]]:
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)) -> Optional[Dict[str, Any]]:
     """Get current user if token is provided, otherwise return None."""
     if not credentials:
         return None
-    
+    if not settings.AUTH_VALIDATION_ENABLED:
+        return get_mock_user()
     try:
-        return get_user_from_token(credentials.credentials)
-    except:
-        return None
\ No newline at end of file
+        return await validate_token_with_auth_service(credentials.credentials)
+    except HTTPException:
+        return None
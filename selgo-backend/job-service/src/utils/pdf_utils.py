@@ -1,98 +1,112 @@
 # File: job-service/src/utils/pdf_utils.py
 
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 from jinja2 import Template, Environment, FileSystemLoader
 import os
+import json
+import hashlib
 from ..config.config import settings
-from ..models.schemas import CVBuilderData
 import logging
 
 logger = logging.getLogger(__name__)
 
-def generate_cv_pdf(cv_id: int, cv_data: CVBuilderData) -> Tuple[str, int]:
-    """Generate PDF from CV builder data."""
+CV_TEMPLATE_DIR = "templates"
+CV_TEMPLATE_NAME = "cv_template.html"
+
+# Compiled CV template of this process: (file mtime, template, source digest)
+_template_cache: Dict[str, Tuple[float, Template, str]] = {}
+
+def _cv_template() -> Tuple[Template, str]:
+    """Compiled CV template and the digest of its source; recompiled only when the file changes."""
+    template_file = os.path.join(CV_TEMPLATE_DIR, CV_TEMPLATE_NAME)
+    try:
+        mtime = os.path.getmtime(template_file)
+    except OSError:
+        os.makedirs(CV_TEMPLATE_DIR, exist_ok=True)
+        with open(template_file, 'w') as f:
+            f.write(create_cv_template_html())
+        mtime = os.path.getmtime(template_file)
+    
+    cached = _template_cache.get(template_file)
+    if cached and cached[0] == mtime:
+        return cached[1], cached[2]
+    
+    with open(template_file, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    template = Environment(loader=FileSystemLoader(CV_TEMPLATE_DIR)).get_template(CV_TEMPLATE_NAME)
+    _template_cache[template_file] = (mtime, template, digest)
+    return template, digest
+
+def cv_content_hash(cv_data: Dict[str, Any]) -> str:
+    """Hash of the CV data and the template it renders with; equal hashes render identical PDFs."""
+    _, template_digest = _cv_template()
+    payload = json.dumps(cv_data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{template_digest}:{payload}".encode()).hexdigest()
+
+def rendered_cv_file(content_hash: str) -> Optional[Tuple[str, int]]:
+    """
+    Path and size of an already rendered CV PDF, if there is one.
+    
+    Plain-text fallbacks are not renders: a CV that only has one is rendered
+    again, so it gets its PDF once WeasyPrint works.
+    """
+    pdf_path = os.path.join(settings.UPLOAD_DIR, "cvs", f"cv_{content_hash}.pdf")
+    if os.path.exists(pdf_path):
+        return pdf_path, os.path.getsize(pdf_path)
+    return None
+
+def render_cv_pdf(cv_data: Dict[str, Any], content_hash: str) -> Tuple[str, int]:
+    """
+    Render serialized CV builder data to cvs/cv_<content_hash>.pdf.
+    
+    Runs in the CV render worker processes. Output is named after the content
+    hash, so a CV that was rendered before is returned without rendering again.
+    """
+    rendered = rendered_cv_file(content_hash)
+    if rendered:
+        return rendered
+    
+    pdf_dir = os.path.join(settings.UPLOAD_DIR, "cvs")
+    os.makedirs(pdf_dir, exist_ok=True)
+    
     try:
-        # Check if WeasyPrint is available
-        try:
-            from weasyprint import HTML, CSS
-        except ImportError:
-            logger.warning("WeasyPrint not installed. Skipping PDF generation.")
-            # Create a dummy file for now
-            pdf_dir = os.path.join(settings.UPLOAD_DIR, "cvs")
-            os.makedirs(pdf_dir, exist_ok=True)
-            pdf_filename = f"cv_{cv_id}.txt"
-            pdf_path = os.path.join(pdf_dir, pdf_filename)
-            
-            with open(pdf_path, 'w') as f:
-                f.write("CV PDF generation requires WeasyPrint installation")
-            
-            return pdf_path, os.path.getsize(pdf_path)
-        
-        # Ensure template directory exists
-        template_dir = "templates"
-        os.makedirs(template_dir, exist_ok=True)
-        
-        # Create template file if it doesn't exist
-        template_file = os.path.join(template_dir, "cv_template.html")
-        if not os.path.exists(template_file):
-            with open(template_file, 'w') as f:
-                f.write(create_cv_template_html())
+        from weasyprint import HTML
+    except (ImportError, OSError):  # OSError: installed without its system libraries (pango)
+        logger.warning("WeasyPrint not installed. Skipping PDF generation.")
+        return _write_cv_file(pdf_dir, content_hash, "txt", b"CV PDF generation requires WeasyPrint installation")
+    
+    template, _ = _cv_template()
+    html_content = template.render(cv_data=cv_data)
+    
+    try:
+        pdf = HTML(string=html_content).write_pdf()
+        pdf_path, file_size = _write_cv_file(pdf_dir, content_hash, "pdf", pdf)
+    except Exception as pdf_error:
+        logger.error(f"WeasyPrint PDF generation failed: {pdf_error}")
+        pdf_path, file_size = _write_cv_file(pdf_dir, content_hash, "txt", _cv_text(cv_data).encode('utf-8'))
+    
+    logger.info(f"PDF generated: {pdf_path} ({file_size} bytes)")
+    return pdf_path, file_size
+
+def _write_cv_file(pdf_dir: str, content_hash: str, extension: str, content: bytes) -> Tuple[str, int]:
+    """Write via a temporary file, so concurrent renders of the same CV never expose a partial file."""
+    pdf_path = os.path.join(pdf_dir, f"cv_{content_hash}.{extension}")
+    tmp_path = f"{pdf_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, pdf_path)
+    return pdf_path, len(content)
 
-        # Load HTML template
-        env = Environment(loader=FileSystemLoader(template_dir))
-        template = env.get_template("cv_template.html")
-        
-        # Render HTML with data
-        html_content = template.render(
-            cv_data=cv_data,
-            cv_id=cv_id
-        )
-        
-        # Ensure PDF directory exists
-        pdf_dir = os.path.join(settings.UPLOAD_DIR, "cvs")
-        os.makedirs(pdf_dir, exist_ok=True)
-        
-        pdf_filename = f"cv_{cv_id}.pdf"
-        pdf_path = os.path.join(pdf_dir, pdf_filename)
-        
-        # Create PDF with proper error handling
-        try:
-            HTML(string=html_content).write_pdf(pdf_path)
-        except Exception as pdf_error:
-            logger.error(f"WeasyPrint PDF generation failed: {pdf_error}")
-            # Create a text file instead
-            pdf_filename = f"cv_{cv_id}.txt"
-            pdf_path = os.path.join(pdf_dir, pdf_filename)
-            with open(pdf_path, 'w', encoding='utf-8') as f:
-                f.write(f"CV Data for CV {cv_id}\n")
-                f.write("=" * 30 + "\n\n")
-                if cv_data.contact_info:
-                    f.write(f"Email: {cv_data.contact_info.email}\n")
-                    f.write(f"Phone: {cv_data.contact_info.phone}\n")
-                if cv_data.summary:
-                    f.write(f"\nSummary: {cv_data.summary.professional_summary}\n")
-        
-        # Get file size
-        file_size = os.path.getsize(pdf_path)
-        
-        logger.info(f"PDF generated: {pdf_path} ({file_size} bytes)")
-        return pdf_path, file_size
-        
-    except Exception as e:
-        logger.error(f"Error generating PDF: {str(e)}")
-        # Create a fallback text file
-        try:
-            pdf_dir = os.path.join(settings.UPLOAD_DIR, "cvs")
-            os.makedirs(pdf_dir, exist_ok=True)
-            pdf_filename = f"cv_{cv_id}_fallback.txt"
-            pdf_path = os.path.join(pdf_dir, pdf_filename)
-            
-            with open(pdf_path, 'w', encoding='utf-8') as f:
-                f.write(f"CV generation failed for CV {cv_id}")
-            
-            return pdf_path, os.path.getsize(pdf_path)
-        except:
-            raise Exception(f"Failed to generate PDF: {str(e)}")
+def _cv_text(cv_data: Dict[str, Any]) -> str:
+    contact_info = cv_data.get("contact_info") or {}
+    summary = cv_data.get("summary") or {}
+    lines = ["CV Data", "=" * 30, ""]
+    if contact_info:
+        lines.append(f"Email: {contact_info.get('email')}")
+        lines.append(f"Phone: {contact_info.get('phone')}")
+    if summary:
+        lines.append(f"\nSummary: {summary.get('professional_summary')}")
+    return "\n".join(lines) + "\n"
 
 def create_cv_template_html() -> str:
     """Create basic CV template HTML."""
@@ -0,0 +1,89 @@
+# File: job-service/src/utils/response_cache.py
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    """A response model serialized once, with the ETag of its body."""
+
+    def __init__(self, model: BaseModel, generation: int):
+        self.model = model
+        self.body = model.model_dump_json().encode()
+        self.etag = f'"{hashlib.sha1(self.body).hexdigest()}"'
+        self.generation = generation
+        self.created_at = time.monotonic()
+
+
+class ResponseCache:
+    """
+    In-process cache of read-mostly aggregate responses.
+
+    Entries are rebuilt when older than `ttl` or after invalidate(). While one
+    request rebuilds an entry, concurrent requests keep getting the previous
+    one instead of running the same aggregates. Invalidation is per process;
+    other workers catch up within the TTL.
+
+    Clients must revalidate every time (no-cache), so an invalidated entry is
+    never served from a browser or proxy cache; an unchanged one costs a 304.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, CachedResponse] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._generation = 0
+        self.hits = 0
+        self.builds = 0
+
+    def _fresh(self, entry: Optional[CachedResponse]) -> bool:
+        return (
+            entry is not None
+            and entry.generation == self._generation
+            and time.monotonic() - entry.created_at < self.ttl
+        )
+
+    def get(self, key: str, build: Callable[[], BaseModel]) -> CachedResponse:
+        entry = self._entries.get(key)
+        if self._fresh(entry):
+            self.hits += 1
+            return entry
+
+        lock = self._locks.setdefault(key, threading.Lock())
+        if entry is not None and not lock.acquire(blocking=False):
+            # Someone else is rebuilding; serve the previous snapshot meanwhile
+            self.hits += 1
+            return entry
+        if entry is None:
+            lock.acquire()
+        try:
+            entry = self._entries.get(key)
+            if self._fresh(entry):
+                return entry
+            generation = self._generation
+            entry = self._entries[key] = CachedResponse(build(), generation)
+            self.builds += 1
+            return entry
+        finally:
+            lock.release()
+
+    def invalidate(self) -> None:
+        """Mark every entry stale; the next request for it rebuilds it."""
+        self._generation += 1
+
+    def respond(self, request: Request, entry: CachedResponse) -> Response:
+        """JSON response for entry, or 304 when the client already has this version."""
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if entry.etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "builds": self.builds}
@@ -0,0 +1,183 @@
+# File: job-service/src/utils/view_counter.py
+
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime
+from ..config.config import settings
+from ..database.database import SessionLocal
+from ..models.job_models import Job, JobView
+from .view_dedup import create_view_deduplicator
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Failures caused by the rows themselves; retrying them cannot succeed
+VIEW_ROW_ERRORS = (DataError, IntegrityError)
+
+
+class ViewCounter:
+    """
+    Aggregates counted job views in memory and writes them periodically.
+
+    Each flush is one executemany UPDATE of jobs.view_count (one row per job,
+    however many views it received) plus one executemany INSERT of JobView
+    rows, in separate transactions so view rows cannot hold back the counts.
+    Views are recorded from request threads, hence the lock; a full buffer
+    wakes the background flusher rather than writing on the request.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 flush_interval: Optional[float] = None, max_pending: Optional[int] = None):
+        self._session_factory = session_factory
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else settings.VIEW_COUNT_FLUSH_INTERVAL_SECONDS
+        )
+        self.max_pending = max_pending or settings.VIEW_COUNT_MAX_PENDING
+        self._counts: Dict[Any, int] = {}
+        self._views: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_now: Optional[asyncio.Event] = None
+        self._flush_requested = False
+        self.dropped_views = 0
+
+    def record(self, job_id, user_id: Optional[int] = None, ip_address: Optional[str] = None) -> None:
+        with self._lock:
+            self._counts[job_id] = self._counts.get(job_id, 0) + 1
+            self._views.append({
+                "job_id": job_id,
+                "user_id": user_id,
+                "ip_address": ip_address,
+                "viewed_at": datetime.utcnow()
+            })
+            if len(self._views) > 2 * self.max_pending:
+                # The flusher is not running or cannot keep up: keep the counts, shed the oldest view rows
+                del self._views[0]
+                self.dropped_views += 1
+            loop = self._loop if self._task is not None else None
+            wake = loop is not None and len(self._views) >= self.max_pending and not self._flush_requested
+            if wake:
+                self._flush_requested = True
+        if wake:
+            loop.call_soon_threadsafe(self._flush_now.set)
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._flush_now = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # Every flush_interval, or as soon as record() finds the buffer full
+                await asyncio.wait_for(self._flush_now.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self._loop.run_in_executor(None, self.flush)
+
+    def flush(self) -> int:
+        """Write pending views; returns the number of jobs updated."""
+        with self._lock:
+            if not self._counts and not self._views:
+                return 0
+            counts, self._counts = self._counts, {}
+            views, self._views = self._views, []
+            self._flush_requested = False
+
+        updated = self._write_counts(counts) if counts else 0
+        if views:
+            self._write_views(views)
+        return updated
+
+    def _write_counts(self, counts: Dict[Any, int]) -> int:
+        db = self._session_factory()
+        try:
+            # Sorted so concurrent workers lock job rows in the same order
+            jobs = Job.__table__
+            db.execute(
+                update(jobs).where(jobs.c.id == bindparam("job_id")).values(
+                    view_count=jobs.c.view_count + bindparam("views")
+                ),
+                [{"job_id": job_id, "views": n} for job_id, n in sorted(counts.items(), key=lambda item: str(item[0]))]
+            )
+            db.commit()
+            return len(counts)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write view counts of {len(counts)} jobs: {e}")
+            # Keep the counts for the next flush
+            with self._lock:
+                for job_id, n in counts.items():
+                    self._counts[job_id] = self._counts.get(job_id, 0) + n
+            return 0
+        finally:
+            db.close()
+
+    def _write_views(self, views: List[Dict[str, Any]]) -> None:
+        db = self._session_factory()
+        try:
+            try:
+                db.execute(insert(JobView), views)
+                db.commit()
+                return
+            except VIEW_ROW_ERRORS:
+                db.rollback()
+            # One bad row fails the whole statement; write the rows one by one and drop the bad ones
+            for view in views:
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(JobView), [view])
+                except VIEW_ROW_ERRORS as e:
+                    logger.warning(f"Dropping view of job {view['job_id']}: {e}")
+                    with self._lock:
+                        self.dropped_views += 1
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write {len(views)} job views: {e}")
+            # Retried on the next flush; view rows are capped so an outage cannot grow memory unbounded
+            with self._lock:
+                self._views = (views + self._views)[-(self.max_pending // 2):]
+        finally:
+            db.close()
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending_views": len(self._views),
+                "pending_jobs": len(self._counts),
+                "dropped_views": self.dropped_views
+            }
+
+
+# "Seen in the last 24 h" answers without touching the job_views table
+view_deduplicator = create_view_deduplicator(
+    settings.VIEW_DEDUP_BACKEND,
+    window_seconds=settings.VIEW_DEDUP_WINDOW_HOURS * 3600,
+    expected_views=settings.VIEW_DEDUP_EXPECTED_VIEWS,
+    error_rate=settings.VIEW_DEDUP_ERROR_RATE,
+    redis_url=settings.REDIS_URL
+)
+
+# Process-wide counter started and drained by the app lifecycle hooks
+view_counter = ViewCounter()
@@ -0,0 +1,122 @@
+# File: job-service/src/utils/view_dedup.py
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import hashlib
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+except ImportError:  # redis is only required for the shared de-duplicator
+    redis = None
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over a bytearray using double hashing."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str) -> None:
+        self.count += 1
+        for p in self._positions(key):
+            self._bits[p >> 3] |= 1 << (p & 7)
+
+
+class ViewDeduplicator(ABC):
+    """Answers "was this viewer already counted for this job within the window?"."""
+
+    @abstractmethod
+    def first_seen(self, job_id, viewer: str) -> bool:
+        """Record the view; True if it is the first one in the window."""
+
+
+class RotatingBloomDeduplicator(ViewDeduplicator):
+    """
+    Time-bucketed Bloom filters held in process memory.
+
+    The window is split into `slices` buckets; a view is added to the current
+    bucket and looked up in all live ones, and whole buckets are dropped as
+    they age out, so memory stays bounded without per-entry expiry. One extra
+    bucket is kept so every view is remembered for at least the full window.
+    A bucket that fills up during a traffic burst gets another filter rather
+    than letting its error rate degrade.
+    False positives (a first view treated as a repeat) occur at roughly
+    `error_rate`; there are no false negatives.
+    """
+
+    def __init__(self, window_seconds: float, expected_views: int, error_rate: float, slices: int = 24):
+        self.slice_seconds = window_seconds / slices
+        self.slices = slices
+        self._slice_capacity = math.ceil(expected_views / slices)
+        # Lookups consult every live slice, so each one gets a share of the error budget
+        self._slice_error_rate = error_rate / (slices + 1)
+        self._filters: Dict[int, List[BloomFilter]] = {}
+        self._lock = threading.Lock()
+
+    def _current_filter(self) -> BloomFilter:
+        """Drop expired buckets and return the one new views go into."""
+        current = int(time.time() // self.slice_seconds)
+        for slice_id in [s for s in self._filters if s < current - self.slices]:
+            del self._filters[slice_id]
+        blooms = self._filters.setdefault(current, [])
+        if not blooms or blooms[-1].count >= blooms[-1].capacity:
+            blooms.append(BloomFilter(self._slice_capacity, self._slice_error_rate))
+        return blooms[-1]
+
+    def first_seen(self, job_id, viewer: str) -> bool:
+        key = f"{job_id}:{viewer}"
+        with self._lock:
+            current = self._current_filter()
+            if any(key in bloom for blooms in self._filters.values() for bloom in blooms):
+                return False
+            current.add(key)
+            return True
+
+
+class RedisViewDeduplicator(ViewDeduplicator):
+    """Exact, shared across workers: one expiring key per (job, viewer)."""
+
+    def __init__(self, url: str, window_seconds: float):
+        if redis is None:
+            raise RuntimeError("The redis package is required for the redis view de-duplicator")
+        self._redis = redis.Redis.from_url(url)
+        self.window_seconds = int(window_seconds)
+
+    def first_seen(self, job_id, viewer: str) -> bool:
+        try:
+            return bool(self._redis.set(f"job:viewed:{job_id}:{viewer}", 1, nx=True, ex=self.window_seconds))
+        except redis.RedisError as e:
+            # Counting a repeat view beats losing a first one while redis is unavailable
+            logger.error(f"View de-duplication unavailable: {e}")
+            return True
+
+
+def create_view_deduplicator(backend: str, window_seconds: float, expected_views: int,
+                             error_rate: float, redis_url: Optional[str] = None) -> ViewDeduplicator:
+    """Build the configured de-duplicator."""
+    if backend == "redis":
+        return RedisViewDeduplicator(redis_url, window_seconds)
+    if backend == "memory":
+        return RotatingBloomDeduplicator(window_seconds, expected_views, error_rate)
+    raise ValueError(f"Unknown view de-duplication backend: {backend}")